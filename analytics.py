@@ -0,0 +1,224 @@
+"""Cohort aggregates for counselors, kept up to date as students use the app.
+
+    python analytics.py users.db analytics.db
+
+rebuilds the quiz-outcome aggregates from an existing user store.
+"""
+import atexit
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# A student's latest quiz outcome, sliced by their profile
+OUTCOME_DIMENSIONS = ["major", "sub_major", "city", "state", "education"]
+DEMAND_DIMENSIONS = ["career", "location"]
+PROFILE_DIMENSIONS = ["city", "state", "education"]
+
+logger = logging.getLogger("compass.analytics")
+
+
+def _label(value) -> str:
+    # Free-text profile fields: "  jammu " and "Jammu" are the same city. Only
+    # whitespace and case are folded; title() would turn "IIT-Bombay" into "Iit-Bombay"
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    return " ".join(str(value).split()).casefold()
+
+
+def outcome_key(result: Dict, profile: Dict) -> Tuple[str, ...]:
+    return (result.get("major") or "", result.get("sub_major") or "",
+            *(_label(profile.get(d)) for d in PROFILE_DIMENSIONS))
+
+
+class CohortAnalytics:
+    """Counts per (major, sub_major, city, state, education) and per (career, location), in SQLite.
+
+    The tables hold one row per distinct combination, not per student, so
+    dashboard queries are GROUP BYs over a few hundred rows. Each student
+    counts once, under their latest outcome: ``cohort_members`` remembers
+    which combination a student is counted in so a retake or profile edit
+    moves them. Roadmap requests are frequent, so they are counted in memory
+    and written in one transaction every ``flush_interval`` seconds (and
+    before any query and at exit).
+    """
+
+    def __init__(self, path: str = "analytics.db", flush_interval: float = 2.0):
+        # Absolute, so a later chdir (or the exit flush) cannot open a different file
+        self.path = os.path.abspath(path)
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending: Counter = Counter()
+        self._last_flush = time.monotonic()
+        dims = ", ".join(f"{d} TEXT NOT NULL" for d in OUTCOME_DIMENSIONS)
+        with self._conn() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS outcome_counts ({dims}, n INTEGER NOT NULL, "
+                         f"PRIMARY KEY ({', '.join(OUTCOME_DIMENSIONS)})) WITHOUT ROWID")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS cohort_members (email TEXT PRIMARY KEY, {dims})")
+            conn.execute("CREATE TABLE IF NOT EXISTS roadmap_demand (career TEXT NOT NULL, location TEXT NOT NULL, "
+                         "n INTEGER NOT NULL, PRIMARY KEY (career, location)) WITHOUT ROWID")
+        self._exit_conn = conn
+        atexit.register(self._flush_at_exit)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Not bound to this thread: the exit flush reuses the constructor's connection
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _flush_at_exit(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return
+        try:
+            with self._exit_conn as conn:
+                self._write(conn, pending)
+        except sqlite3.Error:
+            logger.exception("could not write pending roadmap counts to %s", self.path)
+
+    # --- updates ---
+    def _move(self, conn: sqlite3.Connection, email: str, key: Tuple[str, ...]) -> None:
+        # Caller holds a write transaction (BEGIN IMMEDIATE), so no other process
+        # can move this student between the read below and the updates
+        old = conn.execute(f"SELECT {', '.join(OUTCOME_DIMENSIONS)} FROM cohort_members WHERE email = ?",
+                           (email,)).fetchone()
+        if old == key:
+            return
+        match = " AND ".join(f"{d} = ?" for d in OUTCOME_DIMENSIONS)
+        if old is not None:
+            conn.execute(f"UPDATE outcome_counts SET n = n - 1 WHERE {match}", old)
+            conn.execute(f"DELETE FROM outcome_counts WHERE {match} AND n <= 0", old)
+        conn.execute(f"INSERT INTO outcome_counts VALUES ({', '.join('?' * len(key))}, 1) "
+                     f"ON CONFLICT ({', '.join(OUTCOME_DIMENSIONS)}) DO UPDATE SET n = n + 1", key)
+        conn.execute(f"INSERT OR REPLACE INTO cohort_members VALUES (?, {', '.join('?' * len(key))})",
+                     (email, *key))
+
+    def record_outcome(self, email: str, result: Dict, profile: Dict) -> None:
+        """Count ``email`` under this quiz result (replacing any earlier one)."""
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._move(conn, email, outcome_key(result, profile))
+
+    def update_profile(self, email: str, profile: Dict) -> None:
+        """Move a counted student to their edited city/state/education."""
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT major, sub_major FROM cohort_members WHERE email = ?", (email,)).fetchone()
+            if row is not None:
+                self._move(conn, email, outcome_key({"major": row[0], "sub_major": row[1]}, profile))
+
+    def record_roadmap(self, career: str, location: Optional[str] = None) -> None:
+        with self._lock:
+            self._pending[(career, _label(location))] += 1
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        with self._conn() as conn:
+            self._write(conn, pending)
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, pending: Counter) -> None:
+        conn.executemany("INSERT INTO roadmap_demand VALUES (?, ?, ?) "
+                             "ON CONFLICT (career, location) DO UPDATE SET n = n + excluded.n",
+                             [(c, loc, n) for (c, loc), n in pending.items()])
+
+    def rebuild(self, store) -> int:
+        """Recount outcomes from a UserStore's latest results. Roadmap demand is kept."""
+        rows = []
+        for user in store.all():
+            latest = store.latest_result(user["email"])
+            if latest is not None:
+                rows.append((user["email"], *outcome_key(latest, user)))
+        with self._conn() as conn:
+            conn.execute("DELETE FROM outcome_counts")
+            conn.execute("DELETE FROM cohort_members")
+            conn.executemany(f"INSERT INTO cohort_members VALUES (?, {', '.join('?' * len(OUTCOME_DIMENSIONS))})", rows)
+            conn.execute(f"INSERT INTO outcome_counts SELECT {', '.join(OUTCOME_DIMENSIONS)}, COUNT(*) "
+                         f"FROM cohort_members GROUP BY {', '.join(OUTCOME_DIMENSIONS)}")
+        return len(rows)
+
+    # --- queries (aggregate tables only) ---
+    def _grouped(self, table: str, dims: List[str], by: List[str], where: Optional[Dict[str, str]],
+                 limit: Optional[int]) -> pd.DataFrame:
+        unknown = [d for d in list(by) + list(where or {}) if d not in dims]
+        if unknown:
+            raise ValueError(f"Unknown {table} dimension(s): {', '.join(unknown)}")
+        self.flush()
+        filters = " AND ".join(f"{d} = ?" for d in (where or {}))
+        sql = (f"SELECT {''.join(d + ', ' for d in by)}SUM(n) AS count FROM {table}"
+               + (f" WHERE {filters}" if filters else "")
+               + (f" GROUP BY {', '.join(by)}" if by else "")
+               + f" ORDER BY count DESC{''.join(', ' + d for d in by)}"
+               + (f" LIMIT {int(limit)}" if limit else ""))
+        rows = self._conn().execute(sql, list((where or {}).values())).fetchall()
+        df = pd.DataFrame(rows, columns=list(by) + ["count"])
+        return df[df["count"].notna()]
+
+    def outcomes(self, by: List[str], where: Optional[Dict[str, str]] = None,
+                 limit: Optional[int] = None) -> pd.DataFrame:
+        """Students per combination of ``by`` (from OUTCOME_DIMENSIONS), largest first."""
+        return self._grouped("outcome_counts", OUTCOME_DIMENSIONS, by, where, limit)
+
+    def roadmap_demand(self, by: List[str] = ("career",), where: Optional[Dict[str, str]] = None,
+                       limit: Optional[int] = None) -> pd.DataFrame:
+        """Roadmap requests per combination of ``by`` (from DEMAND_DIMENSIONS), largest first."""
+        return self._grouped("roadmap_demand", DEMAND_DIMENSIONS, list(by), where, limit)
+
+    def values(self, dimension: str) -> List[str]:
+        """Distinct values of an outcome dimension, for filter widgets."""
+        return self.outcomes([dimension])[dimension].sort_values().tolist()
+
+
+_instances: Dict[str, CohortAnalytics] = {}
+_instances_lock = threading.Lock()
+
+
+def get_analytics(path: str, store=None) -> CohortAnalytics:
+    """Process-wide aggregates for ``path``; a new file is first filled from ``store``."""
+    with _instances_lock:
+        path = os.path.abspath(path)
+        analytics = _instances.get(path)
+        if analytics is None:
+            is_new = not os.path.exists(path)
+            analytics = CohortAnalytics(path)
+            if is_new and store is not None:
+                analytics.rebuild(store)
+            _instances[path] = analytics
+    return analytics
+
+
+def flush_all() -> None:
+    """Write every process-wide instance's pending roadmap counts now."""
+    with _instances_lock:
+        instances = list(_instances.values())
+    for analytics in instances:
+        analytics.flush()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python analytics.py <users.db> <analytics.db>")
+        sys.exit(1)
+    from user_store import SQLiteUserStore
+
+    n = CohortAnalytics(sys.argv[2]).rebuild(SQLiteUserStore(sys.argv[1]))
+    print(f"Counted {n} students into {sys.argv[2]}")
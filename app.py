@@ -1,168 +1,31 @@
 import streamlit as st
-import pandas as pd
-import json
 import os
-import requests
 import random
-from typing import List, Dict
+import time
+import uuid
+
+import event_log
+import instrumentation
+from startup import startup_timer
+
+startup_timer.begin_run()
+instrumentation.begin_rerun()
+with startup_timer.stage("imports"):
+    from core import (
+        AVATAR_FOLDER, CAREER_TO_DEGREES, FUN_FACTS, SUCCESS_STORIES,
+        NEWS_DAYS, NEWS_PAGE_SIZE, NEWS_MAX_ITEMS, NEWS_PREWARM_INTERVAL,
+        career_roadmap, colleges_source, load_colleges, reload_data, app_user_store, app_quiz_bank, app_news_client,
+        app_avatar_store, app_analytics, record_roadmap_request, suggest_careers, log_event,
+        login, signup, save_user_data, save_quiz_result, latest_quiz_result, calculate_scores, recommend, stream_relevant_news, search_colleges,
+    )
+    from news_client import STREAM_KEYWORDS
+    from news_prewarm import get_news_prewarmer
 
 
 # ----------------------------- CONFIG -----------------------------
 st.set_page_config(page_title="Career Compass", page_icon="🧭", layout="wide")
-
-USERS_CSV = "users.csv"
-COLLEGES_CSV = "jk_colleges.csv"
-AVATAR_FOLDER = "images"
-QUIZ_FILE = "career_questions.json"
-API_KEY = '1544f28739f54713873b32e7687dac2d'
-BASE_URL = 'https://newsapi.org/v2/everything'
-# ----------------------------- CAREER ROADMAP DATA -----------------------------
-CAREER_TO_DEGREES = {
-    # tech/data
-    "Data Analyst": ["B.Sc", "BCA", "B.Com"],
-    "Software Developer": ["BCA", "B.Sc", "B.Tech", "BE"],
-    "AI/ML Engineer": ["B.Tech", "BE", "B.Sc"],
-    # business/arts
-    "Business Analyst": ["B.Com", "BBA", "B.Sc"],
-    "Graphic Designer": ["BA", "Arts"],
-    # medical/health
-    "Doctor (MBBS)": ["MBBS"],
-    "Dentist (BDS)": ["BDS"],
-    "Nurse": ["B.Sc. Nursing"],
-    # architecture
-    "Architect": ["B.Arch"],
-}
-
-CAREER_KEYWORDS = {
-    "Data Analyst": ["data", "statistics", "analytics", "python"],
-    "Software Developer": ["programming", "software", "computer"],
-    "AI/ML Engineer": ["ai", "ml", "machine", "data"],
-    "Business Analyst": ["finance", "business", "analytics"],
-    "Graphic Designer": ["design", "art", "media"],
-    "Doctor (MBBS)": ["medicine", "clinical", "biology"],
-    "Dentist (BDS)": ["dental", "oral"],
-    "Nurse": ["nursing", "health"],
-    "Architect": ["architecture", "design"],
-}
-
-ENTRANCE_BY_DEGREE = {
-    "BA": {"exam": "CUET-UG (where applicable)", "ref": "https://cuet.nta.nic.in/"},
-    "B.Sc": {"exam": "CUET-UG (where applicable)", "ref": "https://cuet.nta.nic.in/"},
-    "B.Com": {"exam": "CUET-UG (where applicable)", "ref": "https://cuet.nta.nic.in/"},
-    "BBA": {"exam": "CUET-UG / Univ process", "ref": "https://cuet.nta.nic.in/"},
-    "BCA": {"exam": "CUET-UG / Univ process", "ref": "https://cuet.nta.nic.in/"},
-    "B.Tech": {"exam": "JEE Main", "ref": "https://jeemain.nta.nic.in/"},
-    "BE": {"exam": "JEE Main", "ref": "https://jeemain.nta.nic.in/"},
-    "MBBS": {"exam": "NEET-UG", "ref": "https://neet.nta.nic.in/"},
-    "BDS": {"exam": "NEET-UG", "ref": "https://neet.nta.nic.in/"},
-    "B.Arch": {"exam": "JEE Main (Paper 2) / NATA (varies)", "ref": "https://jeemain.nta.nic.in/"},
-    "B.Sc. Nursing": {"exam": "University/State process", "ref": ""},
-}
-
-MOOC_BY_CAREER = {
-    "Data Analyst": [
-        {"title": "Python for Data Science", "platform": "NPTEL/SWAYAM", "ref": "https://onlinecourses.nptel.ac.in/"},
-        {"title": "Statistics for Data Analysis", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
-    ],
-    "Software Developer": [
-        {"title": "Data Structures & Algorithms", "platform": "NPTEL", "ref": "https://onlinecourses.nptel.ac.in/"},
-        {"title": "Databases / SQL", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
-    ],
-    "AI/ML Engineer": [
-        {"title": "Intro to Machine Learning", "platform": "NPTEL", "ref": "https://onlinecourses.nptel.ac.in/"},
-    ],
-    "Business Analyst": [
-        {"title": "Financial Accounting", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
-        {"title": "Business Analytics", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
-    ],
-    "Graphic Designer": [
-        {"title": "Design Basics / Visual Communication", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
-    ],
-    "Doctor (MBBS)": [
-        {"title": "Human Physiology Basics", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
-    ],
-    "Dentist (BDS)": [
-        {"title": "Oral Biology Foundations", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
-    ],
-    "Nurse": [
-        {"title": "Foundations of Nursing", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
-    ],
-    "Architect": [
-        {"title": "Architectural Graphics", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
-    ],
-}
-
-def _split_list(cell: str):
-    if not isinstance(cell, str):
-        return []
-    return [c.strip() for c in cell.split(",") if c.strip()]
-
-def career_roadmap(career: str, location_pref: str = None, limit: int = 20) -> Dict:
-    degrees = CAREER_TO_DEGREES.get(career, [])
-    if not degrees:
-        return {"career": career, "message": "No mapping found", "colleges": [], "steps": []}
-
-    if os.path.exists(COLLEGES_CSV):
-        df = pd.read_csv(COLLEGES_CSV)
-    else:
-        df = pd.DataFrame(columns=["College","Location","Website","Courses","Skills"])
-    for c in ["College", "Location", "Website", "Courses", "Skills"]:
-        if c in df.columns:
-            df[c] = df[c].astype(str).str.strip()
-    df["CourseTokens"] = df["Courses"].apply(_split_list)
-    df["SkillTokens"] = df.get("Skills", pd.Series([""]*len(df))).apply(_split_list)
-
-    mask = df["CourseTokens"].apply(
-        lambda toks: any(any(d.lower() in t.lower() for d in degrees) for t in toks)
-    )
-    filtered = df[mask].copy()
-
-    if location_pref:
-        filtered["loc_boost"] = filtered["Location"].str.contains(location_pref, case=False, na=False).astype(int)
-    else:
-        filtered["loc_boost"] = 0
-
-    kw = [k.lower() for k in CAREER_KEYWORDS.get(career, [])]
-    def score_row(r):
-        toks = [t.lower() for t in r["CourseTokens"]]
-        base = sum(any(d.lower() in t for d in degrees) for t in toks)
-        skills = [s.lower() for s in r["SkillTokens"]]
-        hits = sum(any(k in s for s in skills) for k in kw)
-        return base + 0.5 * hits
-
-    filtered["score"] = filtered.apply(score_row, axis=1)
-    filtered = filtered.sort_values(["loc_boost", "score", "College"], ascending=[False, False, True])
-
-    show = [c for c in ["College", "Location", "Website", "Courses", "Skills"] if c in filtered.columns]
-    colleges = filtered[show].drop_duplicates().head(limit).to_dict(orient="records")
-
-    entrances = []
-    seen = set()
-    for d in degrees:
-        info = ENTRANCE_BY_DEGREE.get(d)
-        if info:
-            key = (info["exam"], info["ref"])
-            if key not in seen:
-                entrances.append(info)
-                seen.add(key)
-
-    steps = [
-        f"Match your 10+2 subjects to degree options for {career} and shortlist colleges offering {', '.join(degrees)}",
-        "Pick the admission route that applies to your shortlist (CUET‑UG/JEE Main/NEET‑UG or university process) and calendar deadlines",
-        "Apply to 5–8 colleges across difficulty tiers; prepare required documents and subject prerequisites",
-        "Enroll in 1 public MOOC per term aligned to core skills; build a small project or portfolio artifact each semester",
-        "Do a short internship or supervised project each summer; expand your portfolio or clinical/community experience",
-        "In final year, add a capstone aligned to the target role and prepare for placements or PG entrance"
-    ]
-
-    return {
-        "career": career,
-        "degrees": degrees,
-        "entrance": entrances,
-        "colleges": colleges,
-        "moocs": MOOC_BY_CAREER.get(career, []),
-        "steps": steps
-    }
+SHOW_STARTUP_REPORT = os.environ.get("COMPASS_STARTUP_REPORT") == "1"
+instrumentation.start_exporter_from_env()
 
 # ----------------------------- SESSION STATE -----------------------------
 if "login" not in st.session_state:
@@ -181,179 +44,40 @@ if "main_result" not in st.session_state:
     st.session_state.main_result = {}
 if "sub_done" not in st.session_state:
     st.session_state.sub_done = False
+if "sid" not in st.session_state:
+    st.session_state.sid = uuid.uuid4().hex[:12]
+# Every event logged during this rerun carries the session id (and the page, once known)
+event_log.set_context(sid=st.session_state.sid, page=st.session_state.page)
 
 # ----------------------------- LOAD DATA -----------------------------
-def load_users():
-    if os.path.exists(USERS_CSV):
-        df = pd.read_csv(USERS_CSV)
-        required_cols = ["email","password","name","age","gender","city","state","education","avatar","your_paths"]
-        for col in required_cols:
-            if col not in df.columns:
-                df[col] = ""
-        return df
-    else:
-        df = pd.DataFrame(columns=required_cols)
-        df.to_csv(USERS_CSV,index=False)
-        return df
-
-def save_users(df):
-    df.to_csv(USERS_CSV,index=False)
-
-def load_colleges():
-    if os.path.exists(COLLEGES_CSV):
-        return pd.read_csv(COLLEGES_CSV)
-    else:
-        df = pd.DataFrame({
-            "College":["SKUAST-Kashmir","GCET Jammu"],
-            "Location":["Srinagar","Jammu"],
-            "Website":["https://www.skuastkashmir.ac.in","https://gcetjammu.ac.in"],
-            "Courses":["Engineering,Science","Commerce,Arts,Engineering"]
-        })
-        df.to_csv(COLLEGES_CSV,index=False)
-        return df
-
-def load_quiz():
-    if os.path.exists(QUIZ_FILE):
-        with open(QUIZ_FILE,"r") as f:
-            return json.load(f)
-    else:
-        return {"main": [], "sub": {}}
-
-users_df = load_users()
-colleges_df = load_colleges()
-quiz_data = load_quiz()
-
-# ----------------------------- AUTH FUNCTIONS -----------------------------
-def login(email,password):
-    df = load_users()
-    if email in df["email"].values:
-        row = df[df["email"]==email].iloc[0]
-        if row["password"]==password:
-            return row.to_dict()
-    return None
-
-def signup(email, password, name, age, gender, city, state, education):
-    df = load_users()
-    if email in df["email"].values:
-        return False
-    # Default avatar based on gender
-    if gender=="Male":
-        avatar_file = os.path.join(AVATAR_FOLDER,"avatar2.png")
-    elif gender=="Female":
-        avatar_file = os.path.join(AVATAR_FOLDER,"avatar1.png")
-    else:
-        avatar_file = os.path.join(AVATAR_FOLDER,"avatar3.png")
-
-    new_row = {
-        "email": email,
-        "password": password,
-        "name": name,
-        "age": age,
-        "gender": gender,
-        "city": city,
-        "state": state,
-        "education": education,
-        "avatar": avatar_file,
-        "your_paths": ""
-    }
-    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-    save_users(df)
-    return True
-
-def save_user_data(email, user_dict):
-    df = load_users()
-    idx = df.index[df["email"]==email][0]
-    for key, val in user_dict.items():
-        df.at[idx, key] = val
-    save_users(df)
-
-# ----------------------------- QUIZ FUNCTIONS -----------------------------
-def calculate_scores(questions, answers):
-    scores = {}
-    for q_key, ans in zip(sorted(questions.keys()), answers):
-        question = questions[q_key]
-        if ans in question["options"]:
-            for stream, weight in question["options"][ans]["weights"].items():
-                scores[stream] = scores.get(stream, 0) + weight
-    return scores
-
-def recommend(scores):
-    ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-    major = ranked[0][0] if ranked else None
-    minor = ranked[1][0] if len(ranked) > 1 else None
-    backup = ranked[2][0] if len(ranked) > 2 else None
-    return major, minor, backup
-
-# ----------------------------- NEWS FUNCTION -----------------------------
-# Replace your old function with this
-# --- Stream-specific whitelisted domains ---
-STREAM_DOMAINS = {
-    "Engineering": ["ieee.org", "techcrunch.com", "arstechnica.com", "theverge.com"],
-    "Science": ["nature.com", "sciencedaily.com", "scientificamerican.com", "arxiv.org"],
-    "Medical": ["nejm.org", "thelancet.com", "who.int", "nih.gov"],
-    "Arts": ["theguardian.com", "nytimes.com", "smithsonianmag.com"],
-    "Commerce": ["ft.com", "economist.com", "wsj.com", "business-standard.com"]
-}
-
-# --- Low-quality / irrelevant domains to exclude ---
-EXCLUDE = ["rumble.com", "brighteon.com", "apple.com", "facebook.com"]
-
-def build_query_terms(stream_keywords, extra_keywords=None):
-    phrases = [f"\"{k}\"" for k in stream_keywords]
-    extras = extra_keywords or []
-    return " OR ".join(phrases + extras)
-def fetch_relevant_news(stream, interests, days=21, page_size=50, max_items=30):
-    from datetime import datetime, timedelta
-    from_date = (datetime.utcnow() - timedelta(days=days)).date().isoformat()
-
-    # Keywords and domains
-    query = build_query_terms(interests)
-    whitelist = ",".join(STREAM_DOMAINS.get(stream, [])) or None
-    exclude = ",".join(EXCLUDE)
-
-    params = {
-        "q": query,
-        "searchIn": "title,description",
-        "sortBy": "relevancy",
-        "language": "en",
-        "from": from_date,
-        "pageSize": page_size,
-        "apiKey": API_KEY
-    }
-
-    if whitelist:
-        params["domains"] = whitelist
-    if exclude:
-        params["excludeDomains"] = exclude
-
-    r = requests.get(BASE_URL, params=params, timeout=20)
-    r.raise_for_status()
-    data = r.json()
-    articles = data.get("articles", [])
-
-    # Post-filter and score
-    keywords = [k.lower() for k in interests]
-    scored = []
-    for a in articles:
-        title = (a.get("title") or "").lower()
-        desc = (a.get("description") or "").lower()
-        text = title + " " + desc
-        hits = sum(1 for k in keywords if k in text)
-        if hits == 0:
-            continue
-        title_hits = sum(1 for k in keywords if k in title)
-        score = hits + 0.5 * title_hits
-        scored.append((score, {
-            "title": a.get("title"),
-            "description": a.get("description"),
-            "url": a.get("url"),
-            "source": (a.get("source") or {}).get("name"),
-            "publishedAt": a.get("publishedAt").split("T")[0] if a.get("publishedAt") else None
-        }))
-
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [item for _, item in scored[:max_items]]
-
+# Datasets are loaded once per process and shared by every session instead of
+# on each rerun. The file mtime is part of the cache key, so editing a data
+# file invalidates its entry; clear_data_caches() drops everything.
+def _mtime(path):
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_colleges(source, mtime):
+    return load_colleges()
+
+@st.cache_resource(show_spinner=False)
+def cached_news_prewarmer():
+    # Same sizes as the live path below, so the pre-warmed request is the first one the page makes
+    return get_news_prewarmer(app_news_client(), STREAM_KEYWORDS, interval=NEWS_PREWARM_INTERVAL,
+                              days=NEWS_DAYS, page_size=NEWS_PAGE_SIZE, max_items=NEWS_MAX_ITEMS)
+
+def clear_data_caches():
+    cached_colleges.clear()
+    reload_data()
+
+with startup_timer.stage("user_store"):
+    app_user_store()
+with startup_timer.stage("colleges"):
+    colleges_df = cached_colleges(colleges_source(), _mtime(colleges_source()))
+with startup_timer.stage("quiz"):
+    quiz_bank = app_quiz_bank()
+with startup_timer.stage("news_prewarmer"):
+    news_prewarmer = cached_news_prewarmer()
 
 # ----------------------------- LOGIN / SIGNUP PAGE -----------------------------
 def login_page():
@@ -396,18 +120,22 @@ def login_page():
 # ----------------------------- HOME PAGE -----------------------------
 def home_page():
     # Sidebar avatar & title
+    # Thumbnails come from the avatar store's in-memory cache, not the full-size file
+    avatars = app_avatar_store()
+    default_thumb = avatars.thumbnail(os.path.join(AVATAR_FOLDER, "avatar3.png"))
     if st.session_state.user:
         avatar_path = st.session_state.user.get("avatar") or os.path.join(AVATAR_FOLDER, "avatar3.png")
-        st.sidebar.image(avatar_path, width=80)
+        st.sidebar.image(avatars.thumbnail(avatar_path) or default_thumb, width=80)
         st.sidebar.title(f"Welcome, {st.session_state.user['name']}")
     else:
-        st.sidebar.image(os.path.join(AVATAR_FOLDER, "avatar3.png"), width=80)
+        st.sidebar.image(default_thumb, width=80)
         st.sidebar.title("Welcome, Guest")
 
     # Sidebar menu
     menu = st.sidebar.radio(
-        "📍 Menu", ["Home","Quiz","Your Paths","Explore","Notifications","Profile","About Us","Logout"]
+        "📍 Menu", ["Home","Quiz","Your Paths","Explore","Notifications","Profile","Insights","About Us","Logout"]
     )
+    event_log.bind(page=menu)
 
     # --- Home Page ---
     if menu=="Home":
@@ -421,25 +149,13 @@ def home_page():
 
         # --- Did You Know? Fun Career Facts ---
         st.markdown("### 💡 Did You Know?")
-        facts = [
-            "The fastest-growing career in India is **Data Science**, expected to create 11M+ jobs by 2030.",
-            "The average salary of an **AI Engineer** in India is ₹8–12 LPA for freshers.",
-            "**Graphic Designers** are now in demand in media, healthcare & finance sectors.",
-            "By 2030, **50% of jobs will require new skills** due to automation and AI.",
-            "India produces **1.5 million engineers** every year, but only ~20% work in core fields."
-        ]
-        st.info(random.choice(facts))
+        st.info(random.choice(FUN_FACTS))
 
         st.markdown("---")
 
         # --- Success Stories ---
         st.markdown("### 🌟 Success Stories")
-        stories = [
-            {"name":"Aditi Sharma","story":"From a small town in J&K, Aditi cracked **IIT-JEE** and is now a researcher in AI at Google.","quote":"Never doubt your potential, guidance + hard work = success!"},
-            {"name":"Ravi Kumar","story":"Started as a diploma student in civil engineering, Ravi built a startup in **Sustainable Housing**.","quote":"Your background doesn’t define you, your choices do."},
-            {"name":"Mehak Ali","story":"A passionate artist who turned her hobby into a career in **Graphic Design** freelancing worldwide.","quote":"Follow your passion, and success will follow you."}
-        ]
-        for s in stories:
+        for s in SUCCESS_STORIES:
             with st.expander(f"🌟 {s['name']}"):
                 st.write(s["story"])
                 st.success(f"“{s['quote']}”")
@@ -450,39 +166,38 @@ def home_page():
         st.title("🔔 Notifications")
         st.markdown("Here you will find career news, tips, and updates tailored for you!")
 
-        if st.session_state.user and st.session_state.user.get("your_paths"):
-            # Extract stream (major) from quiz results
-            paths = st.session_state.user["your_paths"]
-            major = None
-            try:
-                major = paths.split("Major:")[1].split(",")[0].strip()
-            except:
-                major = None
+        result = latest_quiz_result(st.session_state.user["email"]) if st.session_state.user else None
+        if result:
+            major = result["major"]
 
             if major:
                 st.info(f"Fetching latest news for your major: **{major}**...")
 
-                # Map majors to keywords
-                STREAM_KEYWORDS = {
-                    "Engineering": ["robotics", "AI", "automation", "IoT"],
-                    "Science": ["space", "physics", "biology", "chemistry"],
-                    "Medical": ["healthcare", "medicine", "clinical trials", "pharma"],
-                    "Arts": ["design", "media", "painting", "music"],
-                    "Commerce": ["finance", "stock market", "economics", "entrepreneurship"]
-                }
-
                 keywords = STREAM_KEYWORDS.get(major, [major])
 
+                def show_news(items):
+                    for n in items:
+                        st.markdown(f"**[{n['title']}]({n['url']})**")
+                        if n['description']:
+                            st.write(n['description'])
+                        st.caption(f"{n['source']} | {n['publishedAt']}")
+                        st.markdown("---")
+
                 try:
-                    news_items = fetch_relevant_news(major, keywords, days=14, page_size=30, max_items=10)
-                    if news_items:
-                        for n in news_items:
-                            st.markdown(f"**[{n['title']}]({n['url']})**")
-                            if n['description']:
-                                st.write(n['description'])
-                            st.caption(f"{n['source']} | {n['publishedAt']}")
-                            st.markdown("---")
+                    # A freshly pre-warmed stream is served from memory; anything else is aggregated
+                    # live and redrawn as each request lands instead of waiting for the slowest one
+                    news_items = news_prewarmer.get(major)
+                    if news_items is not None:
+                        log_event("news", stream=major, items=len(news_items), ms=0.0, cache_hit=True, source="prewarm")
+                        refreshed_at = news_prewarmer.status()[major]["refreshed_at"]
+                        st.caption(f"Updated {int((time.time() - refreshed_at) // 60)} min ago")
+                        show_news(news_items)
                     else:
+                        feed = st.empty()
+                        for news_items in stream_relevant_news(major, keywords, days=NEWS_DAYS, page_size=NEWS_PAGE_SIZE, max_items=NEWS_MAX_ITEMS):
+                            with feed.container():
+                                show_news(news_items)
+                    if not news_items:
                         st.info("No recent news found for your major. Check back later!")
                 except Exception as e:
                     st.error(f"Error fetching news: {e}")
@@ -500,25 +215,48 @@ def home_page():
   
     elif menu=="Your Paths":
         st.title("📈 Your Career Paths")
-        user_paths = st.session_state.user.get("your_paths", "")
-        if user_paths:
-            st.write(user_paths)
+        result = latest_quiz_result(st.session_state.user["email"])
+        if result:
+            st.write(f"Major: {result['major']}, Minor: {result['minor']}, Backup: {result['backup']}")
+            if result["sub_major"]:
+                st.write(f"Specializations Major: {result['sub_major']}, Minor: {result['sub_minor']}, Backup: {result['sub_backup']}")
         else: 
             st.info("Take the quiz to generate your career paths!")
 
         # ---------------- Career Roadmap UI ----------------
         st.subheader("Career Roadmap")
-        selected_career = st.selectbox("Select a Career", options=list(CAREER_TO_DEGREES.keys()))
-        location_pref = st.text_input("Preferred Location (optional)")
+        careers = list(CAREER_TO_DEGREES.keys())
+        interests = st.text_input("Describe what you enjoy (optional)", placeholder="e.g. I like drawing buildings and math")
+        suggested = suggest_careers(interests) if interests else []
+        if interests:
+            if suggested:
+                st.write("Suggested careers: " + ", ".join(c for c, _ in suggested))
+            else:
+                st.caption("No career matched those words; try describing subjects or activities.")
+        selected_career = st.selectbox("Select a Career", options=careers,
+                                       index=careers.index(suggested[0][0]) if suggested else 0)
+        city = st.session_state.user.get("city")
+        location_pref = st.text_input("Preferred Location (optional)", "",
+                                      placeholder=f"e.g. {city}" if city else "City or district")
         if st.button("Show Roadmap"):
-            roadmap = career_roadmap(selected_career, location_pref)
+            st.session_state.roadmap = dict(career_roadmap(selected_career, location_pref))
+            st.session_state.roadmap_query = (selected_career, location_pref)
+            record_roadmap_request(selected_career, location_pref)
+        roadmap = st.session_state.get("roadmap")
+        if roadmap and st.session_state.get("roadmap_query") == (selected_career, location_pref):
             st.markdown("**Relevant Degrees:**")
             st.write(", ".join(roadmap["degrees"]))
             st.markdown("**Entrance Exams:**")
             for e in roadmap["entrance"]: st.write(f"- {e['exam']} ([Link]({e['ref']}))")
             st.markdown("**Top Colleges:**")
             for c in roadmap["colleges"]:
-                st.write(f"- [{c['College']}]({c['Website']}) | Location: {c['Location']} | Courses: {c.get('Courses','')} | Skills: {c.get('Skills','')}")
+                near = f" (~{c['distance_km']:g} km)" if c.get("distance_km") is not None else ""
+                st.write(f"- [{c['College']}]({c['Website']}) | Location: {c['Location']}{near} | Courses: {c.get('Courses','')} | Skills: {c.get('Skills','')}")
+            if roadmap.get("next_cursor") and st.button("Show more colleges"):
+                more = career_roadmap(selected_career, location_pref, cursor=roadmap["next_cursor"])
+                roadmap["colleges"] = roadmap["colleges"] + more["colleges"]
+                roadmap["next_cursor"] = more["next_cursor"]
+                st.rerun()
             st.markdown("**Recommended MOOCs:**")
             for m in roadmap["moocs"]: st.write(f"- [{m['title']}]({m['ref']}) on {m['platform']}")
             st.markdown("**Suggested Steps:**")
@@ -528,7 +266,8 @@ def home_page():
         search = st.text_input("Search by Course or College")
         df = colleges_df
         if search:
-            df = df[df.apply(lambda row: search.lower() in row.astype(str).str.lower().to_string(), axis=1)]
+            df = search_colleges(search)
+            st.caption(f"{len(df)} matching colleges")
         st.dataframe(df)
     elif menu=="Profile":
         st.subheader("👤 Edit Profile")
@@ -543,10 +282,10 @@ def home_page():
 
             avatar = st.file_uploader("Upload Avatar", type=["png","jpg","jpeg"])
             if avatar:
-                avatar_path = os.path.join(AVATAR_FOLDER, avatar.name)
-                with open(avatar_path, "wb") as f:
-                    f.write(avatar.getbuffer())
-                user["avatar"] = avatar_path
+                try:
+                    user["avatar"] = app_avatar_store().save(avatar.getvalue())
+                except ValueError:
+                    st.error("That file could not be read as a PNG or JPEG image.")
 
             if st.button("💾 Save Profile"):
                 user.update({
@@ -555,6 +294,29 @@ def home_page():
                 })
                 save_user_data(user["email"], user)
                 st.success("Profile updated successfully!")
+    elif menu=="Insights":
+        # Reads only the analytics aggregates, never the user table
+        st.title("📊 Cohort Insights")
+        analytics = app_analytics()
+        streams = analytics.outcomes(["major"])
+        st.metric("Students with a quiz result", int(streams["count"].sum()))
+        if streams.empty:
+            st.info("No quiz results yet.")
+        else:
+            slice_by = st.selectbox("Break down streams by", ["city", "state", "education"])
+            by_slice = analytics.outcomes([slice_by, "major"]).replace({slice_by: {"": "(not set)"}})
+            st.bar_chart(by_slice.pivot_table(index=slice_by, columns="major", values="count", fill_value=0))
+            pick = st.selectbox(f"Specializations for {slice_by}", ["All"] + analytics.values(slice_by))
+            where = {slice_by: pick} if pick != "All" else None
+            st.dataframe(analytics.outcomes(["major", "sub_major"], where), hide_index=True)
+        st.subheader("Roadmap demand")
+        demand = analytics.roadmap_demand(["career"])
+        if demand.empty:
+            st.info("No roadmaps requested yet.")
+        else:
+            st.bar_chart(demand.set_index("career"))
+            top = analytics.roadmap_demand(["career", "location"], limit=20).replace({"location": {"": "(any)"}})
+            st.dataframe(top, hide_index=True)
     elif menu=="About Us":
         st.title("ℹ️ About Us")
         st.write("Career Compass is your personal career guidance tool built for SIH.")
@@ -583,19 +345,17 @@ def quiz_page():
         answers = []
         with st.form("quiz_form"):
             st.info("Answer the following questions to identify your **Major**.")
-            for i, q_key in enumerate(sorted(quiz_data.get("main", {}).keys())):
-                q = quiz_data["main"][q_key]
-                st.write(f"**Q{i+1}: {q['question']}**")
-                option_texts = [opt["text"] for opt in q["options"].values()]
-                ans_idx = st.radio("", option_texts, key=f"main_{i}")
-                ans_key = [k for k, v in q["options"].items() if v["text"] == ans_idx][0]
-                answers.append(ans_key)
+            main_quiz = quiz_bank.main
+            for i in range(len(main_quiz)):
+                st.write(f"**Q{i+1}: {main_quiz.questions[i]}**")
+                ans_idx = st.radio("", main_quiz.option_texts[i], key=f"main_{i}")
+                answers.append(main_quiz.option_key(i, ans_idx))
 
             submitted = st.form_submit_button("🚀 Submit ")
             if submitted:
-                main_scores = calculate_scores(quiz_data["main"], answers)
+                main_scores = calculate_scores(quiz_bank.main, answers)
                 major, minor, backup = recommend(main_scores)
-                st.session_state.main_result = {"major": major, "minor": minor, "backup": backup}
+                st.session_state.main_result = {"major": major, "minor": minor, "backup": backup, "scores": main_scores}
                 st.session_state.quiz_done = True
 
     # ---- SUB QUIZ ----
@@ -612,33 +372,27 @@ def quiz_page():
 
         st.subheader(f"🧩 Specialization Quiz: {major}")
 
-        if major in quiz_data.get("sub", {}):
+        if major in quiz_bank.sub:
+            sub_quiz = quiz_bank.sub[major]
             sub_answers = []
             with st.form("sub_quiz_form"):
                 st.info("Now let’s narrow down to your **specialization**.")
-                for j, q_key in enumerate(sorted(quiz_data["sub"][major].keys())):
-                    q = quiz_data["sub"][major][q_key]
-                    st.write(f"**Q{j+1}: {q['question']}**")
-                    option_texts = [opt["text"] for opt in q["options"].values()]
-                    ans_idx = st.radio("", option_texts, key=f"sub_{j}")
-                    ans_key = [k for k, v in q["options"].items() if v["text"] == ans_idx][0]
-                    sub_answers.append(ans_key)
+                for j in range(len(sub_quiz)):
+                    st.write(f"**Q{j+1}: {sub_quiz.questions[j]}**")
+                    ans_idx = st.radio("", sub_quiz.option_texts[j], key=f"sub_{j}")
+                    sub_answers.append(sub_quiz.option_key(j, ans_idx))
 
                 sub_submitted = st.form_submit_button("✨ Submit Specialization Quiz")
                 if sub_submitted:
-                    sub_scores = calculate_scores(quiz_data["sub"][major], sub_answers)
+                    sub_scores = calculate_scores(sub_quiz, sub_answers)
                     sub_major, sub_minor, sub_backup = recommend(sub_scores)
                     st.session_state.sub_done = True
 
                     # Save results
-                    df = load_users()
-                    idx = df.index[df["email"] == st.session_state.user["email"]][0]
-                    df.at[idx, "your_paths"] = (
-                        f"Major: {major}, Minor: {st.session_state.main_result['minor']}, Backup: {st.session_state.main_result['backup']} | "
-                        f"Specializations Major: {sub_major}, Minor: {sub_minor}, Backup: {sub_backup}"
-                    )
-                    save_users(df)
-                    st.session_state.user = df.iloc[idx].to_dict()
+                    email = st.session_state.user["email"]
+                    save_quiz_result(email, st.session_state.main_result,
+                                     {"major": sub_major, "minor": sub_minor, "backup": sub_backup, "scores": sub_scores})
+                    st.session_state.user = app_user_store().get(email)
 
                     # Fancy UI results
                     st.success("🎉 Your career recommendations are ready!")
@@ -662,6 +416,9 @@ def quiz_page():
 
         else:
             st.info("No specialization quiz available for this stream.")
+            email = st.session_state.user["email"]
+            save_quiz_result(email, st.session_state.main_result)
+            st.session_state.user = app_user_store().get(email)
             st.session_state.sub_done = True
         if st.button("🔄 Retake Quiz"):
             st.session_state.quiz_done = False
@@ -674,7 +431,32 @@ def quiz_page():
         
 
 # ----------------------------- ROUTER -----------------------------
-if st.session_state.page=="login":
-    login_page()
-else:
-    home_page()
+with startup_timer.stage("render"), instrumentation.timer("page.render"):
+    if st.session_state.page=="login":
+        login_page()
+    else:
+        home_page()
+stages = startup_timer.end_run()
+log_event("page_view", ms=round(stages.get("total", 0.0), 3), cold=startup_timer.runs == 1)
+
+if instrumentation.enabled():
+    with st.sidebar.expander("📊 Hot-path metrics"):
+        calls = instrumentation.rerun_calls()
+        st.caption(f"This rerun: {sum(ms for _, ms in calls):.1f} ms across {len(calls)} instrumented calls")
+        st.dataframe([{"call": name, "ms": round(ms, 2)} for name, ms in calls])
+        snap = instrumentation.snapshot()
+        st.caption("Process totals")
+        st.dataframe([
+            {"call": name, "count": t["count"], "mean_ms": t["mean_ms"], "max_ms": t["max_ms"], "errors": t["errors"]}
+            for name, t in sorted(snap["timers"].items())
+        ])
+        if snap["counters"]:
+            st.json(snap["counters"])
+
+if SHOW_STARTUP_REPORT:
+    with st.sidebar.expander("⏱ Startup timings"):
+        st.caption(f"{startup_timer.runs} runs in this process (first = cold)")
+        st.dataframe(startup_timer.report())
+        if st.button("Reload data files"):
+            clear_data_caches()
+            st.rerun()
@@ -0,0 +1,121 @@
+import hashlib
+import io
+import os
+import threading
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from instrumentation import incr
+from result_cache import SizedLRU
+
+_EXTENSIONS = {"PNG": ".png", "JPEG": ".jpg"}
+
+
+class AvatarStore:
+    """Content-addressed avatar files with pre-built thumbnails.
+
+    An upload is stored once under the SHA-256 of its bytes
+    (``<root>/ab/abcd....png``), so identical uploads share one file and
+    two users' "photo.png" never collide. The ``thumb_px``-wide thumbnail
+    is written next to it at upload time, and thumbnail bytes are served
+    from an in-memory LRU, so a sidebar render does no image I/O once warm.
+    Stored files never change; paths outside the store (the bundled default
+    avatars, uploads saved before this store existed) are thumbnailed on
+    first use and cached the same way.
+    """
+
+    def __init__(self, root: str = "images/avatars", thumb_px: int = 80,
+                 cache_entries: int = 512, cache_bytes: int = 8 * 1024 * 1024):
+        self.root = root
+        self.thumb_px = thumb_px
+        self._thumbs = SizedLRU(cache_entries, cache_bytes, sizeof=len)
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str, suffix: str) -> str:
+        return os.path.join(self.root, digest[:2], digest + suffix)
+
+    def thumb_path(self, avatar_path: str) -> Optional[str]:
+        """Where the stored thumbnail of ``avatar_path`` lives, or None for paths outside the store."""
+        if os.path.normpath(os.path.dirname(os.path.dirname(avatar_path))) != os.path.normpath(self.root):
+            return None
+        return os.path.splitext(avatar_path)[0] + f".thumb{self.thumb_px}.png"
+
+    def save(self, data: bytes) -> str:
+        """Store an uploaded PNG/JPEG and its thumbnail; returns the avatar path. Raises ValueError if not an image."""
+        try:
+            img = Image.open(io.BytesIO(data))
+            img.load()
+        except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+            raise ValueError(f"Not a readable image: {e}")
+        ext = _EXTENSIONS.get(img.format)
+        if ext is None:
+            raise ValueError(f"Unsupported avatar format: {img.format}")
+
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest, ext)
+        if os.path.exists(path):
+            incr("avatar.dedup")
+            return path
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                thumb = self._thumbnail(img)
+                self._write(self.thumb_path(path), thumb)
+                # The original goes last: its presence means the thumbnail is already there
+                self._write(path, data)
+                self._thumbs.put(path, thumb)
+        return path
+
+    def thumbnail(self, avatar_path: str) -> Optional[bytes]:
+        """PNG bytes of the thumbnail for ``avatar_path``; None if it cannot be read."""
+        thumb = self._thumbs.get(avatar_path)
+        if thumb is not None:
+            return thumb
+        stored = self.thumb_path(avatar_path)
+        try:
+            if stored and os.path.exists(stored):
+                with open(stored, "rb") as f:
+                    thumb = f.read()
+            else:
+                with Image.open(avatar_path) as img:
+                    thumb = self._thumbnail(img)
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+            return None
+        self._thumbs.put(avatar_path, thumb)
+        return thumb
+
+    def _thumbnail(self, img: Image.Image) -> bytes:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        if img.width > self.thumb_px:
+            img = img.resize((self.thumb_px, max(1, round(img.height * self.thumb_px / img.width))),
+                             Image.LANCZOS)
+        out = io.BytesIO()
+        img.save(out, format="PNG", optimize=True)
+        return out.getvalue()
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def stats(self) -> Dict[str, int]:
+        return self._thumbs.stats()
+
+
+_stores: Dict[str, AvatarStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_avatar_store(root: str, thumb_px: int = 80) -> AvatarStore:
+    """Process-wide store for ``root``, shared by every session."""
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = AvatarStore(root, thumb_px)
+            _stores[root] = store
+    return store
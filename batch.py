@@ -0,0 +1,189 @@
+"""Score a whole cohort's quiz answers without the UI.
+
+Input is a CSV or JSONL file with one student per row:
+
+    student_id    any identifier, copied to the output
+    main_answers  main-quiz option keys in question order ("abcde..." or "a,b,c,...")
+    sub_answers   optional specialization-quiz keys for the student's major
+    career        optional; when set, a roadmap for it is included
+    location      optional location preference for that roadmap
+    interests     optional free text ("I like drawing and math"); adds suggested_careers
+
+Rows are read in chunks, scored in a process pool and written to the output
+(JSONL, or CSV when the path ends in .csv) in input order as each chunk
+finishes, so memory stays flat on large files.
+
+    python batch.py answers.csv -o results.jsonl --workers 4
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List
+
+import core
+import event_log
+
+
+def parse_answers(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(v).strip() for v in value]
+    value = str(value).strip()
+    if "," in value or " " in value:
+        return [v.strip() for v in value.replace(" ", ",").split(",") if v.strip()]
+    return list(value)
+
+
+def read_rows(path: str) -> Iterator[Dict]:
+    if path.endswith(".jsonl") or path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            yield from csv.DictReader(f)
+
+
+def chunked(rows: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def process_chunk(rows: List[Dict], roadmap_limit: int = 10) -> List[Dict]:
+    bank = core.app_quiz_bank()
+    totals, first_seen = bank.main.score_batch([parse_answers(r.get("main_answers")) for r in rows])
+    picks = bank.main.recommend_batch(totals, first_seen)
+
+    texts = [(r.get("interests") or "").strip() for r in rows]
+    suggestions = core.suggest_careers_batch(texts) if any(texts) else [None] * len(rows)
+
+    roadmaps = {}
+    out = []
+    for row, (major, minor, backup), tot, fs, text, suggested in zip(rows, picks, totals, first_seen, texts, suggestions):
+        result = {
+            "student_id": row.get("student_id"),
+            "major": major, "minor": minor, "backup": backup,
+            "main_scores": bank.main.to_dict(tot, fs),
+        }
+        if text:
+            result["suggested_careers"] = [c for c, _ in suggested]
+        sub_quiz = bank.sub.get(major)
+        sub_answers = parse_answers(row.get("sub_answers"))
+        if sub_quiz is not None and sub_answers:
+            sub_scores = core.calculate_scores(sub_quiz, sub_answers)
+            result["sub_major"], result["sub_minor"], result["sub_backup"] = core.recommend(sub_scores)
+            result["sub_scores"] = sub_scores
+
+        career = (row.get("career") or "").strip()
+        if career:
+            key = (career, (row.get("location") or "").strip())
+            if key not in roadmaps:
+                roadmaps[key] = core.career_roadmap(career, key[1] or None, roadmap_limit)
+            result["roadmap"] = roadmaps[key]
+        out.append(result)
+    return out
+
+
+class ResultWriter:
+    CSV_FIELDS = ["student_id", "major", "minor", "backup", "sub_major", "sub_minor", "sub_backup",
+                  "suggested_careers", "career", "degrees", "colleges"]
+
+    def __init__(self, path: str):
+        self.path = path
+        self.is_csv = path.endswith(".csv")
+        self.f = sys.stdout if path == "-" else open(path, "w", encoding="utf-8", newline="")
+        self.writer = csv.DictWriter(self.f, fieldnames=self.CSV_FIELDS, extrasaction="ignore") if self.is_csv else None
+        if self.writer:
+            self.writer.writeheader()
+
+    def write(self, results: List[Dict]):
+        for r in results:
+            if self.writer:
+                roadmap = r.get("roadmap") or {}
+                self.writer.writerow({
+                    **r,
+                    "suggested_careers": "; ".join(r.get("suggested_careers", [])),
+                    "career": roadmap.get("career", ""),
+                    "degrees": "; ".join(roadmap.get("degrees", [])),
+                    "colleges": "; ".join(c["College"] for c in roadmap.get("colleges", [])),
+                })
+            else:
+                self.f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        self.f.flush()
+
+    def close(self):
+        if self.f is not sys.stdout:
+            self.f.close()
+
+
+def run(input_path: str, output_path: str, workers: int = 0, chunk_size: int = 1000,
+        roadmap_limit: int = 10, quiet: bool = False) -> Dict:
+    workers = workers or os.cpu_count() or 1
+    writer = ResultWriter(output_path)
+    start = time.perf_counter()
+    done = 0
+
+    def report(final=False):
+        elapsed = time.perf_counter() - start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        if not quiet:
+            print(f"{'done' if final else 'progress'}: {done} rows in {elapsed:.1f}s ({rate:,.0f} rows/sec)",
+                  file=sys.stderr)
+        return rate
+
+    try:
+        if workers == 1:
+            for chunk in chunked(read_rows(input_path), chunk_size):
+                writer.write(process_chunk(chunk, roadmap_limit))
+                done += len(chunk)
+                report()
+        else:
+            # Keep a bounded window of chunks in flight and write them back in input order
+            with ProcessPoolExecutor(max_workers=workers, initializer=event_log.close_in_worker) as pool:
+                pending = deque()
+                for chunk in chunked(read_rows(input_path), chunk_size):
+                    pending.append((len(chunk), pool.submit(process_chunk, chunk, roadmap_limit)))
+                    while len(pending) >= workers * 2:
+                        n, fut = pending.popleft()
+                        writer.write(fut.result())
+                        done += n
+                        report()
+                while pending:
+                    n, fut = pending.popleft()
+                    writer.write(fut.result())
+                    done += n
+                    report()
+    finally:
+        writer.close()
+
+    rate = report(final=True)
+    return {"rows": done, "seconds": time.perf_counter() - start, "rows_per_sec": rate}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch quiz scoring and roadmaps for a cohort.")
+    parser.add_argument("input", help="answers file (.csv or .jsonl)")
+    parser.add_argument("-o", "--output", default="-", help="results file (.jsonl or .csv); default stdout")
+    parser.add_argument("-w", "--workers", type=int, default=0, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--roadmap-limit", type=int, default=10, help="colleges per roadmap")
+    parser.add_argument("-q", "--quiet", action="store_true")
+    args = parser.parse_args(argv)
+    run(args.input, args.output, args.workers, args.chunk_size, args.roadmap_limit, args.quiet)
+
+
+if __name__ == "__main__":
+    main()
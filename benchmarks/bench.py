@@ -0,0 +1,210 @@
+"""Benchmarks for the scoring, roadmap, search, user-store and news hot paths.
+
+    python -m benchmarks.bench -o bench.json
+    python -m benchmarks.bench --sizes 1000,100000,1000000 --only roadmap,search
+    python -m benchmarks.bench -o new.json --compare old.json
+
+Everything runs against synthetic data in a temp directory; no network and
+no files in the repo are touched. Results are written as JSON so runs from
+different commits can be diffed with --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import core
+from benchmarks import synthetic
+from news_client import FixtureBackend, STREAM_KEYWORDS, score_articles
+from user_store import get_user_store
+
+
+def measure(fn: Callable, repeat: int, warmup: int = 1) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "repeat": repeat,
+        "min_ms": round(samples[0], 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "ops_per_sec": round(1000 / statistics.fmean(samples), 2) if statistics.fmean(samples) else None,
+    }
+
+
+def measure_once(fn: Callable) -> Dict[str, float]:
+    start = time.perf_counter()
+    fn()
+    ms = (time.perf_counter() - start) * 1000
+    return {"repeat": 1, "min_ms": round(ms, 4), "median_ms": round(ms, 4), "p95_ms": round(ms, 4),
+            "mean_ms": round(ms, 4), "ops_per_sec": round(1000 / ms, 2) if ms else None}
+
+
+class Bench:
+    def __init__(self, workdir: str, repeat: int):
+        self.workdir = workdir
+        self.repeat = repeat
+        core.EVENT_LOG = os.path.join(workdir, "events.jsonl")
+        self.results: List[Dict] = []
+
+    def record(self, name: str, params: Dict, stats: Dict):
+        self.results.append({"name": name, "params": params, **stats})
+        print(f"{name:<28} {json.dumps(params):<40} median {stats['median_ms']:>10.3f} ms", file=sys.stderr)
+
+    # --- career_roadmap / Explore search over N colleges ---
+    def colleges_csv(self, size: int) -> str:
+        path = os.path.join(self.workdir, f"colleges_{size}.csv")
+        if not os.path.exists(path):
+            synthetic.make_colleges(size).to_csv(path, index=False)
+        core.COLLEGES_ARTIFACT = ""
+        return path
+
+    def bench_roadmap(self, size: int):
+        core.COLLEGES_CSV = self.colleges_csv(size)
+        careers = list(core.CAREER_TO_DEGREES)
+        self.record("roadmap.cold", {"colleges": size},
+                    measure_once(lambda: core.career_roadmap(careers[0], None)))
+        rng = random.Random(0)
+        cases = [(rng.choice(careers), rng.choice(["", "Jammu", "Srinagar"])) for _ in range(self.repeat)]
+        it = iter(cases * 2)
+        self.record("roadmap.warm", {"colleges": size},
+                    measure(lambda: core.career_roadmap(*next(it)), self.repeat))
+
+    def bench_search(self, size: int):
+        core.COLLEGES_CSV = self.colleges_csv(size)
+        self.record("search.build", {"colleges": size}, measure_once(lambda: core.search_colleges("bca")))
+        for q in ["bca", "government jammu", "srinagr", "b.sc nursing"]:
+            self.record("search.query", {"colleges": size, "q": q},
+                        measure(lambda: core.search_colleges(q), self.repeat))
+
+    # --- calculate_scores / recommend ---
+    def bench_scoring(self, sheets: int):
+        quiz = core.app_quiz_bank().main
+        data = synthetic.make_answer_sheets(quiz, sheets)
+        self.record("scoring.per_sheet", {"sheets": sheets},
+                    measure(lambda: [core.recommend(core.calculate_scores(quiz, a)) for a in data], 3))
+        self.record("scoring.batch", {"sheets": sheets},
+                    measure(lambda: quiz.recommend_batch(*quiz.score_batch(data)), 3))
+
+    # --- login / signup / save_user_data ---
+    def bench_users(self, n: int):
+        path = os.path.join(self.workdir, f"users_{n}.db")
+        core._user_store = get_user_store("sqlite", path, legacy_csv=None)
+        core.ANALYTICS_DB = os.path.join(self.workdir, f"analytics_{n}.db")
+        users = synthetic.make_users(n)
+        core._user_store.upsert_many(users[: n // 2])
+        pending = iter(users[n // 2:])
+
+        def do_signup():
+            u = next(pending)
+            core.signup(u["email"], u["password"], u["name"], u["age"], u["gender"], u["city"], u["state"], u["education"])
+
+        rng = random.Random(0)
+        self.record("users.signup", {"users": n}, measure(do_signup, min(self.repeat, n // 2 - 1)))
+        self.record("users.login", {"users": n},
+                    measure(lambda: core.login(f"student{rng.randrange(n // 2)}@example.com", "pw0"), self.repeat))
+        self.record("users.save_user_data", {"users": n},
+                    measure(lambda: core.save_user_data(f"student{rng.randrange(n // 2)}@example.com",
+                                                        {"city": "Jammu", "your_paths": "Major: Science"}), self.repeat))
+        self.record("users.save_quiz_result", {"users": n},
+                    measure(lambda: core.save_quiz_result(f"student{rng.randrange(n // 2)}@example.com",
+                                                          {"major": "Science", "minor": "Arts", "backup": "Commerce",
+                                                           "scores": {"Science": 5, "Arts": 3, "Commerce": 1}}),
+                            self.repeat))
+        self.record("users.latest_quiz_result", {"users": n},
+                    measure(lambda: core.latest_quiz_result(f"student{rng.randrange(n // 2)}@example.com"), self.repeat))
+
+    # --- fetch_relevant_news post-filter and scoring ---
+    def bench_news(self, articles: int):
+        canned = synthetic.make_articles(FixtureBackend("news_fixtures.json").articles, articles)
+        for stream, kws in STREAM_KEYWORDS.items():
+            self.record("news.score", {"articles": articles, "stream": stream},
+                        measure(lambda: score_articles(canned, kws, 10), self.repeat))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(new: List[Dict], old_path: str):
+    with open(old_path) as f:
+        old = {(r["name"], json.dumps(r["params"], sort_keys=True)): r for r in json.load(f)["results"]}
+    print(f"\n{'benchmark':<28} {'params':<40} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    for r in new:
+        prev = old.get((r["name"], json.dumps(r["params"], sort_keys=True)))
+        if prev:
+            ratio = r["median_ms"] / prev["median_ms"] if prev["median_ms"] else float("inf")
+            print(f"{r['name']:<28} {json.dumps(r['params']):<40} {prev['median_ms']:>10.3f} "
+                  f"{r['median_ms']:>10.3f} {ratio:>6.2f}x")
+
+
+SUITES = ["roadmap", "search", "scoring", "users", "news"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Career Compass hot-path benchmarks")
+    parser.add_argument("-o", "--output", default="-", help="JSON results file (default stdout)")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="college dataset sizes")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--sheets", type=int, default=5000)
+    parser.add_argument("--articles", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--only", default=",".join(SUITES), help=f"comma-separated subset of {SUITES}")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    suites = [s for s in args.only.split(",") if s]
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    with tempfile.TemporaryDirectory(prefix="compass-bench-") as workdir:
+        bench = Bench(workdir, args.repeat)
+        for size in sizes:
+            if "roadmap" in suites:
+                bench.bench_roadmap(size)
+            if "search" in suites:
+                bench.bench_search(size)
+        if "scoring" in suites:
+            bench.bench_scoring(args.sheets)
+        if "users" in suites:
+            bench.bench_users(args.users)
+        if "news" in suites:
+            bench.bench_news(args.articles)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "args": vars(args),
+        },
+        "results": bench.results,
+    }
+    out = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(out)
+    else:
+        with open(args.output, "w") as f:
+            f.write(out + "\n")
+    if args.compare:
+        compare(bench.results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""Load test: many concurrent student sessions driving the real app pages headlessly.
+
+    python -m benchmarks.loadtest --levels 1,10,50 --duration 30 -o load.json
+    USER_STORE_BACKEND=csv python -m benchmarks.loadtest --levels 1,10,25
+
+Each virtual student is one streamlit AppTest session (its own session
+state, shared process-wide caches and user store, like sessions on one
+server). It signs up, logs in, takes the main and specialization quiz,
+opens a roadmap (and its next page), searches Explore and reads
+Notifications. News comes from the offline fixture backend.
+
+AppTest swaps process-global runtime state for every script run, so runs in
+one process are serialized; latency includes the wait for that turn. A
+Streamlit server process is GIL-bound the same way, so this is how one
+server saturates. --processes N spreads the sessions over N processes
+sharing the same users.db / users.csv, like N server replicas.
+
+The app runs from a copy of the repo in a temp directory, so users.db, the
+analytics DB, the event log and caches created by the test never touch the
+working tree; the run fails if it leaves a new file in the directory it was
+started from. For each
+concurrency level the report gives throughput, p50/p95/p99 latency per
+page and the error rate.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SKIP = {".git", "__pycache__", ".news_cache", "requests.jsonl", "users.db", "users.db-wal", "users.db-shm",
+         "users_quiz_results.csv", "colleges.arrow", "colleges.parquet"}
+
+PAGES = ["open", "signup", "login", "quiz.main", "quiz.sub", "roadmap", "roadmap.more", "explore", "notifications"]
+SEARCHES = ["bca", "government jammu", "nursing", "b.sc", "engineering", "kathua"]
+LOCATIONS = ["", "Jammu", "Srinagar", "Kathua", "Anantnag", "Rajouri"]
+
+
+_RUN_LOCK = threading.Lock()
+
+
+def use_workdir(workdir: str):
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+    os.environ["NEWS_BACKEND"] = "fixture"
+    # Absolute, so nothing written at exit (after the chdir back) lands in the caller's directory
+    os.environ["ANALYTICS_DB"] = os.path.join(workdir, "analytics.db")
+    os.environ["COMPASS_EVENT_LOG"] = os.path.join(workdir, "events.jsonl")
+
+
+def init_worker(workdir: str):
+    use_workdir(workdir)
+    import event_log
+
+    event_log.close_in_worker()
+
+
+def close_app_state():
+    """Write out the app's process-wide event log and analytics before the workdir is removed."""
+    for module, close in (("event_log", "close_all"), ("analytics", "flush_all")):
+        if module in sys.modules:
+            getattr(sys.modules[module], close)()
+
+
+def prepare_workdir() -> str:
+    """Copy the app into a temp dir and run from there with offline news."""
+    workdir = tempfile.mkdtemp(prefix="compass-load-")
+    shutil.copytree(REPO, workdir, dirs_exist_ok=True, ignore=lambda d, names: [n for n in names if n in _SKIP])
+    use_workdir(workdir)
+    return workdir
+
+
+def percentile(sorted_ms: List[float], q: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    return sorted_ms[min(len(sorted_ms) - 1, int(round(q * (len(sorted_ms) - 1))))]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {p: [] for p in PAGES}
+        self.errors: Dict[str, int] = {p: 0 for p in PAGES}
+        self.messages: List[str] = []
+        self.journeys = 0
+        self._lock = threading.Lock()
+
+    def to_dict(self) -> Dict:
+        return {"samples": self.samples, "errors": self.errors, "messages": self.messages, "journeys": self.journeys}
+
+    def merge(self, other: Dict):
+        for page in PAGES:
+            self.samples[page] += other["samples"][page]
+            self.errors[page] += other["errors"][page]
+        self.messages += other["messages"][:20 - len(self.messages)]
+        self.journeys += other["journeys"]
+
+    def ok(self, page: str, ms: float):
+        with self._lock:
+            self.samples[page].append(ms)
+
+    def error(self, page: str, message: str):
+        with self._lock:
+            self.errors[page] += 1
+            if len(self.messages) < 20:
+                self.messages.append(f"{page}: {message}")
+
+    def journey_done(self):
+        with self._lock:
+            self.journeys += 1
+
+
+class JourneyError(Exception):
+    pass
+
+
+class Student:
+    """One simulated session walking through the app."""
+
+    def __init__(self, app_path: str, sid: str, rng: random.Random, rec: Recorder, timeout: float):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(app_path, default_timeout=timeout)
+        self.sid = sid
+        self.rng = rng
+        self.rec = rec
+
+    def step(self, page: str, action: Callable[[], object]):
+        start = time.perf_counter()
+        try:
+            with _RUN_LOCK:
+                action()
+        except Exception as e:  # a timeout or crash inside the script run counts against the page
+            self.rec.error(page, f"{type(e).__name__}: {e}")
+            raise JourneyError(page)
+        ms = (time.perf_counter() - start) * 1000
+        if self.at.exception:
+            self.rec.error(page, str(self.at.exception[0].value)[:200])
+            raise JourneyError(page)
+        self.rec.ok(page, ms)
+
+    def button(self, label: str):
+        for b in self.at.button:
+            if b.label == label:
+                return b
+        raise JourneyError(f"no button {label!r}")
+
+    def goto(self, menu: str):
+        self.at.sidebar.radio[0].set_value(menu)
+
+    def answer(self, prefix: str):
+        for r in self.at.radio:
+            if r.key and r.key.startswith(prefix):
+                r.set_value(self.rng.choice(r.options))
+
+    def run(self):
+        at, rng = self.at, self.rng
+        self.step("open", at.run)
+
+        email = f"load-{self.sid}@example.com"
+        at.text_input(key="signup_email").input(email)
+        at.text_input(key="signup_pwd").input("pw")
+        at.text_input(key="signup_name").input(f"Student {self.sid}")
+        at.selectbox(key="signup_gender").select(rng.choice(["Male", "Female", "Other"]))
+        at.text_input(key="signup_city").input(rng.choice(LOCATIONS[1:]))
+        self.step("signup", lambda: self.button("Sign Up").click().run())
+
+        at.text_input(key="login_email").input(email)
+        at.text_input(key="login_pwd").input("pw")
+        self.step("login", lambda: (self.button("Login").click().run(), at.run()))
+
+        self.goto("Quiz")
+        self.step("quiz.main", at.run)
+        self.answer("main_")
+        self.step("quiz.main", lambda: (at.button[0].click().run(), at.run()))
+        if any(b.label == "✨ Submit Specialization Quiz" for b in at.button):
+            self.answer("sub_")
+            self.step("quiz.sub", lambda: self.button("✨ Submit Specialization Quiz").click().run())
+
+        self.goto("Your Paths")
+        self.step("roadmap", at.run)
+        careers = at.selectbox[0].options
+        at.selectbox[0].select(rng.choice(careers))
+        at.text_input[0].input(rng.choice(LOCATIONS))
+        self.step("roadmap", lambda: self.button("Show Roadmap").click().run())
+        if any(b.label == "Show more colleges" for b in at.button):
+            self.step("roadmap.more", lambda: self.button("Show more colleges").click().run())
+
+        self.goto("Explore")
+        self.step("explore", at.run)
+        at.text_input[0].input(rng.choice(SEARCHES))
+        self.step("explore", at.run)
+
+        self.goto("Notifications")
+        self.step("notifications", at.run)
+
+
+def run_sessions(app_path: str, sessions: int, duration: float, journeys: int, timeout: float, seed: int) -> Dict:
+    """Run ``sessions`` concurrent students in this process; raw samples for summarize()."""
+    rec = Recorder()
+    deadline = time.perf_counter() + duration
+    counter = iter(range(10 ** 9))
+    counter_lock = threading.Lock()
+
+    def worker(w: int):
+        rng = random.Random(seed * 1000 + w)
+        done = 0
+        while (journeys and done < journeys) or (not journeys and time.perf_counter() < deadline):
+            with counter_lock:
+                sid = f"{os.getpid()}-{sessions}-{next(counter)}-{rng.randrange(10 ** 6)}"
+            try:
+                Student(app_path, sid, rng, rec, timeout).run()
+                rec.journey_done()
+            except JourneyError:
+                pass
+            except Exception:
+                rec.error("open", traceback.format_exc(limit=1).strip().splitlines()[-1])
+            done += 1
+
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        list(pool.map(worker, range(sessions)))
+    return rec.to_dict()
+
+
+def run_level(app_path: str, concurrency: int, processes: int, duration: float, journeys: int,
+              timeout: float, seed: int) -> Dict:
+    start = time.perf_counter()
+    rec = Recorder()
+    if processes <= 1:
+        rec.merge(run_sessions(app_path, concurrency, duration, journeys, timeout, seed))
+    else:
+        # Split the sessions as evenly as possible; every process shares the same workdir
+        shares = [concurrency // processes + (i < concurrency % processes) for i in range(processes)]
+        with ProcessPoolExecutor(max_workers=processes, initializer=init_worker,
+                                 initargs=(os.path.dirname(app_path),)) as pool:
+            futures = [pool.submit(run_sessions, app_path, n, duration, journeys, timeout, seed * 100 + i)
+                       for i, n in enumerate(shares) if n]
+            for f in futures:
+                rec.merge(f.result())
+    elapsed = time.perf_counter() - start
+
+    pages = {}
+    total_ok = total_err = 0
+    for page in PAGES:
+        ms = sorted(rec.samples[page])
+        err = rec.errors[page]
+        total_ok += len(ms)
+        total_err += err
+        if not ms and not err:
+            continue
+        pages[page] = {
+            "requests": len(ms) + err,
+            "errors": err,
+            "error_rate": round(err / (len(ms) + err), 4),
+            "p50_ms": round(percentile(ms, 0.50), 2),
+            "p95_ms": round(percentile(ms, 0.95), 2),
+            "p99_ms": round(percentile(ms, 0.99), 2),
+            "mean_ms": round(statistics.fmean(ms), 2) if ms else None,
+        }
+    return {
+        "concurrency": concurrency,
+        "processes": processes,
+        "elapsed_s": round(elapsed, 2),
+        "journeys": rec.journeys,
+        "journeys_per_sec": round(rec.journeys / elapsed, 3),
+        "requests_per_sec": round((total_ok + total_err) / elapsed, 2),
+        "error_rate": round(total_err / (total_ok + total_err), 4) if total_ok + total_err else 0.0,
+        "pages": pages,
+        "sample_errors": rec.messages,
+    }
+
+
+def print_level(result: Dict):
+    print(f"\nconcurrency {result['concurrency']}: {result['journeys']} journeys in {result['elapsed_s']}s, "
+          f"{result['journeys_per_sec']} journeys/s, {result['requests_per_sec']} req/s, "
+          f"errors {result['error_rate']:.2%}", file=sys.stderr)
+    print(f"  {'page':<15} {'reqs':>6} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}", file=sys.stderr)
+    for page, s in result["pages"].items():
+        print(f"  {page:<15} {s['requests']:>6} {s['error_rate']:>6.1%} {s['p50_ms']:>9.1f} "
+              f"{s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f}", file=sys.stderr)
+    for msg in result["sample_errors"][:5]:
+        print(f"  ! {msg}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Career Compass concurrent-session load test")
+    parser.add_argument("-o", "--output", default="-", help="JSON results file (default stdout)")
+    parser.add_argument("--levels", default="1,5,10,25", help="comma-separated concurrent session counts")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per level")
+    parser.add_argument("--journeys", type=int, default=0,
+                        help="fixed journeys per session instead of --duration")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="server processes to spread sessions over (default 1)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per script run timeout (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    output = args.output if args.output == "-" else os.path.abspath(args.output)
+    cwd = os.getcwd()
+    before = set(os.listdir(cwd))
+
+    workdir = prepare_workdir()
+    app_path = os.path.join(workdir, "app.py")
+    levels = []
+    try:
+        for level in [int(n) for n in args.levels.split(",") if n]:
+            result = run_level(app_path, level, args.processes, args.duration, args.journeys,
+                               args.timeout, args.seed)
+            print_level(result)
+            levels.append(result)
+    finally:
+        close_app_state()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    stray = sorted(set(os.listdir(cwd)) - before)
+    if stray:
+        sys.exit(f"load test left files in {cwd}: {', '.join(stray)}")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "user_store": os.environ.get("USER_STORE_BACKEND", "sqlite"),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "args": vars(args),
+        },
+        "levels": levels,
+    }
+    out = json.dumps(report, indent=2)
+    if output == "-":
+        print(out)
+    else:
+        with open(output, "w") as f:
+            f.write(out + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Synthetic datasets for benchmarks and load tests."""
+import random
+from typing import Dict, List
+
+import pandas as pd
+
+from core import CAREER_KEYWORDS, ENTRANCE_BY_DEGREE
+
+CITIES = [
+    "Jammu", "Srinagar", "Anantnag", "Baramulla", "Kathua", "Udhampur", "Rajouri", "Poonch", "Doda",
+    "Kupwara", "Pulwama", "Leh", "Kargil", "Delhi", "Mumbai", "Pune", "Chennai", "Kolkata",
+    "Bengaluru", "Hyderabad", "Lucknow", "Jaipur", "Chandigarh", "Amritsar", "Bhopal", "Patna",
+]
+COURSES = list(ENTRANCE_BY_DEGREE) + ["Arts", "Science", "Commerce", "MCA", "MD", "BAMS", "PG in Chemistry"]
+SKILLS = sorted({k for kws in CAREER_KEYWORDS.values() for k in kws} | {"communication", "research", "leadership"})
+NAME_PARTS = ["Government", "Degree", "College", "Institute", "of", "Technology", "Science", "Arts",
+              "Memorial", "National", "Women's", "Medical", "Engineering", "University"]
+
+
+def make_colleges(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        city = rng.choice(CITIES)
+        rows.append({
+            "College": f"{' '.join(rng.sample(NAME_PARTS, 3))} {city} {i}",
+            "Location": city,
+            "Website": f"https://college{i}.example.edu",
+            "Courses": ", ".join(rng.sample(COURSES, rng.randint(1, 4))),
+            "Skills": ", ".join(rng.sample(SKILLS, rng.randint(0, 3))),
+        })
+    return pd.DataFrame(rows)
+
+
+def make_users(n: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    return [{
+        "email": f"student{i}@example.com",
+        "password": f"pw{i}",
+        "name": f"Student {i}",
+        "age": rng.randint(15, 22),
+        "gender": rng.choice(["Male", "Female", "Other"]),
+        "city": rng.choice(CITIES),
+        "state": "J&K",
+        "education": rng.choice(["10th", "12th", "Diploma"]),
+        "avatar": "images/avatar3.png",
+        "your_paths": "",
+    } for i in range(n)]
+
+
+def make_answer_sheets(quiz, n: int, seed: int = 0) -> List[List[str]]:
+    """Random valid answer sheets for a CompiledQuiz."""
+    rng = random.Random(seed)
+    return [[rng.choice(keys) for keys in quiz.option_keys] for _ in range(n)]
+
+
+def make_articles(base: Dict[str, List[Dict]], n: int, seed: int = 0) -> List[Dict]:
+    """Grow the canned news fixtures to ``n`` articles, mixing relevant and irrelevant ones."""
+    rng = random.Random(seed)
+    pool = [a for arts in base.values() for a in arts]
+    out = []
+    for i in range(n):
+        a = dict(rng.choice(pool))
+        a["url"] = f"{a['url']}?v={i}"
+        out.append(a)
+    return out
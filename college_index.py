@@ -0,0 +1,298 @@
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from gazetteer import GeoIndex, normalize_place
+from instrumentation import instrument
+
+
+COLLEGE_COLUMNS = ["College", "Location", "Website", "Courses", "Skills"]
+TOKEN_COLUMNS = ["CourseTokens", "SkillTokens"]
+
+
+def _split_list(cell: str):
+    if not isinstance(cell, str):
+        return []
+    return [c.strip() for c in cell.split(",") if c.strip()]
+
+
+def _file_mtime(path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _token_csr(lists, n_rows: int):
+    """Intern per-row token lists into (vocab, indptr, ids).
+
+    Row ``r``'s tokens are ``vocab[ids[indptr[r]:indptr[r + 1]]]``: one
+    int32 per token instead of a Python list and str objects per row.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if isinstance(lists, pa.ChunkedArray):
+        lists = lists.combine_chunks()
+    elif not isinstance(lists, pa.Array):
+        lists = pa.array(lists, type=pa.list_(pa.string()))
+    rows = pc.list_parent_indices(lists)
+    values = pc.utf8_trim_whitespace(pc.list_flatten(lists))
+    keep = pc.fill_null(pc.not_equal(values, ""), False)
+    rows = rows.filter(keep).to_numpy()
+    encoded = pc.dictionary_encode(pc.utf8_lower(values.filter(keep)))
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return encoded.dictionary.to_pylist(), indptr, encoded.indices.to_numpy().astype(np.int32)
+
+
+def _split_column(table, column: str):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if column not in table.column_names:
+        return pa.array([[]] * table.num_rows, type=pa.list_(pa.string()))
+    return pc.split_pattern(table.column(column), ",")
+
+
+def _vocab_mask(vocab: List[str], needles: List[str]) -> np.ndarray:
+    """vocab entries containing any of ``needles`` (substring, like the old per-row scan)."""
+    return np.fromiter((any(n in t for n in needles) for t in vocab), dtype=bool, count=len(vocab))
+
+
+def _clean_table(table):
+    """The college columns of ``table`` with every value a stripped string and blanks as ""."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    present = [c for c in COLLEGE_COLUMNS if c in table.column_names]
+    return pa.table({c: pc.utf8_trim_whitespace(pc.fill_null(pc.cast(table.column(c), pa.string()), ""))
+                     for c in present})
+
+
+def _read_csv_table(path: str):
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    return _clean_table(pacsv.read_csv(path, convert_options=pacsv.ConvertOptions(
+        column_types={c: pa.string() for c in COLLEGE_COLUMNS}, strings_can_be_null=True)))
+
+
+def _column_codes(column):
+    """(int32 codes, labels) of a string column, labels in order of first appearance."""
+    import pyarrow.compute as pc
+
+    # The encoder keeps one memo table across chunks, so every chunk's indices
+    # already point into the last chunk's dictionary; no unify pass needed.
+    encoded = pc.dictionary_encode(column)
+    labels = encoded.chunk(encoded.num_chunks - 1).dictionary if encoded.num_chunks else None
+    codes = np.concatenate([c.indices.to_numpy() for c in encoded.chunks] or [np.zeros(0, np.int32)])
+    return codes.astype(np.int32, copy=False), labels
+
+
+class CollegeIndex:
+    """Interned, column-oriented view of a colleges CSV, built once per file version.
+
+    The catalogue itself stays an Arrow table (College, Location, Website,
+    Courses, Skills). Opened from an Arrow artifact it is memory-mapped, so
+    every server process shares the same page-cache copy and keeps only
+    the small arrays below privately. Courses and skills are lower-cased
+    and interned into a vocabulary, and each row's tokens are stored as int32
+    ids in CSR layout. Matching a degree or keyword tests the (small)
+    vocabulary once and then works on the id arrays, so it does not loop
+    over rows in Python. Locations are int32 codes, and college names are
+    a sort rank; full rows are only materialized in ``records``/``frame``.
+    """
+
+    def __init__(self, table, mtime: Optional[float] = None, course_tokens=None, skill_tokens=None):
+        """``table`` is an Arrow table of cleaned college columns, as read by ``from_path``; a DataFrame is cleaned first."""
+        import pyarrow as pa
+
+        if isinstance(table, pd.DataFrame):
+            table = _clean_table(pa.Table.from_pandas(table, preserve_index=False))
+        self.shown_columns = [c for c in COLLEGE_COLUMNS if c in table.column_names]
+        self.table = table.select(self.shown_columns)
+        n = self.table.num_rows
+        self.mtime = mtime
+
+        self.course_vocab, self.course_indptr, self.course_ids = _token_csr(
+            _split_column(self.table, "Courses") if course_tokens is None else course_tokens, n)
+        self.skill_vocab, self.skill_indptr, self.skill_ids = _token_csr(
+            _split_column(self.table, "Skills") if skill_tokens is None else skill_tokens, n)
+
+        # Rows whose shown columns repeat an earlier row; roadmaps list each college once
+        codes = pd.DataFrame({c: _column_codes(self.table.column(c))[0] for c in self.shown_columns})
+        self.is_duplicate: np.ndarray = codes.duplicated().to_numpy() if n else np.zeros(0, dtype=bool)
+        del codes
+        # Position of each row when sorted by College name (stable, so equal names keep row order)
+        self.name_rank = np.zeros(n, dtype=np.int32)
+        if "College" in self.shown_columns and n:
+            import pyarrow.compute as pc
+            self.name_rank[pc.sort_indices(self.table.column("College")).to_numpy()] = np.arange(n, dtype=np.int32)
+        if "Location" in self.shown_columns:
+            self.location_codes, labels = _column_codes(self.table.column("Location"))
+            self.location_labels = labels.to_pylist() if labels is not None else []
+        else:
+            self.location_codes, self.location_labels = np.full(n, -1, dtype=np.int32), []
+        # Padded so location_rows can test whole words with a plain substring search
+        self.location_keys = [f" {normalize_place(loc)} " for loc in self.location_labels]
+
+        self._score_cache: Dict[tuple, Dict[int, float]] = {}
+        self._location_cache: Dict[str, frozenset] = {}
+        self._geo: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    @instrument("college_index.build")
+    def from_csv(cls, path: str) -> "CollegeIndex":
+        import pyarrow as pa
+
+        mtime = _file_mtime(path)
+        if mtime is not None:
+            table = _read_csv_table(path)
+        else:
+            table = pa.table({c: pa.array([], pa.string()) for c in COLLEGE_COLUMNS})
+        return cls(table, mtime)
+
+    @classmethod
+    @instrument("college_index.build")
+    def from_artifact(cls, path: str) -> "CollegeIndex":
+        """Open an ingest.py artifact or mirror as is: written clean, so nothing is parsed, copied or re-cleaned.
+
+        Arrow IPC files are memory-mapped; Parquet has to be decoded into
+        process memory, so prefer .arrow when several processes serve.
+        """
+        from ingest import read_artifact
+
+        mtime = _file_mtime(path)
+        table = read_artifact(path)
+        return cls(table, mtime, table.column("CourseTokens"), table.column("SkillTokens"))
+
+    @classmethod
+    def from_path(cls, path: str) -> "CollegeIndex":
+        if path.endswith(".arrow") or path.endswith(".parquet"):
+            return cls.from_artifact(path)
+        return cls.from_csv(path)
+
+    def __len__(self):
+        return self.table.num_rows
+
+    @staticmethod
+    def _token_rows(indptr: np.ndarray) -> np.ndarray:
+        """Row id of every token in a CSR id array."""
+        return np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+
+    def _degree_counts(self, degrees: List[str]) -> np.ndarray:
+        """Per row, how many course tokens contain one of ``degrees``."""
+        hit = _vocab_mask(self.course_vocab, [d.lower() for d in degrees])[self.course_ids]
+        return np.bincount(self._token_rows(self.course_indptr)[hit], minlength=len(self))
+
+    def _skill_hits(self, keywords: List[str]) -> np.ndarray:
+        """Per row, how many of ``keywords`` occur in at least one skill token."""
+        token_rows = self._token_rows(self.skill_indptr)
+        hits = np.zeros(len(self), dtype=np.int32)
+        for k in keywords:
+            has = np.zeros(len(self), dtype=bool)
+            has[token_rows[_vocab_mask(self.skill_vocab, [k])[self.skill_ids]]] = True
+            hits += has
+        return hits
+
+    def career_scores(self, degrees: List[str], keywords: List[str]) -> Dict[int, float]:
+        """{row_id: score} for every row offering one of ``degrees``, computed once per (degrees, keywords)."""
+        key = (tuple(degrees), tuple(keywords))
+        scores = self._score_cache.get(key)
+        if scores is None:
+            counts = self._degree_counts(degrees)
+            rows = np.flatnonzero(counts)
+            values = counts[rows] + 0.5 * self._skill_hits(keywords)[rows]
+            scores = dict(zip(rows.tolist(), values.tolist()))
+            with self._lock:
+                self._score_cache[key] = scores
+        return scores
+
+    def location_rows(self, text: str) -> frozenset:
+        """Rows whose Location contains the place typed in ``text``.
+
+        Both sides are normalized like gazetteer names (lower case, punctuation
+        to spaces) and compared as whole words, so "jammu" matches
+        "Gandhi Nagar, Jammu" but not "Jammuwala", and characters such as
+        "(" or "*" are just text.
+        """
+        key = f" {normalize_place(text)} "
+        if not key.strip():
+            return frozenset()
+        rows = self._location_cache.get(key)
+        if rows is None:
+            matched = [i for i, loc in enumerate(self.location_keys) if key in loc]
+            rows = frozenset(np.flatnonzero(np.isin(self.location_codes, matched)).tolist())
+            with self._lock:
+                if len(self._location_cache) >= 256:
+                    self._location_cache.clear()
+                self._location_cache[key] = rows
+        return rows
+
+    def geo_index(self, gazetteer) -> GeoIndex:
+        """Grid index of row coordinates, with each distinct Location resolved once per gazetteer."""
+        geo = self._geo
+        if geo is None or geo[0] is not gazetteer:
+            places = [gazetteer.resolve(loc) for loc in self.location_labels]
+            # One extra slot for rows without a Location (code -1)
+            lats = np.array([p.lat if p else np.nan for p in places] + [np.nan], dtype=np.float64)
+            lons = np.array([p.lon if p else np.nan for p in places] + [np.nan], dtype=np.float64)
+            geo = (gazetteer, GeoIndex(lats[self.location_codes], lons[self.location_codes]))
+            with self._lock:
+                self._geo = geo
+        return geo[1]
+
+    def _take(self, rows: List[int]):
+        import pyarrow as pa
+        return self.table.take(pa.array(rows, type=pa.int64()))
+
+    def records(self, rows: List[int]) -> List[Dict]:
+        return self._take(rows).to_pylist()
+
+    def frame(self, rows: Optional[List[int]] = None) -> pd.DataFrame:
+        """The catalogue (or ``rows`` of it, in that order) as a DataFrame whose columns wrap the Arrow data."""
+        table = self.table if rows is None else self._take(rows)
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def write_mirror(csv_path: str, out_path: str):
+    """Save a colleges CSV as an Arrow artifact that from_artifact reads back into the same index from_csv builds.
+
+    Values are cleaned exactly as from_csv cleans them but nothing is merged
+    (unlike ingest.py), so a roadmap from the mirror matches one from the CSV.
+    """
+    from ingest import write_artifact
+
+    table = _read_csv_table(csv_path)
+    for name, column in zip(TOKEN_COLUMNS, ("Courses", "Skills")):
+        table = table.append_column(name, _split_column(table, column))
+    write_artifact(table, out_path)
+
+
+_indexes: Dict[str, CollegeIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_college_index(path: str) -> CollegeIndex:
+    """Return the process-wide index for ``path`` (CSV or ingest artifact), rebuilding it if the file changed."""
+    mtime = _file_mtime(path)
+    idx = _indexes.get(path)
+    if idx is not None and idx.mtime == mtime:
+        return idx
+    with _indexes_lock:
+        idx = _indexes.get(path)
+        if idx is None or idx.mtime != mtime:
+            idx = CollegeIndex.from_path(path)
+            _indexes[path] = idx
+    return idx
+
+
+def clear_college_indexes():
+    """Drop every cached index; the next get_college_index rebuilds from disk."""
+    with _indexes_lock:
+        _indexes.clear()
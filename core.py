@@ -0,0 +1,584 @@
+"""Career Compass logic with no Streamlit dependency.
+
+app.py renders the pages on top of this module; batch.py and other tools
+import it directly.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import List, Dict
+
+import numpy as np
+import pandas as pd
+
+from analytics import CohortAnalytics, get_analytics
+from avatar_store import AvatarStore, get_avatar_store
+from college_index import get_college_index, clear_college_indexes, write_mirror
+from event_log import EventLog, get_event_log
+from gazetteer import get_gazetteer, clear_gazetteers, haversine_km
+from instrumentation import incr, instrument
+from interest_index import InterestIndex
+from search_index import get_search_index
+from user_store import UserStore, format_paths, get_user_store, make_result
+from news_aggregator import NewsAggregator, get_news_aggregator
+from news_client import NewsClient, get_news_client
+from quiz_engine import CompiledQuiz, get_quiz_bank, clear_quiz_banks
+from result_cache import SizedLRU
+from shared_cache import SharedCache, get_shared_cache, shared_copy
+from topk import top_k, encode_cursor, decode_cursor, NUMBER
+
+
+# ----------------------------- CONFIG -----------------------------
+USERS_CSV = "users.csv"
+USERS_DB = "users.db"
+USERS_JOURNAL = "users.journal"
+USER_STORE_BACKEND = os.environ.get("USER_STORE_BACKEND", "sqlite")  # or "journal" / "csv"
+ANALYTICS_DB = os.environ.get("ANALYTICS_DB", "analytics.db")
+COLLEGES_CSV = "jk_colleges.csv"
+# Built by ingest.py; used instead of COLLEGES_CSV when present
+COLLEGES_ARTIFACT = os.environ.get("COLLEGES_ARTIFACT", "colleges.arrow")
+AVATAR_FOLDER = "images"
+# Uploaded avatars, stored by content hash with a pre-built sidebar thumbnail
+AVATAR_STORE_DIR = os.path.join(AVATAR_FOLDER, "avatars")
+AVATAR_THUMB_PX = 80
+QUIZ_FILE = "career_questions.json"
+API_KEY = os.environ.get("NEWSAPI_KEY", '1544f28739f54713873b32e7687dac2d')
+BASE_URL = 'https://newsapi.org/v2/everything'
+NEWS_BACKEND = os.environ.get("NEWS_BACKEND", "newsapi")  # "fixture" serves news_fixtures.json offline
+NEWS_FIXTURES = "news_fixtures.json"
+NEWS_CACHE_DIR = ".news_cache"
+NEWS_TTL = 15 * 60
+NEWS_DAYS, NEWS_PAGE_SIZE, NEWS_MAX_ITEMS = 14, 30, 10
+NEWS_PREWARM_INTERVAL = 10 * 60
+# Aggregation: pages per query variant, parallel requests, per-request and overall seconds
+NEWS_MAX_PAGES, NEWS_CONCURRENCY, NEWS_REQUEST_TIMEOUT, NEWS_DEADLINE = 2, 4, 8, 20
+SEARCH_LIMIT = 200
+GAZETTEER_FILE = "gazetteer.csv"
+# Colleges this close to each other count as equally near; score decides within a band
+GEO_BAND_KM = 25
+# Cache shared by all server processes: "" (off), "resp://127.0.0.1:6390" for the stand-in
+# started with `python shared_cache.py serve`, or "redis://host:6379/0"
+SHARED_CACHE_URL = os.environ.get("SHARED_CACHE_URL", "")
+# Directory (e.g. /dev/shm/compass) where COLLEGES_CSV is converted once and memory-mapped by every process
+SHARED_DATA_DIR = os.environ.get("SHARED_DATA_DIR", "")
+# One JSON line per page view, roadmap, search, quiz submission and news fetch; "" turns it off.
+# Summarize with `python event_log.py summarize events.jsonl`
+EVENT_LOG = os.environ.get("COMPASS_EVENT_LOG", "events.jsonl")
+
+# ----------------------------- CAREER ROADMAP DATA -----------------------------
+CAREER_TO_DEGREES = {
+    # tech/data
+    "Data Analyst": ["B.Sc", "BCA", "B.Com"],
+    "Software Developer": ["BCA", "B.Sc", "B.Tech", "BE"],
+    "AI/ML Engineer": ["B.Tech", "BE", "B.Sc"],
+    # business/arts
+    "Business Analyst": ["B.Com", "BBA", "B.Sc"],
+    "Graphic Designer": ["BA", "Arts"],
+    # medical/health
+    "Doctor (MBBS)": ["MBBS"],
+    "Dentist (BDS)": ["BDS"],
+    "Nurse": ["B.Sc. Nursing"],
+    # architecture
+    "Architect": ["B.Arch"],
+}
+
+CAREER_KEYWORDS = {
+    "Data Analyst": ["data", "statistics", "analytics", "python"],
+    "Software Developer": ["programming", "software", "computer"],
+    "AI/ML Engineer": ["ai", "ml", "machine", "data"],
+    "Business Analyst": ["finance", "business", "analytics"],
+    "Graphic Designer": ["design", "art", "media"],
+    "Doctor (MBBS)": ["medicine", "clinical", "biology"],
+    "Dentist (BDS)": ["dental", "oral"],
+    "Nurse": ["nursing", "health"],
+    "Architect": ["architecture", "design"],
+}
+
+ENTRANCE_BY_DEGREE = {
+    "BA": {"exam": "CUET-UG (where applicable)", "ref": "https://cuet.nta.nic.in/"},
+    "B.Sc": {"exam": "CUET-UG (where applicable)", "ref": "https://cuet.nta.nic.in/"},
+    "B.Com": {"exam": "CUET-UG (where applicable)", "ref": "https://cuet.nta.nic.in/"},
+    "BBA": {"exam": "CUET-UG / Univ process", "ref": "https://cuet.nta.nic.in/"},
+    "BCA": {"exam": "CUET-UG / Univ process", "ref": "https://cuet.nta.nic.in/"},
+    "B.Tech": {"exam": "JEE Main", "ref": "https://jeemain.nta.nic.in/"},
+    "BE": {"exam": "JEE Main", "ref": "https://jeemain.nta.nic.in/"},
+    "MBBS": {"exam": "NEET-UG", "ref": "https://neet.nta.nic.in/"},
+    "BDS": {"exam": "NEET-UG", "ref": "https://neet.nta.nic.in/"},
+    "B.Arch": {"exam": "JEE Main (Paper 2) / NATA (varies)", "ref": "https://jeemain.nta.nic.in/"},
+    "B.Sc. Nursing": {"exam": "University/State process", "ref": ""},
+}
+
+MOOC_BY_CAREER = {
+    "Data Analyst": [
+        {"title": "Python for Data Science", "platform": "NPTEL/SWAYAM", "ref": "https://onlinecourses.nptel.ac.in/"},
+        {"title": "Statistics for Data Analysis", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
+    ],
+    "Software Developer": [
+        {"title": "Data Structures & Algorithms", "platform": "NPTEL", "ref": "https://onlinecourses.nptel.ac.in/"},
+        {"title": "Databases / SQL", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
+    ],
+    "AI/ML Engineer": [
+        {"title": "Intro to Machine Learning", "platform": "NPTEL", "ref": "https://onlinecourses.nptel.ac.in/"},
+    ],
+    "Business Analyst": [
+        {"title": "Financial Accounting", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
+        {"title": "Business Analytics", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
+    ],
+    "Graphic Designer": [
+        {"title": "Design Basics / Visual Communication", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
+    ],
+    "Doctor (MBBS)": [
+        {"title": "Human Physiology Basics", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
+    ],
+    "Dentist (BDS)": [
+        {"title": "Oral Biology Foundations", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
+    ],
+    "Nurse": [
+        {"title": "Foundations of Nursing", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
+    ],
+    "Architect": [
+        {"title": "Architectural Graphics", "platform": "SWAYAM", "ref": "https://swayam.gov.in/"},
+    ],
+}
+
+# Quiz outcomes (career_questions.json streams and specializations) that describe each career;
+# the option texts that score them feed the free-text interest index
+CAREER_QUIZ_LABELS = {
+    "Data Analyst": ["Analyst", "Economist"],
+    "Software Developer": ["Engineering", "Software", "Hacker", "GameDev"],
+    "AI/ML Engineer": ["Engineering", "AI", "Robotics"],
+    "Business Analyst": ["Commerce", "Analyst", "BusinessAdmin", "Manager"],
+    "Graphic Designer": ["Arts", "Artist", "Filmmaker"],
+    "Doctor (MBBS)": ["Medical", "Doctor"],
+    "Dentist (BDS)": ["Medical", "Doctor"],
+    "Nurse": ["Medical", "Nursing", "Paramedical"],
+    "Architect": ["Engineering", "CivilArch"],
+}
+
+ROADMAP_CACHE_ENTRIES = 1024
+ROADMAP_CACHE_BYTES = 32 * 1024 * 1024
+ROADMAP_SHARED_TTL = 6 * 3600
+_roadmap_cache = SizedLRU(ROADMAP_CACHE_ENTRIES, ROADMAP_CACHE_BYTES)
+
+def _roadmap_tables_version() -> str:
+    # Cheap enough per call (the tables are tiny) and catches any in-process edit;
+    # a digest rather than hash() so every process computes the same shared-cache key
+    return hashlib.sha1(repr((CAREER_TO_DEGREES, CAREER_KEYWORDS, ENTRANCE_BY_DEGREE, MOOC_BY_CAREER)).encode()).hexdigest()
+
+def roadmap_cache_stats() -> Dict[str, int]:
+    return _roadmap_cache.stats()
+
+@instrument("career_roadmap")
+def career_roadmap(career: str, location_pref: str = None, limit: int = 20, cursor: str = None) -> Dict:
+    """Roadmap for ``career``, memoized per (career, location, limit, cursor).
+
+    ``colleges`` holds one page; pass the returned ``next_cursor`` back to get
+    the following page (it is None on the last one).
+
+    With a ``location_pref`` the gazetteer can place, colleges are ranked by
+    distance from it (in GEO_BAND_KM bands, then by score) after exact
+    location matches, and each college carries ``distance_km``.
+
+    The cache is dropped whenever the colleges file or gazetteer is reloaded
+    or a mapping table changes. With SHARED_CACHE_URL set, a roadmap built by
+    one server process is reused by the others, and ``python shared_cache.py
+    bump roadmap`` drops them everywhere. The returned dict is shared; treat
+    it as read-only.
+    """
+    start = time.perf_counter()
+    source = colleges_source()
+    index = get_college_index(source)
+    gazetteer = get_gazetteer(GAZETTEER_FILE)
+    tables = _roadmap_tables_version()
+    shared = app_shared_cache()
+    version = (index, gazetteer, tables, shared.generation("roadmap") if shared else None)
+    key = (career, location_pref or None, limit, cursor)
+    result = _roadmap_cache.get(key, version)
+    tier = "local"
+    if result is not None:
+        incr("roadmap_cache.hit")
+    else:
+        incr("roadmap_cache.miss")
+        # Same data files and tables give the same key in every process
+        shared_key = (source, index.mtime, gazetteer.mtime, tables) + key
+        result = shared.get("roadmap", shared_key) if shared else None
+        if result is not None:
+            incr("roadmap_cache.shared_hit")
+            tier = "shared"
+        else:
+            result = _build_roadmap(index, career, location_pref, limit, cursor)
+            tier = None
+            if shared:
+                shared.put("roadmap", shared_key, result, ROADMAP_SHARED_TTL)
+        _roadmap_cache.put(key, result, version)
+    log_event("roadmap", career=career, location=location_pref or None, more=bool(cursor),
+              colleges=len(result["colleges"]), ms=_ms_since(start), cache_hit=tier is not None, cache=tier)
+    return result
+
+# Field types of the sort keys below, used to validate pagination cursors
+_ROADMAP_KEY_TYPES = (int, NUMBER, int, int)
+_NEARBY_KEY_TYPES = (int, int, NUMBER, int, int)
+
+def _build_roadmap(index, career: str, location_pref: str = None, limit: int = 20, cursor: str = None) -> Dict:
+    degrees = CAREER_TO_DEGREES.get(career, [])
+    if not degrees:
+        return {"career": career, "message": "No mapping found", "colleges": [], "steps": []}
+
+    kw = [k.lower() for k in CAREER_KEYWORDS.get(career, [])]
+    scores = index.career_scores(degrees, kw)
+    loc_rows = index.location_rows(location_pref) if location_pref else frozenset()
+
+    origin = get_gazetteer(GAZETTEER_FILE).resolve(location_pref) if location_pref else None
+    after = decode_cursor(cursor, _NEARBY_KEY_TYPES if origin is not None else _ROADMAP_KEY_TYPES)
+    if origin is None:
+        # Rank by (location match, score, name); a heap keeps only limit+1 keys,
+        # and the row id makes keys unique so the cursor can resume after any of them.
+        name_rank = index.name_rank
+        keys = (
+            (-(r in loc_rows), -s, int(name_rank[r]), r)
+            for r, s in scores.items() if not index.is_duplicate[r]
+        )
+    else:
+        keys = _nearby_keys(index, origin, scores, loc_rows, limit, after)
+    page, last = top_k(keys, limit, after=after)
+    colleges = index.records([key[-1] for key in page])
+    if origin is not None:
+        geo = index.geo_index(get_gazetteer(GAZETTEER_FILE))
+        rows = [key[-1] for key in page]
+        for c, km in zip(colleges, haversine_km(origin.lat, origin.lon, geo.lats[rows], geo.lons[rows])):
+            c["distance_km"] = None if np.isnan(km) else round(float(km), 1)
+
+    entrances = []
+    seen = set()
+    for d in degrees:
+        info = ENTRANCE_BY_DEGREE.get(d)
+        if info:
+            key = (info["exam"], info["ref"])
+            if key not in seen:
+                entrances.append(info)
+                seen.add(key)
+
+    steps = [
+        f"Match your 10+2 subjects to degree options for {career} and shortlist colleges offering {', '.join(degrees)}",
+        "Pick the admission route that applies to your shortlist (CUET‑UG/JEE Main/NEET‑UG or university process) and calendar deadlines",
+        "Apply to 5–8 colleges across difficulty tiers; prepare required documents and subject prerequisites",
+        "Enroll in 1 public MOOC per term aligned to core skills; build a small project or portfolio artifact each semester",
+        "Do a short internship or supervised project each summer; expand your portfolio or clinical/community experience",
+        "In final year, add a capstone aligned to the target role and prepare for placements or PG entrance"
+    ]
+
+    return {
+        "career": career,
+        "degrees": degrees,
+        "entrance": entrances,
+        "colleges": colleges,
+        "moocs": MOOC_BY_CAREER.get(career, []),
+        "steps": steps,
+        "next_cursor": encode_cursor(last),
+    }
+
+_UNLOCATED_BAND = 10 ** 6
+
+def _nearby_keys(index, origin, scores, loc_rows, limit, after) -> List[tuple]:
+    """Sort keys (location match, distance band, score, name rank, row) for the rows that can reach this page.
+
+    Rings of the grid index are visited outwards from ``origin`` and the walk
+    stops once limit+1 keys are known to beat anything further out, so a
+    nearby query does not touch colleges on the other side of the country.
+    """
+    geo = index.geo_index(get_gazetteer(GAZETTEER_FILE))
+
+    def band(km):
+        return _UNLOCATED_BAND if np.isnan(km) else int(km // GEO_BAND_KM)
+
+    keys, bands, exact = [], {}, 0
+
+    def add(r, km, tier):
+        nonlocal exact
+        if r not in scores or index.is_duplicate[r]:
+            return
+        key = (tier, band(km), -scores[r], int(index.name_rank[r]), r)
+        if after is not None and key <= after:
+            return
+        keys.append(key)
+        if tier:
+            exact += 1
+        else:
+            bands[key[1]] = bands.get(key[1], 0) + 1
+
+    matched = [r for r in loc_rows if r in scores]
+    for r, km in zip(matched, haversine_km(origin.lat, origin.lon, geo.lats[matched], geo.lons[matched])):
+        add(r, km, -1)
+    for min_km, rows, kms in geo.rings(origin.lat, origin.lon):
+        for r, km in zip(rows.tolist(), kms.tolist()):
+            if r not in loc_rows:
+                add(r, km, 0)
+        # Anything not visited yet lands in band >= bound, so strictly lower bands are final
+        bound = int(min_km // GEO_BAND_KM)
+        if exact + sum(n for b, n in bands.items() if b < bound) > limit:
+            return keys
+    for r in geo.unlocated.tolist():
+        if r not in loc_rows:
+            add(r, float("nan"), 0)
+    return keys
+
+# ----------------------------- HOME PAGE CONTENT -----------------------------
+FUN_FACTS = [
+    "The fastest-growing career in India is **Data Science**, expected to create 11M+ jobs by 2030.",
+    "The average salary of an **AI Engineer** in India is ₹8–12 LPA for freshers.",
+    "**Graphic Designers** are now in demand in media, healthcare & finance sectors.",
+    "By 2030, **50% of jobs will require new skills** due to automation and AI.",
+    "India produces **1.5 million engineers** every year, but only ~20% work in core fields."
+]
+
+SUCCESS_STORIES = [
+    {"name":"Aditi Sharma","story":"From a small town in J&K, Aditi cracked **IIT-JEE** and is now a researcher in AI at Google.","quote":"Never doubt your potential, guidance + hard work = success!"},
+    {"name":"Ravi Kumar","story":"Started as a diploma student in civil engineering, Ravi built a startup in **Sustainable Housing**.","quote":"Your background doesn’t define you, your choices do."},
+    {"name":"Mehak Ali","story":"A passionate artist who turned her hobby into a career in **Graphic Design** freelancing worldwide.","quote":"Follow your passion, and success will follow you."}
+]
+
+# ----------------------------- LOAD DATA -----------------------------
+def colleges_source() -> str:
+    if COLLEGES_ARTIFACT and os.path.exists(COLLEGES_ARTIFACT):
+        return COLLEGES_ARTIFACT
+    if SHARED_DATA_DIR and os.path.exists(COLLEGES_CSV):
+        return shared_copy(COLLEGES_CSV, SHARED_DATA_DIR, write_mirror)
+    return COLLEGES_CSV
+
+@instrument("load_colleges")
+def load_colleges():
+    # Explore shows the index's Arrow table through a wrapping frame instead of its own copy
+    if os.path.exists(colleges_source()):
+        return get_college_index(colleges_source()).frame()
+    else:
+        df = pd.DataFrame({
+            "College":["SKUAST-Kashmir","GCET Jammu"],
+            "Location":["Srinagar","Jammu"],
+            "Website":["https://www.skuastkashmir.ac.in","https://gcetjammu.ac.in"],
+            "Courses":["Engineering,Science","Commerce,Arts,Engineering"]
+        })
+        df.to_csv(COLLEGES_CSV,index=False)
+        return df
+
+def reload_data():
+    """Forget every loaded dataset and memoized roadmap so the next request reads the files again.
+
+    Search and interest indexes are keyed by the CollegeIndex/QuizBank they
+    were built from, so they rebuild along with them.
+    """
+    clear_college_indexes()
+    clear_quiz_banks()
+    clear_gazetteers()
+    _roadmap_cache.clear()
+
+@instrument("load_quiz")
+def load_quiz():
+    if os.path.exists(QUIZ_FILE):
+        with open(QUIZ_FILE,"r") as f:
+            return json.load(f)
+    else:
+        return {"main": [], "sub": {}}
+
+# ----------------------------- SEARCH -----------------------------
+@instrument("search_colleges")
+def search_colleges(query: str, limit: int = SEARCH_LIMIT) -> pd.DataFrame:
+    start = time.perf_counter()
+    source = colleges_source()
+    index = get_college_index(source)
+    rows = get_search_index(source).search(query, limit)
+    log_event("search", query=query, rows=len(rows), ms=_ms_since(start))
+    return index.frame(rows)
+
+# ----------------------------- INTEREST MATCHING -----------------------------
+_interest_index = (None, None)
+_interest_index_lock = threading.Lock()
+
+def career_documents(index, bank) -> Dict[str, List]:
+    """(text, weight) fragments describing each roadmap career, for the interest index."""
+    docs = {}
+    for career, degrees in CAREER_TO_DEGREES.items():
+        frags = [(career, 3.0)] + [(k, 3.0) for k in CAREER_KEYWORDS.get(career, [])]
+        frags += [(d, 2.0) for d in degrees]
+        frags += [(m["title"], 2.0) for m in MOOC_BY_CAREER.get(career, [])]
+        ds = [d.lower() for d in degrees]
+        frags += [(course, 1.0) for course in index.course_vocab if any(d in course for d in ds)]
+        labels = set(CAREER_QUIZ_LABELS.get(career, []))
+        for quiz in [bank.main, *bank.sub.values()]:
+            for s in labels & set(quiz.streams):
+                si = quiz.stream_index[s]
+                for qi, texts in enumerate(quiz.option_texts):
+                    frags += [(t, 0.5 * float(quiz.weights[qi, oi, si]))
+                              for oi, t in enumerate(texts) if quiz.weights[qi, oi, si] > 0]
+        docs[career] = frags
+    return docs
+
+def app_interest_index() -> InterestIndex:
+    """Built once per (colleges file, quiz file, mapping tables) version, shared by every session."""
+    global _interest_index
+    index, bank = get_college_index(colleges_source()), app_quiz_bank()
+    version = (index, bank, _roadmap_tables_version(), hash(repr(CAREER_QUIZ_LABELS)))
+    if _interest_index[0] != version:
+        with _interest_index_lock:
+            if _interest_index[0] != version:
+                _interest_index = (version, InterestIndex(career_documents(index, bank)))
+    return _interest_index[1]
+
+@instrument("suggest_careers")
+def suggest_careers(text: str, k: int = 3) -> List[tuple]:
+    """[(career, similarity)] for a free-text description of a student's interests, best first."""
+    return app_interest_index().suggest(text, k)
+
+def suggest_careers_batch(texts: List[str], k: int = 3) -> List[List[tuple]]:
+    return app_interest_index().suggest_batch(texts, k)
+
+# ----------------------------- SHARED RESOURCES -----------------------------
+_user_store = None
+_user_store_lock = threading.Lock()
+
+def app_user_store() -> UserStore:
+    global _user_store
+    with _user_store_lock:
+        if _user_store is None:
+            if USER_STORE_BACKEND == "csv":
+                _user_store = get_user_store("csv", USERS_CSV)
+            elif USER_STORE_BACKEND == "journal":
+                _user_store = get_user_store("journal", USERS_JOURNAL, legacy_csv=USERS_CSV)
+            else:
+                _user_store = get_user_store(USER_STORE_BACKEND, USERS_DB, legacy_csv=USERS_CSV)
+    return _user_store
+
+def app_quiz_bank():
+    return get_quiz_bank(QUIZ_FILE)
+
+def app_shared_cache() -> SharedCache:
+    """The cross-process cache tier, or None when SHARED_CACHE_URL is unset."""
+    return get_shared_cache(SHARED_CACHE_URL)
+
+def app_news_client() -> NewsClient:
+    return get_news_client(NEWS_BACKEND, API_KEY, BASE_URL, NEWS_FIXTURES, ttl=NEWS_TTL, cache_dir=NEWS_CACHE_DIR,
+                           shared=app_shared_cache(), timeout=NEWS_REQUEST_TIMEOUT)
+
+def app_news_aggregator() -> NewsAggregator:
+    return get_news_aggregator(app_news_client(), max_pages=NEWS_MAX_PAGES, concurrency=NEWS_CONCURRENCY,
+                               deadline=NEWS_DEADLINE)
+
+def app_analytics() -> CohortAnalytics:
+    return get_analytics(ANALYTICS_DB, app_user_store())
+
+def app_avatar_store() -> AvatarStore:
+    return get_avatar_store(AVATAR_STORE_DIR, AVATAR_THUMB_PX)
+
+def app_event_log() -> EventLog:
+    """The process-wide event log, or None when EVENT_LOG is empty."""
+    return get_event_log(EVENT_LOG)
+
+def log_event(event: str, **fields):
+    """Queue one event line; the file is written by the log's own thread."""
+    log = app_event_log()
+    if log is not None:
+        log.emit(event, **fields)
+
+def _ms_since(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
+
+# ----------------------------- AUTH FUNCTIONS -----------------------------
+@instrument("login")
+def login(email,password):
+    user = app_user_store().get(email)
+    if user and str(user["password"])==password:
+        return user
+    return None
+
+@instrument("signup")
+def signup(email, password, name, age, gender, city, state, education):
+    if app_user_store().exists(email):
+        return False
+    # Default avatar based on gender
+    if gender=="Male":
+        avatar_file = os.path.join(AVATAR_FOLDER,"avatar2.png")
+    elif gender=="Female":
+        avatar_file = os.path.join(AVATAR_FOLDER,"avatar1.png")
+    else:
+        avatar_file = os.path.join(AVATAR_FOLDER,"avatar3.png")
+
+    new_row = {
+        "email": email,
+        "password": password,
+        "name": name,
+        "age": age,
+        "gender": gender,
+        "city": city,
+        "state": state,
+        "education": education,
+        "avatar": avatar_file,
+        "your_paths": ""
+    }
+    return app_user_store().create(new_row)
+
+@instrument("save_user_data")
+def save_user_data(email, user_dict):
+    app_user_store().update(email, user_dict)
+    app_analytics().update_profile(email, user_dict)
+
+@instrument("save_quiz_result")
+def save_quiz_result(email, main_result, sub_result=None):
+    """Append a quiz result to the user's history; your_paths keeps the readable summary for old readers."""
+    start = time.perf_counter()
+    result = make_result(email, main_result, sub_result)
+    store = app_user_store()
+    store.add_result(result)
+    store.update(email, {"your_paths": format_paths(result)})
+    app_analytics().record_outcome(email, result, store.get(email) or {})
+    log_event("quiz_submit", major=result.get("major"), sub_major=result.get("sub_major") or None,
+              ms=_ms_since(start))
+    return result
+
+def record_roadmap_request(career, location_pref=None):
+    """Count a roadmap the app showed, under the gazetteer's name for the location when it knows it."""
+    place = get_gazetteer(GAZETTEER_FILE).resolve(location_pref) if location_pref else None
+    app_analytics().record_roadmap(career, place.name if place else location_pref)
+
+def latest_quiz_result(email):
+    return app_user_store().latest_result(email)
+
+def quiz_result_counts(field="major"):
+    return app_user_store().result_counts(field)
+
+# ----------------------------- QUIZ FUNCTIONS -----------------------------
+@instrument("calculate_scores")
+def calculate_scores(questions, answers):
+    # `questions` is a CompiledQuiz from quiz_bank; raw question dicts are compiled on the fly
+    if not isinstance(questions, CompiledQuiz):
+        questions = CompiledQuiz(questions)
+    return questions.score(answers)
+
+def recommend(scores):
+    ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    major = ranked[0][0] if ranked else None
+    minor = ranked[1][0] if len(ranked) > 1 else None
+    backup = ranked[2][0] if len(ranked) > 2 else None
+    return major, minor, backup
+
+# ----------------------------- NEWS FUNCTION -----------------------------
+@instrument("fetch_relevant_news")
+def fetch_relevant_news(stream, interests, days=21, page_size=50, max_items=30):
+    start, sources = time.perf_counter(), {}
+    items = app_news_aggregator().collect(stream, interests, days, page_size, max_items, sources=sources)
+    _log_news(stream, items, start, sources)
+    return items
+
+def stream_relevant_news(stream, interests, days=21, page_size=50, max_items=30):
+    """Like fetch_relevant_news, but yields the current ranking each time another request lands."""
+    start, sources, items = time.perf_counter(), {}, []
+    for items in app_news_aggregator().iter_ranked(stream, interests, days, page_size, max_items, sources=sources):
+        yield items
+    _log_news(stream, items, start, sources)
+
+def _log_news(stream, items, start, sources):
+    # A hit means no request of this aggregation had to go to NewsAPI; one cut off by the deadline may have
+    network = sources.get("network") or sources.get("unfinished")
+    log_event("news", stream=stream, items=len(items), ms=_ms_since(start), requests=sum(sources.values()),
+              cache_hit=bool(sources) and not network,
+              source="network" if network else "cache", sources=sources)
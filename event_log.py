@@ -0,0 +1,268 @@
+"""Per-request event log: one JSON line per page view, roadmap, search, quiz submission and news fetch.
+
+    python event_log.py summarize events.jsonl [--by page] [--since 3600] [--json]
+
+``emit`` only puts a dict on an in-memory queue. A background thread
+serializes and appends events in batches and rotates the file by size
+(``events.jsonl`` -> ``events.jsonl.1`` ...), so a request never waits on
+the disk. Server processes share the file: each batch is appended and the
+size checked (``fstat`` of the open handle) under an ``flock`` on
+``events.jsonl.lock``, so only one process rotates and no lines are lost.
+When the queue is full, events are dropped and counted rather than
+blocking the page.
+
+Fields bound with ``set_context``/``bind`` (session id, page) are added to
+every event the current thread emits, the same way instrumentation tracks
+the calls of one Streamlit rerun.
+"""
+import argparse
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: one process per log file
+    fcntl = None
+
+_context = threading.local()
+
+
+def set_context(**fields):
+    """Replace this thread's context fields (call at the start of each rerun)."""
+    _context.fields = fields
+
+
+def bind(**fields):
+    """Add fields to this thread's context."""
+    _context.fields = {**getattr(_context, "fields", {}), **fields}
+
+
+class EventLog:
+    """Queue in front of a size-rotated JSON-lines file, drained by one writer thread."""
+
+    def __init__(self, path: str = "events.jsonl", max_bytes: int = 20 * 1024 * 1024, backups: int = 3,
+                 batch_size: int = 500, flush_interval: float = 1.0, max_queue: int = 10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Dict]" = queue.Queue(max_queue)
+        self._stop = threading.Event()
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def emit(self, event: str, **fields):
+        record = {"ts": round(time.time(), 3), "event": event, **getattr(_context, "fields", {}), **fields}
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    # --- writer thread ---
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write(self, batch: List[Dict]):
+        data = "".join(json.dumps(r, default=str) + "\n" for r in batch).encode("utf-8")
+        try:
+            with self._locked():
+                f = open(self.path, "ab")
+                try:
+                    # Size of the file as it is now, whatever other processes appended or rotated
+                    size = os.fstat(f.fileno()).st_size
+                    if size and size + len(data) > self.max_bytes:
+                        f.close()
+                        self._rotate()
+                        f = open(self.path, "ab")
+                    f.write(data)
+                finally:
+                    f.close()
+            self.written += len(batch)
+        except OSError:
+            self.errors += 1
+
+    @contextmanager
+    def _locked(self):
+        with open(self.path + ".lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _rotate(self):
+        if self.backups <= 0:
+            os.remove(self.path)
+        else:
+            for i in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{i}"):
+                    os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+
+    def flush(self):
+        """Block until everything emitted so far is on disk (for tools and tests, not the request path)."""
+        self._queue.join()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._stop.set()
+            self._thread.join()
+
+    def stats(self) -> Dict[str, int]:
+        return {"queued": self._queue.qsize(), "written": self.written, "dropped": self.dropped,
+                "errors": self.errors}
+
+
+_logs: Dict[str, EventLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_event_log(path: str) -> Optional[EventLog]:
+    """Process-wide log for ``path``; None when ``path`` is empty (logging off)."""
+    if not path:
+        return None
+    with _logs_lock:
+        log = _logs.get(path)
+        if log is None:
+            log = EventLog(path)
+            _logs[path] = log
+    return log
+
+
+def close_all():
+    """Write out and stop every process-wide log."""
+    with _logs_lock:
+        logs = list(_logs.values())
+    for log in logs:
+        log.close()
+
+
+def close_in_worker():
+    """Pool ``initializer``: close this worker's logs when it shuts down.
+
+    multiprocessing workers leave through ``os._exit``, so ``atexit`` never
+    runs in them and whatever is still queued would be lost.
+    """
+    from multiprocessing import util
+
+    util.Finalize(None, close_all, exitpriority=10)
+
+
+def _forget_logs():
+    # A forked child inherits the parent's logs but not their writer threads
+    global _logs_lock
+    _logs_lock = threading.Lock()
+    _logs.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_logs)
+
+
+# ----------------------------- SUMMARY -----------------------------
+def log_files(path: str) -> List[str]:
+    """``path`` and its rotated backups, oldest first."""
+    backups = []
+    i = 1
+    while os.path.exists(f"{path}.{i}"):
+        backups.append(f"{path}.{i}")
+        i += 1
+    return backups[::-1] + ([path] if os.path.exists(path) else [])
+
+
+def read_events(path: str, since: Optional[float] = None) -> Iterator[Dict]:
+    for name in log_files(path):
+        with open(name, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+                if since is None or record.get("ts", 0) >= since:
+                    yield record
+
+
+def summarize(events: Iterator[Dict], by: Optional[str] = None) -> List[Dict]:
+    """Count, latency percentiles (of ``ms``) and cache-hit rate per event type (and ``by`` field)."""
+    groups: Dict[tuple, Dict] = {}
+    for e in events:
+        g = groups.setdefault((e.get("event"), e.get(by) if by else None), {"count": 0, "ms": [], "hits": []})
+        g["count"] += 1
+        if isinstance(e.get("ms"), (int, float)):
+            g["ms"].append(e["ms"])
+        if "cache_hit" in e:
+            g["hits"].append(bool(e["cache_hit"]))
+    rows = []
+    for (event, value), g in sorted(groups.items(), key=lambda kv: (str(kv[0][0]), str(kv[0][1]))):
+        ms = np.asarray(g["ms"], dtype=np.float64)
+        row = {"event": event}
+        if by:
+            row[by] = value
+        row["count"] = g["count"]
+        for p in (50, 90, 95, 99):
+            row[f"p{p}_ms"] = round(float(np.percentile(ms, p)), 2) if len(ms) else None
+        row["max_ms"] = round(float(ms.max()), 2) if len(ms) else None
+        row["cache_hit_rate"] = round(sum(g["hits"]) / len(g["hits"]), 3) if g["hits"] else None
+        rows.append(row)
+    return rows
+
+
+def format_table(rows: List[Dict]) -> str:
+    if not rows:
+        return "no events"
+    cols = list(rows[0])
+    cells = [[("-" if r[c] is None else str(r[c])) for c in cols] for r in rows]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(cols)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(cols, widths))]
+    lines += ["  ".join(v.ljust(w) for v, w in zip(row, widths)) for row in cells]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize the event log.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    s = sub.add_parser("summarize", help="latency percentiles and cache-hit rates per event type")
+    s.add_argument("path", nargs="?", default="events.jsonl", help="log file; rotated backups are read too")
+    s.add_argument("--by", help="also group by this field (e.g. page, career, stream)")
+    s.add_argument("--since", type=float, help="only the last N seconds")
+    s.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    if not log_files(args.path):
+        print(f"{args.path}: not found", file=sys.stderr)
+        sys.exit(1)
+    since = time.time() - args.since if args.since else None
+    rows = summarize(read_events(args.path, since), args.by)
+    print(json.dumps(rows, indent=2) if args.json else format_table(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Local gazetteer (place -> district, state, coordinates) and a grid index for "near me" ranking.
+
+    python gazetteer.py jk_colleges.csv jk_cllgs.csv
+
+lists the college locations the gazetteer cannot place yet, so new datasets
+can be covered by adding rows (or aliases) to gazetteer.csv.
+"""
+import csv
+import math
+import os
+import re
+import sys
+import threading
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+# Words people add around a place name that do not change where it is
+_FILLER = {"district", "dist", "distt", "tehsil", "city", "town", "jk", "j k", "india"}
+EARTH_RADIUS_KM = 6371.0
+
+
+def normalize_place(text: str) -> str:
+    return _NON_ALNUM.sub(" ", (text or "").lower()).strip()
+
+
+class Place(NamedTuple):
+    name: str
+    district: str
+    state: str
+    lat: float
+    lon: float
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class Gazetteer:
+    """Resolves free-text locations ("R.S.Pura", "Ghagwal,Samba", "Doda district") to a Place."""
+
+    def __init__(self, places: List[Place], aliases: Optional[Dict[str, str]] = None, mtime: Optional[float] = None):
+        self.places = places
+        self.mtime = mtime
+        self._by_name: Dict[str, Place] = {}
+        for p in places:
+            self._by_name.setdefault(normalize_place(p.name), p)
+        for alias, name in (aliases or {}).items():
+            place = self._by_name.get(normalize_place(name))
+            if place:
+                self._by_name.setdefault(normalize_place(alias), place)
+        # A district that is not itself a listed place resolves to the centre of its places
+        districts: Dict[str, List[Place]] = {}
+        for p in places:
+            districts.setdefault(normalize_place(p.district), []).append(p)
+        for key, members in districts.items():
+            if key not in self._by_name:
+                self._by_name[key] = Place(members[0].district, members[0].district, members[0].state,
+                                           sum(m.lat for m in members) / len(members),
+                                           sum(m.lon for m in members) / len(members))
+        self._cache: Dict[str, Optional[Place]] = {}
+
+    @classmethod
+    def from_csv(cls, path: str) -> "Gazetteer":
+        places, aliases = [], {}
+        try:
+            mtime = os.path.getmtime(path)
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    places.append(Place(row["place"], row["district"], row["state"], float(row["lat"]), float(row["lon"])))
+                    for alias in (row.get("aliases") or "").split(";"):
+                        if alias.strip():
+                            aliases[alias.strip()] = row["place"]
+        except OSError:
+            mtime = None
+        return cls(places, aliases, mtime)
+
+    def resolve(self, text: str) -> Optional[Place]:
+        if text in self._cache:
+            return self._cache[text]
+        place = self._resolve(text)
+        if len(self._cache) < 100_000:
+            self._cache[text] = place
+        return place
+
+    def _resolve(self, text: str) -> Optional[Place]:
+        key = normalize_place(text)
+        if key in self._by_name:
+            return self._by_name[key]
+        # "Ghagwal,Samba", "Sainik colony/Kunjwani": the first part that resolves wins
+        for part in re.split(r"[,/;|]", text or ""):
+            words = [w for w in normalize_place(part).split() if w not in _FILLER]
+            if " ".join(words) in self._by_name:
+                return self._by_name[" ".join(words)]
+            for w in words:
+                if w in self._by_name:
+                    return self._by_name[w]
+        return None
+
+
+class GeoIndex:
+    """Uniform lat/lon grid over points, searched ring by ring outwards from an origin.
+
+    Each ring comes with a lower bound on the distance of anything in it or
+    beyond, so callers can stop once nothing further out can outrank what
+    they already have.
+    """
+
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, cell_deg: float = 0.25):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.cell_deg = cell_deg
+        located = np.flatnonzero(~np.isnan(self.lats) & ~np.isnan(self.lons))
+        self.unlocated = np.flatnonzero(np.isnan(self.lats) | np.isnan(self.lons))
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        ci = np.floor(self.lats[located] / cell_deg).astype(np.int64)
+        cj = np.floor(self.lons[located] / cell_deg).astype(np.int64)
+        for row, i, j in zip(located.tolist(), ci.tolist(), cj.tolist()):
+            cells.setdefault((i, j), []).append(row)
+        self.cells = {c: np.array(rows, dtype=np.int64) for c, rows in cells.items()}
+        self.max_abs_lat = float(np.abs(self.lats[located]).max()) if len(located) else 0.0
+
+    def rings(self, lat: float, lon: float) -> Iterator[Tuple[float, np.ndarray, np.ndarray]]:
+        """Yield (min_km, rows, km) per ring; every row not yet yielded is at least min_km away."""
+        if not self.cells:
+            return
+        oi, oj = math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+        last = max(max(abs(i - oi), abs(j - oj)) for i, j in self.cells)
+        # A point r whole cells away differs by > r * cell_deg in latitude or longitude.
+        # Haversine gives d >= R * dlat and d >= 2R * cos(max |lat|) * sin(dlon / 2).
+        cos_max = math.cos(math.radians(min(90.0, max(self.max_abs_lat, abs(lat)))))
+        for r in range(last + 1):
+            if r == 0:
+                ring = [(oi, oj)]
+            else:
+                ring = [(oi + di, oj + dj) for di in range(-r, r + 1) for dj in (-r, r)] + \
+                       [(oi + di, oj + dj) for dj in range(-r + 1, r) for di in (-r, r)]
+            rows = [self.cells[c] for c in ring if c in self.cells]
+            sep = math.radians(min(r * self.cell_deg, 180.0))
+            min_km = EARTH_RADIUS_KM * min(sep, 2 * cos_max * math.sin(sep / 2))
+            if rows:
+                rows = np.concatenate(rows)
+                yield min_km, rows, haversine_km(lat, lon, self.lats[rows], self.lons[rows])
+            else:
+                yield min_km, np.empty(0, dtype=np.int64), np.empty(0)
+
+
+_gazetteers: Dict[str, Gazetteer] = {}
+_gazetteers_lock = threading.Lock()
+
+
+def get_gazetteer(path: str) -> Gazetteer:
+    """Process-wide gazetteer for ``path``, reloaded when the file changes."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    gaz = _gazetteers.get(path)
+    if gaz is not None and gaz.mtime == mtime:
+        return gaz
+    with _gazetteers_lock:
+        gaz = _gazetteers.get(path)
+        if gaz is None or gaz.mtime != mtime:
+            gaz = Gazetteer.from_csv(path)
+            _gazetteers[path] = gaz
+    return gaz
+
+
+def clear_gazetteers():
+    with _gazetteers_lock:
+        _gazetteers.clear()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python gazetteer.py <colleges.csv> [...]")
+        sys.exit(1)
+    gaz = get_gazetteer(os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.csv"))
+    missing: Dict[str, int] = {}
+    for src in sys.argv[1:]:
+        with open(src, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                loc = (row.get("Location") or "").strip()
+                if loc and gaz.resolve(loc) is None:
+                    missing[loc] = missing.get(loc, 0) + 1
+    for loc, n in sorted(missing.items(), key=lambda x: -x[1]):
+        print(f"{n:6d}  {loc}")
+    print(f"{len(missing)} unresolved locations", file=sys.stderr)
@@ -0,0 +1,226 @@
+"""Build the compact colleges artifact from one or more source CSVs.
+
+    python ingest.py jk_colleges.csv jk_cllgs.csv -o colleges.arrow
+
+Sources are read in chunks; each chunk is cleaned and de-duplicated into a
+small Arrow table as it arrives, and the chunk tables are merged once at
+the end, so total work stays linear in the number of source rows. Colleges
+are normalized and de-duplicated across files by (name, location); a
+college listed twice keeps the union of its courses and skills.
+Courses/Skills are tokenized once here and stored as list columns.
+
+The output is an uncompressed Arrow IPC file, which CollegeIndex
+memory-maps and uses as is, or, with a .parquet suffix, a Parquet file
+(decoded into memory when opened).
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from college_index import COLLEGE_COLUMNS, TOKEN_COLUMNS, _column_codes
+
+ARTIFACT_COLUMNS = COLLEGE_COLUMNS + TOKEN_COLUMNS
+
+
+def _clean(column):
+    """Strings with runs of whitespace collapsed and ends stripped; missing values become ""."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    column = pc.fill_null(pc.cast(column, pa.string()), "")
+    return pc.utf8_trim_whitespace(pc.replace_substring_regex(column, r"[\s\p{Z}]+", " "))
+
+
+def _normalized(column):
+    # Punctuation and case differences ("Govt." vs "Govt") should not create two entries
+    import pyarrow.compute as pc
+
+    return pc.utf8_trim(pc.replace_substring_regex(pc.utf8_lower(column), "[^a-z0-9]+", " "), " ")
+
+
+def _tokens(column):
+    """Comma-separated cells as lists of stripped, non-empty tokens."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    lists = pc.split_pattern(column, ",")
+    if isinstance(lists, pa.ChunkedArray):
+        lists = lists.combine_chunks()
+    values = pc.utf8_trim_whitespace(pc.list_flatten(lists))
+    keep = pc.not_equal(values, "")
+    counts = np.bincount(pc.list_parent_indices(lists).filter(keep).to_numpy(), minlength=len(lists))
+    return _list_array(counts, values.filter(keep))
+
+
+def _list_array(counts: np.ndarray, values):
+    import pyarrow as pa
+
+    offsets = np.zeros(len(counts) + 1, dtype=np.int32)
+    np.cumsum(counts, out=offsets[1:])
+    return pa.ListArray.from_arrays(pa.array(offsets), values)
+
+
+def _merge_tokens(lists, codes: np.ndarray, n_groups: int):
+    """Per group, the union of its rows' token lists in first-seen order, compared case-insensitively."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if isinstance(lists, pa.ChunkedArray):
+        lists = lists.combine_chunks()
+    values = pc.list_flatten(lists)
+    groups = codes[pc.list_parent_indices(lists).to_numpy()]
+    # Stable, so within a group tokens stay in row order, then list order
+    order = np.argsort(groups, kind="stable")
+    lowered = _column_codes(pa.chunked_array([pc.utf8_lower(values)]))[0]
+    kept = order[~pd.DataFrame({"group": groups[order], "token": lowered[order]}).duplicated().to_numpy()]
+    return _list_array(np.bincount(groups[kept], minlength=n_groups), values.take(pa.array(kept, pa.int64())))
+
+
+def _merge(table):
+    """One row per normalized (name, location) key, in order of first appearance.
+
+    A group keeps its first row's name and location, its first non-empty
+    website and the union of its courses and skills.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    codes = _column_codes(table.column("Key"))[0]
+    groups, first = np.unique(codes, return_index=True)
+    # First row with a website per group; groups without one keep their (blank) first row
+    site = first.copy()
+    with_site = np.flatnonzero(pc.not_equal(table.column("Website"), "").to_numpy())
+    found, at = np.unique(codes[with_site], return_index=True)
+    site[found] = with_site[at]
+    rows = pa.array(first, pa.int64())
+    return pa.table({
+        "College": table.column("College").take(rows),
+        "Location": table.column("Location").take(rows),
+        "Website": table.column("Website").take(pa.array(site, pa.int64())),
+        "Key": table.column("Key").take(rows),
+        "CourseTokens": _merge_tokens(table.column("CourseTokens"), codes, len(groups)),
+        "SkillTokens": _merge_tokens(table.column("SkillTokens"), codes, len(groups)),
+    })
+
+
+class Ingestor:
+    """Merges source chunks into one Arrow table of unique colleges.
+
+    Each chunk is cleaned and de-duplicated on its own as it arrives; the
+    chunk tables are merged across chunks once, when ``table`` is first read
+    after new chunks came in, rather than re-merging everything per chunk.
+    """
+
+    def __init__(self):
+        self._table = None
+        self._parts = []
+        self.read = 0
+        self.kept = 0
+        self.skipped = 0
+
+    @property
+    def table(self):
+        if self._parts:
+            import pyarrow as pa
+
+            parts = ([self._table] if self._table is not None else []) + self._parts
+            self._table = _merge(pa.concat_tables(parts)) if len(parts) > 1 else parts[0]
+            self._parts = []
+        return self._table
+
+    @property
+    def merged(self) -> int:
+        return self.kept - len(self)
+
+    def __len__(self):
+        return self.table.num_rows if self.table is not None else 0
+
+    def add_chunk(self, chunk: pd.DataFrame):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        n = len(chunk)
+        cols = {c: _clean(pa.array(chunk[c], pa.string(), from_pandas=True) if c in chunk.columns
+                          else pa.array([""] * n, pa.string()))
+                for c in COLLEGE_COLUMNS}
+        named = pc.not_equal(cols["College"], "")
+        cols = {c: v.filter(named) for c, v in cols.items()}
+        part = pa.table({
+            "College": cols["College"], "Location": cols["Location"], "Website": cols["Website"],
+            "Key": pc.binary_join_element_wise(_normalized(cols["College"]), _normalized(cols["Location"]), "\x1f"),
+            "CourseTokens": _tokens(cols["Courses"]), "SkillTokens": _tokens(cols["Skills"]),
+        })
+        self.read += n
+        self.skipped += n - part.num_rows
+        self.kept += part.num_rows
+        # Merging keeps first-seen order and first non-empty values, so merging the
+        # per-chunk results later gives the same table as merging every row at once
+        self._parts.append(_merge(part))
+
+    def add_csv(self, path: str, chunk_size: int = 100_000):
+        for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False):
+            self.add_chunk(chunk)
+
+    def to_table(self):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        if self.table is None:
+            return pa.table({c: pa.array([], pa.list_(pa.string()) if c in TOKEN_COLUMNS else pa.string())
+                             for c in ARTIFACT_COLUMNS})
+        t = self.table
+        return pa.table({
+            "College": t.column("College"), "Location": t.column("Location"), "Website": t.column("Website"),
+            "Courses": pc.binary_join(t.column("CourseTokens"), ", "),
+            "Skills": pc.binary_join(t.column("SkillTokens"), ", "),
+            "CourseTokens": t.column("CourseTokens"), "SkillTokens": t.column("SkillTokens"),
+        })
+
+
+def write_artifact(table, path: str):
+    import pyarrow as pa
+
+    tmp = path + ".tmp"
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        pq.write_table(table, tmp)
+    else:
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=100_000)
+    os.replace(tmp, path)
+
+
+def read_artifact(path: str):
+    """Open an artifact as a pyarrow Table; Arrow IPC files are memory-mapped, not copied."""
+    import pyarrow as pa
+
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.read_table(path, memory_map=True)
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest college CSVs into a compact columnar artifact.")
+    parser.add_argument("sources", nargs="+", help="college CSV files (College, Location, Website, Courses[, Skills])")
+    parser.add_argument("-o", "--output", default="colleges.arrow", help=".arrow (default) or .parquet")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    ingestor = Ingestor()
+    for src in args.sources:
+        ingestor.add_csv(src, args.chunk_size)
+        print(f"{src}: {ingestor.read} rows read so far", file=sys.stderr)
+    write_artifact(ingestor.to_table(), args.output)
+    print(f"wrote {len(ingestor)} colleges to {args.output} "
+          f"({ingestor.merged} duplicates merged, {ingestor.skipped} skipped) "
+          f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
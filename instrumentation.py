@@ -0,0 +1,224 @@
+"""Lightweight timers and counters for the data-access and compute hot paths.
+
+Turned on with COMPASS_METRICS=1 (or enable()). When off, an instrumented
+function costs one boolean check on top of the original call.
+
+    @instrument("career_roadmap")
+    def career_roadmap(...): ...
+
+    with timer("page.render"): ...
+    incr("news.cache_hit")
+
+Snapshots can be exported as a Prometheus text file and/or appended to a
+JSONL file by a background thread (COMPASS_METRICS_PROM / COMPASS_METRICS_JSONL),
+and app.py shows them in a debug sidebar panel.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Histogram bucket upper bounds, in milliseconds
+BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+_enabled = os.environ.get("COMPASS_METRICS") == "1"
+_lock = threading.Lock()
+_timers: Dict[str, Dict] = {}
+_counters: Dict[str, float] = {}
+_local = threading.local()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(on: bool = True):
+    global _enabled
+    _enabled = on
+
+
+def _observe(name: str, ms: float, error: bool):
+    with _lock:
+        t = _timers.get(name)
+        if t is None:
+            t = _timers[name] = {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                 "buckets": [0] * (len(BUCKETS_MS) + 1)}
+        t["count"] += 1
+        t["errors"] += error
+        t["total_ms"] += ms
+        if ms > t["max_ms"]:
+            t["max_ms"] = ms
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                t["buckets"][i] += 1
+                break
+        else:
+            t["buckets"][-1] += 1
+    calls = getattr(_local, "calls", None)
+    if calls is not None:
+        calls.append((name, ms))
+
+
+def instrument(name: str):
+    """Decorator: record wall time, call count and errors under ``name`` while metrics are enabled."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            error = True
+            try:
+                result = fn(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                _observe(name, (time.perf_counter() - start) * 1000, error)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def timer(name: str):
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    error = True
+    try:
+        yield
+        error = False
+    finally:
+        _observe(name, (time.perf_counter() - start) * 1000, error)
+
+
+def incr(name: str, value: float = 1):
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + value
+
+
+# ----------------------------- PER-RERUN VIEW -----------------------------
+def begin_rerun():
+    """Start collecting the calls made by this thread (one Streamlit rerun)."""
+    _local.calls = [] if _enabled else None
+
+
+def rerun_calls() -> List[tuple]:
+    return list(getattr(_local, "calls", None) or [])
+
+
+# ----------------------------- SNAPSHOT / EXPORT -----------------------------
+def snapshot() -> Dict:
+    with _lock:
+        timers = {
+            name: {
+                "count": t["count"],
+                "errors": t["errors"],
+                "total_ms": round(t["total_ms"], 3),
+                "mean_ms": round(t["total_ms"] / t["count"], 3) if t["count"] else 0.0,
+                "max_ms": round(t["max_ms"], 3),
+                "buckets": list(t["buckets"]),
+            }
+            for name, t in _timers.items()
+        }
+        counters = dict(_counters)
+    return {"ts": time.time(), "timers": timers, "counters": counters}
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def _metric_name(name: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+
+def prometheus_text(snap: Optional[Dict] = None) -> str:
+    snap = snap or snapshot()
+    lines = [
+        "# HELP compass_call_duration_seconds Wall time of instrumented calls.",
+        "# TYPE compass_call_duration_seconds histogram",
+    ]
+    for name, t in sorted(snap["timers"].items()):
+        label = f'name="{name}"'
+        cumulative = 0
+        for bound, count in zip(BUCKETS_MS, t["buckets"]):
+            cumulative += count
+            lines.append(f'compass_call_duration_seconds_bucket{{{label},le="{bound / 1000:g}"}} {cumulative}')
+        lines.append(f'compass_call_duration_seconds_bucket{{{label},le="+Inf"}} {t["count"]}')
+        lines.append(f'compass_call_duration_seconds_sum{{{label}}} {t["total_ms"] / 1000:.6f}')
+        lines.append(f'compass_call_duration_seconds_count{{{label}}} {t["count"]}')
+    lines.append("# HELP compass_call_errors_total Instrumented calls that raised.")
+    lines.append("# TYPE compass_call_errors_total counter")
+    for name, t in sorted(snap["timers"].items()):
+        lines.append(f'compass_call_errors_total{{name="{name}"}} {t["errors"]}')
+    for name, value in sorted(snap["counters"].items()):
+        metric = f"compass_{_metric_name(name)}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+
+
+def append_jsonl(path: str):
+    with open(path, "a") as f:
+        f.write(json.dumps(snapshot()) + "\n")
+
+
+class MetricsExporter:
+    """Background thread that periodically writes the Prometheus file and/or a JSONL snapshot line."""
+
+    def __init__(self, prom_path: Optional[str], jsonl_path: Optional[str], interval: float = 15):
+        self.prom_path = prom_path
+        self.jsonl_path = jsonl_path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        try:
+            if self.prom_path:
+                write_prometheus(self.prom_path)
+            if self.jsonl_path:
+                append_jsonl(self.jsonl_path)
+        except OSError:
+            pass
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+
+_exporter: Optional[MetricsExporter] = None
+
+
+def start_exporter_from_env() -> Optional[MetricsExporter]:
+    """Start the exporter once per process if metrics are on and an output path is configured."""
+    global _exporter
+    prom = os.environ.get("COMPASS_METRICS_PROM")
+    jsonl = os.environ.get("COMPASS_METRICS_JSONL")
+    with _lock:
+        if _exporter is None and _enabled and (prom or jsonl):
+            interval = float(os.environ.get("COMPASS_METRICS_INTERVAL", "15"))
+            _exporter = MetricsExporter(prom, jsonl, interval).start()
+    return _exporter
@@ -0,0 +1,150 @@
+import math
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from i in into is it its like love me my of on or so that the their "
+    "them they this to want was what when where which who why with would you your enjoy good things "
+    "thing something really very also can do doing get how".split()
+)
+
+
+def _stem(word: str) -> str:
+    # Just enough to fold plurals, -ing/-ed and a final -e/-y together
+    # ("buildings" -> "build", "cared"/"caring" -> "car", "planning" -> "plan", "healthy" -> "health")
+    if len(word) > 4 and word.endswith("ies"):
+        word = word[:-3] + "y"
+    elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    for suffix, min_len in (("ing", 6), ("ed", 5)):
+        if len(word) >= min_len and word.endswith(suffix):
+            word = word[:-len(suffix)]
+            if word[-1] == word[-2] and word[-1] not in "aeiouls":
+                word = word[:-1]
+            break
+    if (len(word) > 4 and word.endswith("y")) or (len(word) > 3 and word.endswith("e")):
+        word = word[:-1]
+    return word
+
+
+def analyze(text: str) -> List[str]:
+    """Lower-cased, stemmed content words of ``text`` ("B.Sc" and "BSc" both become "bsc")."""
+    if not isinstance(text, str):
+        return []
+    return [_stem(t) for t in _TOKEN_RE.findall(text.lower().replace(".", "")) if t not in _STOPWORDS]
+
+
+def terms(text: str) -> List[str]:
+    """``analyze`` words plus each pair of adjacent words ("draw build"), so phrases score above scattered words."""
+    words = analyze(text)
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class InterestIndex:
+    """TF-IDF vectors for a handful of labelled documents, queried with free text.
+
+    Each label (a career) is described by weighted text fragments. Terms get
+    sublinear, fragment-weighted term frequency times smoothed IDF and every
+    label's vector is L2-normalized, so a query's cosine against all labels
+    is one gather over ``matrix`` columns. Query words missing from the
+    vocabulary fall back to vocabulary words they are a prefix of ("math"
+    matches "mathematics") at reduced weight, as in the Explore search.
+    Adjacent word pairs are terms too, so "drawing buildings" favours a
+    career described by that phrase over one that only mentions drawing.
+    """
+
+    def __init__(self, documents: Dict[str, Iterable[Tuple[str, float]]], prefix_factor: float = 0.8):
+        self.labels: List[str] = list(documents)
+        self.prefix_factor = prefix_factor
+        tf: List[Dict[str, float]] = []
+        for label in self.labels:
+            counts: Dict[str, float] = {}
+            for text, weight in documents[label]:
+                for term in terms(text):
+                    counts[term] = counts.get(term, 0.0) + weight
+            tf.append(counts)
+
+        self.vocab: List[str] = sorted({t for counts in tf for t in counts})
+        self.term_ids: Dict[str, int] = {t: i for i, t in enumerate(self.vocab)}
+        n = len(self.labels)
+        df = np.zeros(len(self.vocab), dtype=np.float64)
+        for counts in tf:
+            df[[self.term_ids[t] for t in counts]] += 1
+        self.idf = np.log((1 + n) / (1 + df)) + 1.0
+        # Labels x terms; tiny (a few careers x a few hundred terms), so dense
+        self.matrix = np.zeros((n, len(self.vocab)), dtype=np.float32)
+        for row, counts in enumerate(tf):
+            for t, c in counts.items():
+                self.matrix[row, self.term_ids[t]] = (1.0 + math.log(c)) * self.idf[self.term_ids[t]] if c > 0 else 0.0
+        norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        self.matrix /= np.where(norms > 0, norms, 1.0)
+        self._expansions: Dict[str, List[Tuple[int, float]]] = {}
+
+    def _expand(self, term: str) -> List[Tuple[int, float]]:
+        """Vocabulary ids a query term stands for, with a match-quality factor."""
+        cached = self._expansions.get(term)
+        if cached is not None:
+            return cached
+        tid = self.term_ids.get(term)
+        if tid is not None:
+            out = [(tid, 1.0)]
+        elif len(term) >= 3 and " " not in term:
+            out = []
+            i = bisect_left(self.vocab, term)
+            while i < len(self.vocab) and self.vocab[i].startswith(term):
+                out.append((i, self.prefix_factor))
+                i += 1
+        else:
+            out = []
+        if len(self._expansions) > 10000:
+            self._expansions.clear()
+        self._expansions[term] = out
+        return out
+
+    def _query(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse, L2-normalized TF-IDF vector of ``text`` as (term ids, weights)."""
+        counts: Dict[int, float] = {}
+        for term in terms(text):
+            for tid, quality in self._expand(term):
+                counts[tid] = counts.get(tid, 0.0) + quality
+        if not counts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        weights = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))) * self.idf[ids]
+        return ids, (weights / np.linalg.norm(weights)).astype(np.float32)
+
+    def _top(self, scores: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        # Stable sort so equal scores keep label order
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(self.labels[i], round(float(scores[i]), 4)) for i in order if scores[i] > 0]
+
+    def suggest(self, text: str, k: int = 3) -> List[Tuple[str, float]]:
+        """Up to ``k`` (label, cosine) pairs for ``text``, best first; labels with no overlap are left out."""
+        ids, weights = self._query(text)
+        if not len(ids):
+            return []
+        return self._top(self.matrix[:, ids] @ weights, k)
+
+    def suggest_batch(self, texts: Sequence[str], k: int = 3, block: int = 4096) -> List[List[Tuple[str, float]]]:
+        """``suggest`` for many texts: each distinct text is analyzed once, then scored in blocks by one matmul."""
+        distinct: Dict[str, int] = {}
+        slots = [distinct.setdefault(t if isinstance(t, str) else "", len(distinct)) for t in texts]
+        unique = list(distinct)
+        ranked: List[List[Tuple[str, float]]] = []
+        for start in range(0, len(unique), block):
+            chunk = unique[start:start + block]
+            queries = np.zeros((len(chunk), len(self.vocab)), dtype=np.float32)
+            for r, text in enumerate(chunk):
+                ids, weights = self._query(text)
+                queries[r, ids] = weights
+            scores = queries @ self.matrix.T
+            order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+            # Round in float64 like suggest: float32 0.4387 comes back as 0.43869999...
+            top = np.take_along_axis(scores, order, axis=1).astype(np.float64).round(4).tolist()
+            ranked += [[(self.labels[i], s) for i, s in zip(row, vals) if s > 0]
+                       for row, vals in zip(order.tolist(), top)]
+        return [ranked[i] for i in slots]
@@ -0,0 +1,110 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+_WORD = re.compile(r"\w")
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Regex source matching any of ``words``, factored by common prefixes.
+
+    ``re`` tries alternatives one by one, so a flat "a|b|c" over many
+    keywords retries every keyword at every position. Factoring them into a
+    trie ("auto(?:mation|mobile)") fails on the first character that no
+    keyword continues with. Optional suffixes are greedy: the longest
+    keyword at a position wins.
+    """
+    trie: Dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: Dict) -> str:
+        alts = [re.escape(ch) + build(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        if len(alts) == 1 and "" not in node:
+            return alts[0]
+        body = "(?:" + "|".join(alts) + ")"
+        return body + "?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Finds which of a fixed set of keywords occur in a text, in one regex pass.
+
+    Matching is case-insensitive and overlapping ("stock market" and
+    "market" both count). With ``whole_words`` a keyword only matches
+    between non-word characters, so "AI" no longer matches inside "said".
+    """
+
+    def __init__(self, keywords: Iterable[str], whole_words: bool = False):
+        self.keywords: List[str] = list(dict.fromkeys(k.lower() for k in keywords if k))
+        self.whole_words = whole_words
+        self._ids: Dict[str, int] = {k: i for i, k in enumerate(self.keywords)}
+        body = trie_pattern(self.keywords)
+        # The leading boundary is checked in _matches: a lookbehind here would
+        # stop re from skipping ahead to a keyword's first character.
+        pattern = rf"({body})(?!\w)" if whole_words else f"({body})"
+        self._regex = re.compile(pattern) if self.keywords else None
+        # Only the longest keyword at a position is reported; shorter keywords
+        # that are prefixes of it matched there too.
+        self._implied: Dict[int, Tuple[Tuple[int, int], ...]] = {
+            i: tuple((self._ids[p], len(p)) for p in self.keywords if p != k and k.startswith(p)
+                     and not (whole_words and _WORD.match(k, len(p))))
+            for i, k in enumerate(self.keywords)
+        }
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def _matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """(keyword id, end offset) for every occurrence in already lower-cased ``text``."""
+        search = self._regex.search
+        m = search(text)
+        while m:
+            start, end = m.span(1)
+            if self.whole_words and start and _WORD.match(text, start - 1):
+                m = search(text, start + 1)
+                continue
+            kid = self._ids[m.group(1)]
+            yield kid, end
+            for pid, plen in self._implied[kid]:
+                yield pid, start + plen
+            # Restart one character later rather than at ``end`` to catch overlaps
+            m = search(text, start + 1)
+
+    def find(self, text: str) -> Set[int]:
+        """Ids (indexes into ``keywords``) of the keywords present in ``text``."""
+        if self._regex is None or not text:
+            return set()
+        return {kid for kid, _ in self._matches(text.lower())}
+
+    def count(self, text: str) -> int:
+        return len(self.find(text))
+
+    def hits(self, title: str, body: str) -> Tuple[int, int]:
+        """(distinct keywords in title + " " + body, distinct keywords inside the title) in one scan."""
+        if self._regex is None:
+            return 0, 0
+        title = (title or "").lower()
+        split = len(title)
+        found, in_title = set(), set()
+        for kid, end in self._matches(title + " " + (body or "").lower()):
+            found.add(kid)
+            if end <= split:
+                in_title.add(kid)
+        return len(found), len(in_title)
+
+
+@lru_cache(maxsize=256)
+def _cached_matcher(keywords: Tuple[str, ...], whole_words: bool) -> KeywordMatcher:
+    return KeywordMatcher(keywords, whole_words)
+
+
+def get_matcher(keywords: Iterable[str], whole_words: bool = False) -> KeywordMatcher:
+    """Shared compiled matcher for a keyword set (compiled once per distinct set)."""
+    return _cached_matcher(tuple(keywords), whole_words)
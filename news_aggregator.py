@@ -0,0 +1,189 @@
+import asyncio
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from instrumentation import incr, instrument
+from keyword_matcher import get_matcher
+from news_client import NewsClient, _article_item, _article_score
+from topk import top_k
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def url_key(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return None
+    u = re.sub(r"^https?://(www\.)?", "", url.strip().lower())
+    return u.split("#", 1)[0].rstrip("/") or None
+
+
+def title_key(title: Optional[str]) -> Optional[str]:
+    t = _NON_ALNUM.sub(" ", (title or "").lower()).strip()
+    return t or None
+
+
+def query_variants(keywords: List[str]) -> List[Tuple[str, ...]]:
+    """The combined OR query first, then one narrower query per keyword for streams the big query starves."""
+    variants = [tuple(keywords)]
+    if len(keywords) > 1:
+        variants += [(k,) for k in keywords]
+    return variants
+
+
+class NewsAggregator:
+    """Fetches several pages of several query variants concurrently and merges them.
+
+    Requests go through the NewsClient (so each (variant, page) is cached
+    like a single fetch) on a pool of ``concurrency`` threads driven by
+    asyncio. The per-request timeout is the HTTP timeout of the client's
+    backend: a thread cannot be cancelled from asyncio, so that timeout is
+    what bounds how long a slow request holds a pool worker. The whole
+    aggregation has a ``deadline``; requests still running then are dropped
+    rather than holding up the page. A variant's next page is only requested
+    once its previous page came back full. Articles are de-duplicated by URL
+    and by normalized title.
+    """
+
+    def __init__(self, client: NewsClient, max_pages: int = 2, concurrency: int = 4,
+                 deadline: float = 20.0, variants: bool = True):
+        self.client = client
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+        self.deadline = deadline
+        self.variants = variants
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="news-aggregate")
+
+    async def batches(self, stream: str, keywords: List[str], days: int = 14, page_size: int = 30,
+                      sources: Optional[Dict[str, int]] = None) -> AsyncIterator[Tuple[int, int, List[Dict]]]:
+        """Yield (variant index, page, articles) for each request as soon as it finishes.
+
+        Page 1 of every variant goes out at once; page ``p + 1`` of a variant
+        is only requested after page ``p`` came back full. ``sources``, if
+        given, counts the requests that ran by where the client answered them
+        from ("memory", "disk", "shared", "stale", "network"), plus
+        "unfinished" for requests still running when the deadline passed.
+        """
+        loop = asyncio.get_running_loop()
+        sem = asyncio.Semaphore(self.concurrency)
+        started = set()
+
+        async def one(key, variant, page):
+            async with sem:
+                started.add(key)
+                return await loop.run_in_executor(self._pool, self.client.get_articles_status,
+                                                  stream, list(variant), days, page_size, page)
+
+        variants = query_variants(keywords) if self.variants else [tuple(keywords)]
+        tasks = {}
+
+        def schedule(vi, page):
+            task = asyncio.ensure_future(one((vi, page), variants[vi], page))
+            tasks[task] = (vi, page)
+            return task
+
+        for vi in range(len(variants)):
+            schedule(vi, 1)
+
+        end = loop.time() + self.deadline
+        pending = set(tasks)
+        try:
+            while pending:
+                remaining = end - loop.time()
+                if remaining <= 0:
+                    incr("news.aggregate_deadline")
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    vi, page = tasks.pop(task)
+                    if task.exception() is not None:
+                        incr("news.aggregate_error")
+                        continue
+                    articles, source = task.result()
+                    if sources is not None:
+                        sources[source] = sources.get(source, 0) + 1
+                    if len(articles) >= page_size and page < self.max_pages:
+                        pending.add(schedule(vi, page + 1))
+                    if articles:
+                        yield vi, page, articles
+        finally:
+            if sources is not None:
+                # Their threads still run to completion; do not let the caller report them as cache hits
+                unfinished = sum(1 for t in pending if tasks.get(t) in started and not t.done())
+                if unfinished:
+                    sources["unfinished"] = sources.get("unfinished", 0) + unfinished
+            for task in pending:
+                task.cancel()
+
+    def iter_ranked(self, stream: str, keywords: List[str], days: int = 14, page_size: int = 30,
+                    max_items: int = 10, whole_words: bool = True,
+                    sources: Optional[Dict[str, int]] = None) -> Iterator[List[Dict]]:
+        """Blocking generator of the current top ``max_items`` after each batch arrives.
+
+        Only new articles are scored per batch. Every article's position is
+        its (variant, page, index in page), which breaks score ties and
+        decides which copy of a duplicate is kept, so the final list does not
+        depend on the order responses arrive in. Safe to call from any thread
+        without a running event loop (e.g. a Streamlit script).
+        """
+        matcher = get_matcher(keywords, whole_words)
+        articles: List[Dict] = []
+        keys: Dict[int, tuple] = {}
+        by_url: Dict[str, int] = {}
+        by_title: Dict[str, int] = {}
+        loop = asyncio.new_event_loop()
+        agen = self.batches(stream, keywords, days, page_size, sources)
+        try:
+            while True:
+                try:
+                    vi, page, batch = loop.run_until_complete(agen.__anext__())
+                except StopAsyncIteration:
+                    break
+                for pos, a in enumerate(batch):
+                    i, where = len(articles), (vi, page, pos)
+                    u, t = url_key(a.get("url")), title_key(a.get("title"))
+                    dups = {d for d in (by_url.get(u), by_title.get(t)) if d is not None}
+                    if any(keys[d][1:4] < where for d in dups):
+                        continue
+                    for d in dups:
+                        # A copy from an earlier position arrived late; it replaces this one
+                        old = keys.pop(d)
+                        for index, k in ((by_url, old[-1][0]), (by_title, old[-1][1])):
+                            if k and index.get(k) == d:
+                                del index[k]
+                    articles.append(a)
+                    score = _article_score(a, matcher)
+                    keys[i] = (-score, *where, (u, t))
+                    if u:
+                        by_url[u] = i
+                    if t:
+                        by_title[t] = i
+                page_keys = ((k[0], *k[1:4], i) for i, k in keys.items() if k[0])
+                top, _ = top_k(page_keys, max_items)
+                yield [_article_item(articles[k[-1]]) for k in top]
+        finally:
+            loop.run_until_complete(agen.aclose())
+            loop.close()
+
+    @instrument("news.aggregate")
+    def collect(self, stream: str, keywords: List[str], days: int = 14, page_size: int = 30,
+                max_items: int = 10, sources: Optional[Dict[str, int]] = None) -> List[Dict]:
+        ranked: List[Dict] = []
+        for ranked in self.iter_ranked(stream, keywords, days, page_size, max_items, sources=sources):
+            pass
+        return ranked
+
+
+_aggregators: Dict[int, NewsAggregator] = {}
+_aggregators_lock = threading.Lock()
+
+
+def get_news_aggregator(client: NewsClient, **kwargs) -> NewsAggregator:
+    """One aggregator (and thread pool) per client, shared across reruns and sessions."""
+    with _aggregators_lock:
+        agg = _aggregators.get(id(client))
+        if agg is None:
+            agg = NewsAggregator(client, **kwargs)
+            _aggregators[id(client)] = agg
+    return agg
@@ -0,0 +1,342 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from instrumentation import incr, instrument
+from keyword_matcher import get_matcher
+from topk import top_k, encode_cursor, decode_cursor, NUMBER
+
+
+# --- Stream-specific whitelisted domains ---
+STREAM_DOMAINS = {
+    "Engineering": ["ieee.org", "techcrunch.com", "arstechnica.com", "theverge.com"],
+    "Science": ["nature.com", "sciencedaily.com", "scientificamerican.com", "arxiv.org"],
+    "Medical": ["nejm.org", "thelancet.com", "who.int", "nih.gov"],
+    "Arts": ["theguardian.com", "nytimes.com", "smithsonianmag.com"],
+    "Commerce": ["ft.com", "economist.com", "wsj.com", "business-standard.com"]
+}
+
+# --- Keywords used for each stream's feed on the Notifications page ---
+STREAM_KEYWORDS = {
+    "Engineering": ["robotics", "AI", "automation", "IoT"],
+    "Science": ["space", "physics", "biology", "chemistry"],
+    "Medical": ["healthcare", "medicine", "clinical trials", "pharma"],
+    "Arts": ["design", "media", "painting", "music"],
+    "Commerce": ["finance", "stock market", "economics", "entrepreneurship"]
+}
+
+# --- Low-quality / irrelevant domains to exclude ---
+EXCLUDE = ["rumble.com", "brighteon.com", "apple.com", "facebook.com"]
+
+
+def build_query_terms(stream_keywords, extra_keywords=None):
+    phrases = [f"\"{k}\"" for k in stream_keywords]
+    extras = extra_keywords or []
+    return " OR ".join(phrases + extras)
+
+
+def build_news_params(stream, keywords, days, page_size, page=1) -> Dict:
+    from_date = (datetime.utcnow() - timedelta(days=days)).date().isoformat()
+    params = {
+        "q": build_query_terms(keywords),
+        "searchIn": "title,description",
+        "sortBy": "relevancy",
+        "language": "en",
+        "from": from_date,
+        "pageSize": page_size,
+    }
+    if page > 1:
+        params["page"] = page
+    whitelist = ",".join(STREAM_DOMAINS.get(stream, []))
+    if whitelist:
+        params["domains"] = whitelist
+    if EXCLUDE:
+        params["excludeDomains"] = ",".join(EXCLUDE)
+    return params
+
+
+def _article_score(a, matcher) -> float:
+    hits, title_hits = matcher.hits(a.get("title") or "", a.get("description") or "")
+    return hits + 0.5 * title_hits if hits else 0.0
+
+
+def _scored_keys(articles, matcher, start=0):
+    for idx, a in enumerate(articles, start):
+        score = _article_score(a, matcher)
+        if score:
+            # Highest score first; earlier articles win ties, as with the old stable sort
+            yield (-score, idx)
+
+
+def _article_item(a) -> Dict:
+    return {
+        "title": a.get("title"),
+        "description": a.get("description"),
+        "url": a.get("url"),
+        "source": (a.get("source") or {}).get("name"),
+        "publishedAt": a.get("publishedAt").split("T")[0] if a.get("publishedAt") else None
+    }
+
+
+def rank_articles(articles, interests, limit=30, cursor=None,
+                  whole_words=True) -> Tuple[List[Dict], Optional[str]]:
+    """One page of relevant articles plus the cursor for the next page (None when exhausted).
+
+    Keywords are matched as whole words by default ("AI" does not match "said").
+    Selection is a bounded heap: O(n log limit) time, O(limit) memory.
+    """
+    matcher = get_matcher(interests, whole_words)
+    page, last = top_k(_scored_keys(articles, matcher), limit, after=decode_cursor(cursor, (NUMBER, int)))
+    return [_article_item(articles[idx]) for _, idx in page], encode_cursor(last)
+
+
+def score_articles(articles, interests, max_items=30, whole_words=True) -> List[Dict]:
+    """Keep articles that mention at least one interest, ranked by hits (title hits count extra)."""
+    return rank_articles(articles, interests, max_items, whole_words=whole_words)[0]
+
+
+# ----------------------------- BACKENDS -----------------------------
+class NewsBackend:
+    """Returns the raw ``articles`` list for one NewsAPI-style query."""
+
+    def fetch(self, stream: str, params: Dict) -> List[Dict]:
+        raise NotImplementedError
+
+
+class NewsAPIBackend(NewsBackend):
+    """NewsAPI over one pooled keep-alive session with retry on transient errors.
+
+    ``timeout`` applies to each HTTP attempt, so it (not the caller) bounds how
+    long a request occupies a thread. The connection pool fits every thread
+    that can call in at once: the aggregator (4), background refreshes (4)
+    and the prewarmer (5).
+    """
+
+    def __init__(self, api_key: str, base_url: str = "https://newsapi.org/v2/everything",
+                 timeout: float = 10, pool_size: int = 16):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504], allowed_methods=["GET"])
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @instrument("news.backend_fetch")
+    def fetch(self, stream, params):
+        r = self.session.get(self.base_url, params={**params, "apiKey": self.api_key}, timeout=self.timeout)
+        r.raise_for_status()
+        return r.json().get("articles", [])
+
+
+class FixtureBackend(NewsBackend):
+    """Offline stand-in: serves canned articles from a JSON file of ``{stream: [article, ...]}``."""
+
+    def __init__(self, path: str = "news_fixtures.json"):
+        self.path = path
+        with open(path, "r") as f:
+            self.articles = json.load(f)
+
+    @instrument("news.backend_fetch")
+    def fetch(self, stream, params):
+        articles = self.articles.get(stream) or self.articles.get("default", [])
+        size = params.get("pageSize", len(articles))
+        start = (params.get("page", 1) - 1) * size
+        return articles[start:start + size]
+
+
+# ----------------------------- CLIENT -----------------------------
+class NewsClient:
+    """TTL cache in front of a NewsBackend, keyed by (stream, keywords, days, page_size).
+
+    Fresh entries (younger than ``ttl``) are returned directly. Entries older
+    than ``ttl`` but younger than ``stale_ttl`` are returned immediately while a
+    background refresh runs (stale-while-revalidate). Anything older, or
+    missing, is fetched synchronously. Entries are mirrored to ``cache_dir`` so
+    a restart does not empty the cache.
+
+    With a ``shared`` cache (see shared_cache.py) every fetch is published to
+    the other server processes, an entry that is missing or past ``ttl`` here
+    is first looked up there, and a refresh is skipped when another process
+    refreshed the same query within the last ``ttl / 2`` seconds.
+    """
+
+    def __init__(self, backend: NewsBackend, ttl: float = 900, stale_ttl: float = 6 * 3600,
+                 cache_dir: Optional[str] = ".news_cache", max_workers: int = 4, shared=None):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.cache_dir = cache_dir
+        self.shared = shared
+        self._cache: Dict[Tuple, Tuple[float, List[Dict]]] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="news-refresh")
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(stream, keywords, days, page_size, page=1) -> Tuple:
+        # Page 1 keeps the original key shape so existing disk caches stay valid
+        key = (stream, tuple(keywords), days, page_size)
+        return key if page == 1 else key + (page,)
+
+    def _disk_path(self, key) -> str:
+        digest = hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "r") as f:
+                data = json.load(f)
+            return data["fetched_at"], data["articles"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key, fetched_at, articles):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump({"key": key, "fetched_at": fetched_at, "articles": articles}, f)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def _fetch(self, key) -> List[Dict]:
+        stream, keywords, days, page_size = key[:4]
+        page = key[4] if len(key) > 4 else 1
+        articles = self.backend.fetch(stream, build_news_params(stream, list(keywords), days, page_size, page))
+        fetched_at = time.time()
+        with self._lock:
+            self._cache[key] = (fetched_at, articles)
+        self._write_disk(key, fetched_at, articles)
+        if self.shared is not None:
+            self.shared.put("news", key, {"fetched_at": fetched_at, "articles": articles}, self.stale_ttl)
+        return articles
+
+    def _read_shared(self, key):
+        data = self.shared.get("news", key) if self.shared is not None else None
+        return (data["fetched_at"], data["articles"]) if data else None
+
+    def _fetch_once(self, key) -> List[Dict]:
+        """Fetch, unless another process holds the refresh lease for ``key`` and has published a copy."""
+        if self.shared is not None and not self.shared.add("news-refresh", key, 1, self.ttl / 2):
+            entry = self._read_shared(key)
+            if entry is not None:
+                incr("news.shared_refresh_skipped")
+                with self._lock:
+                    self._cache[key] = entry
+                return entry[1]
+        return self._fetch(key)
+
+    def _refresh(self, key):
+        try:
+            self._fetch_once(key)
+        except Exception:
+            pass  # keep serving the stale copy; next request retries
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get_articles(self, stream, keywords, days=21, page_size=50, page=1) -> List[Dict]:
+        return self.get_articles_status(stream, keywords, days, page_size, page)[0]
+
+    def get_articles_status(self, stream, keywords, days=21, page_size=50, page=1,
+                            allow_stale=True) -> Tuple[List[Dict], str]:
+        """``get_articles`` plus where the answer came from.
+
+        The source is "memory", "disk" or "shared" for a fresh cached copy,
+        "stale" for a stale copy served while it refreshes, and "network"
+        when the backend was called. With ``allow_stale=False`` a copy past
+        ``ttl`` is fetched again synchronously instead of served stale.
+        """
+        key = self.make_key(stream, keywords, days, page_size, page)
+        entry, source = self._cache.get(key), "memory"
+        if entry is None:
+            entry, source = self._read_disk(key), "disk"
+            if entry is not None:
+                with self._lock:
+                    self._cache[key] = entry
+        if self.shared is not None and (entry is None or time.time() - entry[0] >= self.ttl):
+            newer = self._read_shared(key)
+            if newer is not None and (entry is None or newer[0] > entry[0]):
+                incr("news.shared_hit")
+                entry, source = newer, "shared"
+                with self._lock:
+                    self._cache[key] = entry
+
+        if entry is not None:
+            age = time.time() - entry[0]
+            if age < self.ttl:
+                self.hits += 1
+                incr("news.cache_hit")
+                return entry[1], source
+            if allow_stale and age < self.stale_ttl:
+                self.stale_hits += 1
+                incr("news.cache_stale")
+                with self._lock:
+                    start = key not in self._refreshing
+                    self._refreshing.add(key)
+                if start:
+                    self._pool.submit(self._refresh, key)
+                return entry[1], "stale"
+
+        self.misses += 1
+        incr("news.cache_miss")
+        return self._fetch(key), "network"
+
+    def refresh(self, stream, keywords, days=21, page_size=50, page=1) -> List[Dict]:
+        """Fetch from the backend now, regardless of cache age (or take another process's fresh refresh)."""
+        return self._fetch_once(self.make_key(stream, keywords, days, page_size, page))
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+def make_backend(name: str, api_key: str = "", base_url: str = "https://newsapi.org/v2/everything",
+                 fixture_path: str = "news_fixtures.json", timeout: float = 10) -> NewsBackend:
+    if name == "fixture":
+        return FixtureBackend(fixture_path)
+    if name == "newsapi":
+        return NewsAPIBackend(api_key, base_url, timeout=timeout)
+    raise ValueError(f"Unknown news backend: {name}")
+
+
+_clients: Dict[Tuple, NewsClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_news_client(backend: str = "newsapi", api_key: str = "", base_url: str = "https://newsapi.org/v2/everything",
+                    fixture_path: str = "news_fixtures.json", ttl: float = 900,
+                    cache_dir: Optional[str] = ".news_cache", shared=None, timeout: float = 10) -> NewsClient:
+    """Process-wide client per configuration, so the cache and session survive Streamlit reruns.
+
+    ``timeout`` is the HTTP timeout of each NewsAPI request (connect and read).
+    """
+    key = (backend, api_key, base_url, fixture_path, ttl, cache_dir, id(shared), timeout)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = NewsClient(make_backend(backend, api_key, base_url, fixture_path, timeout), ttl=ttl,
+                                cache_dir=cache_dir, shared=shared)
+            _clients[key] = client
+    return client
@@ -0,0 +1,95 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from news_client import NewsClient, score_articles
+
+
+class NewsPrewarmer:
+    """Re-scores a fixed set of stream feeds on an interval and keeps the results in memory.
+
+    Each cycle fetches only the combined OR query (page 1) of every stream,
+    so a cycle costs at most one NewsAPI request per stream. Requests go
+    through the client's cache, so its TTL (and, with a shared cache, the
+    cross-process refresh lease) decides whether it costs one at all; a
+    copy past the TTL is re-fetched rather than served stale, so a list is
+    never older than the TTL when it is stored. ``get(stream)`` never
+    touches the network: it returns the last scored list for that stream,
+    or None if the stream is not pre-warmed, its first refresh has not
+    finished yet, or its last successful refresh is older than ``max_age``
+    (two intervals by default, so one failed cycle is tolerated).
+    """
+
+    def __init__(self, client: NewsClient, feeds: Dict[str, List[str]], interval: float = 600,
+                 days: int = 14, page_size: int = 30, max_items: int = 10, max_workers: int = 5,
+                 max_age: Optional[float] = None):
+        self.client = client
+        self.feeds = dict(feeds)
+        self.interval = interval
+        self.days = days
+        self.page_size = page_size
+        self.max_items = max_items
+        self.max_workers = max_workers
+        self.max_age = 2 * interval if max_age is None else max_age
+        self._results: Dict[str, Tuple[float, List[Dict]]] = {}
+        self._errors: Dict[str, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _refresh_stream(self, stream: str):
+        keywords = self.feeds[stream]
+        try:
+            articles, _ = self.client.get_articles_status(stream, keywords, days=self.days,
+                                                          page_size=self.page_size, allow_stale=False)
+            ranked = score_articles(articles, keywords, self.max_items)
+        except Exception as e:
+            self._errors[stream] = str(e)
+            return
+        self._results[stream] = (time.time(), ranked)
+        self._errors.pop(stream, None)
+
+    def refresh_all(self):
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="news-prewarm") as pool:
+            list(pool.map(self._refresh_stream, self.feeds))
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh_all()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="news-prewarmer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def get(self, stream: str) -> Optional[List[Dict]]:
+        entry = self._results.get(stream)
+        if entry is None or time.time() - entry[0] > self.max_age:
+            return None
+        return entry[1]
+
+    def status(self) -> Dict[str, Dict]:
+        return {
+            s: {"refreshed_at": self._results.get(s, (None,))[0], "error": self._errors.get(s)}
+            for s in self.feeds
+        }
+
+
+_prewarmers: Dict[int, NewsPrewarmer] = {}
+_prewarmers_lock = threading.Lock()
+
+
+def get_news_prewarmer(client: NewsClient, feeds: Dict[str, List[str]], **kwargs) -> NewsPrewarmer:
+    """Start (once per client) and return the background prewarmer for ``feeds``."""
+    with _prewarmers_lock:
+        prewarmer = _prewarmers.get(id(client))
+        if prewarmer is None:
+            prewarmer = NewsPrewarmer(client, feeds, **kwargs).start()
+            _prewarmers[id(client)] = prewarmer
+    return prewarmer
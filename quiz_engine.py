@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class CompiledQuiz:
+    """One question set from career_questions.json compiled into dense arrays.
+
+    ``weights[q, o, s]`` is the weight option ``o`` of question ``q`` gives to
+    stream ``s``. Questions are kept in ``sorted()`` key order, the order the
+    quiz pages render them and the order answers are submitted in.
+    """
+
+    def __init__(self, questions: Dict):
+        self.q_keys = sorted(questions.keys())
+        self.questions = [questions[k]["question"] for k in self.q_keys]
+        self.option_keys: List[List[str]] = [list(questions[k]["options"].keys()) for k in self.q_keys]
+        self.option_texts: List[List[str]] = [
+            [opt["text"] for opt in questions[k]["options"].values()] for k in self.q_keys
+        ]
+        self.key_to_index: List[Dict[str, int]] = [{k: i for i, k in enumerate(keys)} for keys in self.option_keys]
+        self.text_to_key: List[Dict[str, str]] = [
+            dict(zip(texts, keys)) for texts, keys in zip(self.option_texts, self.option_keys)
+        ]
+
+        self.streams: List[str] = []
+        stream_index: Dict[str, int] = {}
+        all_int = True
+        for k in self.q_keys:
+            for opt in questions[k]["options"].values():
+                for s, w in opt["weights"].items():
+                    if s not in stream_index:
+                        stream_index[s] = len(self.streams)
+                        self.streams.append(s)
+                    all_int = all_int and isinstance(w, int)
+        self.stream_index = stream_index
+
+        n_q = len(self.q_keys)
+        n_o = max((len(keys) for keys in self.option_keys), default=0)
+        n_s = len(self.streams)
+        self.weights = np.zeros((n_q, n_o, n_s), dtype=np.int64 if all_int else np.float64)
+        # Position of each stream inside its option's weights dict; used to
+        # reproduce the stream order the dict-based scorer produced (ties in
+        # recommend() are broken by first appearance).
+        self._max_pos = max(n_s, 1)
+        self._absent = n_q * self._max_pos + 1
+        self.first_pos = np.full((n_q, n_o, n_s), self._absent, dtype=np.int64)
+        for qi, k in enumerate(self.q_keys):
+            for oi, opt in enumerate(questions[k]["options"].values()):
+                for pos, (s, w) in enumerate(opt["weights"].items()):
+                    si = stream_index[s]
+                    self.weights[qi, oi, si] = w
+                    self.first_pos[qi, oi, si] = qi * self._max_pos + pos
+
+    def __len__(self):
+        return len(self.q_keys)
+
+    def option_key(self, q_idx: int, text: str) -> Optional[str]:
+        return self.text_to_key[q_idx].get(text)
+
+    def answer_indices(self, answers: Sequence[str]) -> np.ndarray:
+        """Option keys for one sheet -> option indices (-1 for unknown or missing answers)."""
+        idx = np.full(len(self.q_keys), -1, dtype=np.int64)
+        for qi, ans in enumerate(answers[: len(self.q_keys)]):
+            idx[qi] = self.key_to_index[qi].get(ans, -1)
+        return idx
+
+    def score_indices(self, idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Score an (N, Q) matrix of option indices in one pass.
+
+        Returns ``(totals, first_seen)``, both (N, S). ``first_seen`` is the
+        ordering key of each stream's first weight on the sheet, or a sentinel
+        larger than any real key when the stream never appeared.
+        """
+        idx = np.atleast_2d(idx)
+        valid = idx >= 0
+        safe = np.where(valid, idx, 0)
+        q = np.arange(len(self.q_keys))
+        picked = self.weights[q, safe]                      # (N, Q, S)
+        totals = (picked * valid[..., None]).sum(axis=1)
+        pos = np.where(valid[..., None], self.first_pos[q, safe], self._absent)
+        return totals, pos.min(axis=1, initial=self._absent)
+
+    def score_batch(self, sheets: Sequence[Sequence[str]], chunk_size: int = 65536) -> Tuple[np.ndarray, np.ndarray]:
+        idx = np.stack([self.answer_indices(a) for a in sheets]) if len(sheets) else \
+            np.empty((0, len(self.q_keys)), dtype=np.int64)
+        if len(idx) <= chunk_size:
+            return self.score_indices(idx)
+        parts = [self.score_indices(idx[i:i + chunk_size]) for i in range(0, len(idx), chunk_size)]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def to_dict(self, totals: np.ndarray, first_seen: np.ndarray) -> Dict[str, float]:
+        """One row of score_indices() output -> {stream: score} in first-appearance order."""
+        order = [si for si in np.argsort(first_seen, kind="stable") if first_seen[si] < self._absent]
+        return {self.streams[si]: totals[si].item() for si in order}
+
+    def score(self, answers: Sequence[str]) -> Dict[str, float]:
+        totals, first_seen = self.score_indices(self.answer_indices(answers))
+        return self.to_dict(totals[0], first_seen[0])
+
+    def recommend_batch(self, totals: np.ndarray, first_seen: np.ndarray, k: int = 3) -> List[List[Optional[str]]]:
+        """Top-k streams per sheet (highest score, ties by first appearance), padded with None."""
+        order = np.lexsort((first_seen, -totals), axis=-1)[:, :k]
+        out = []
+        for row, fs in zip(order, first_seen):
+            picks = [self.streams[si] for si in row if fs[si] < self._absent]
+            out.append(picks + [None] * (k - len(picks)))
+        return out
+
+
+class QuizBank:
+    """The main quiz plus every specialization quiz, compiled."""
+
+    def __init__(self, data: Dict):
+        self.main = CompiledQuiz(data.get("main") or {})
+        self.sub = {stream: CompiledQuiz(qs) for stream, qs in (data.get("sub") or {}).items()}
+
+
+_banks: Dict[str, Tuple[Optional[float], QuizBank]] = {}
+_banks_lock = threading.Lock()
+
+
+def get_quiz_bank(path: str) -> QuizBank:
+    """Compile ``path`` once per file version (rebuilt when its mtime changes)."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    entry = _banks.get(path)
+    if entry is not None and entry[0] == mtime:
+        return entry[1]
+    with _banks_lock:
+        entry = _banks.get(path)
+        if entry is None or entry[0] != mtime:
+            data = {}
+            if mtime is not None:
+                with open(path, "r") as f:
+                    data = json.load(f)
+            entry = (mtime, QuizBank(data))
+            _banks[path] = entry
+    return entry[1]
+
+
+def clear_quiz_banks():
+    with _banks_lock:
+        _banks.clear()
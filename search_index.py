@@ -0,0 +1,153 @@
+import re
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from college_index import get_college_index
+
+
+# Field -> weight when ranking; a hit in the college name counts most.
+SEARCH_FIELDS = {"College": 3.0, "Courses": 2.0, "Location": 2.0}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    # Dots are dropped rather than split on, so "B.Sc" and "BSc" both become "bsc"
+    if not isinstance(text, str):
+        return []
+    return _TOKEN_RE.findall(text.lower().replace(".", ""))
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Token + trigram inverted index over the Explore page's text columns.
+
+    A query token matches a vocabulary term exactly, as a prefix, or (if
+    neither finds anything) fuzzily by trigram similarity. Every query token
+    has to match for a row to be returned; rows are ranked by the summed
+    field-weighted match quality.
+    """
+
+    def __init__(self, df: pd.DataFrame, fields: Dict[str, float] = None,
+                 fuzzy_threshold: float = 0.45):
+        self.fields = {f: w for f, w in (fields or SEARCH_FIELDS).items() if f in df.columns}
+        self.fuzzy_threshold = fuzzy_threshold
+        self.n_rows = len(df)
+        # term -> {row_id: best field weight}, frozen below into (row ids, weights) arrays
+        postings: Dict[str, Dict[int, float]] = {}
+        for field, weight in self.fields.items():
+            for row_id, value in enumerate(df[field].tolist()):
+                for tok in tokenize(value):
+                    rows = postings.setdefault(tok, {})
+                    if rows.get(row_id, 0.0) < weight:
+                        rows[row_id] = weight
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            term: (np.fromiter(rows.keys(), dtype=np.int64, count=len(rows)),
+                   np.fromiter(rows.values(), dtype=np.float32, count=len(rows)))
+            for term, rows in postings.items()
+        }
+
+        self.vocab = sorted(self.postings)
+        self.trigram_index: Dict[str, Set[str]] = {}
+        for term in self.vocab:
+            for g in trigrams(term):
+                self.trigram_index.setdefault(g, set()).add(term)
+        self._lock = threading.Lock()
+        self._expansions: Dict[str, List[Tuple[str, float]]] = {}
+
+    def _prefix_terms(self, token: str) -> List[str]:
+        i = bisect_left(self.vocab, token)
+        out = []
+        while i < len(self.vocab) and self.vocab[i].startswith(token):
+            out.append(self.vocab[i])
+            i += 1
+        return out
+
+    def _fuzzy_terms(self, token: str) -> List[Tuple[str, float]]:
+        grams = trigrams(token)
+        counts: Dict[str, int] = {}
+        for g in grams:
+            for term in self.trigram_index.get(g, ()):
+                counts[term] = counts.get(term, 0) + 1
+        out = []
+        for term, shared in counts.items():
+            sim = shared / (len(grams) + len(trigrams(term)) - shared)
+            if sim >= self.fuzzy_threshold:
+                out.append((term, sim))
+        return out
+
+    def expand(self, token: str) -> List[Tuple[str, float]]:
+        """Vocabulary terms a query token matches, with a match-quality factor in (0, 1]."""
+        cached = self._expansions.get(token)
+        if cached is not None:
+            return cached
+        terms = []
+        if token in self.postings:
+            terms.append((token, 1.0))
+        terms += [(t, 0.8) for t in self._prefix_terms(token) if t != token]
+        if not terms:
+            terms = [(t, 0.6 * sim) for t, sim in self._fuzzy_terms(token)]
+        with self._lock:
+            if len(self._expansions) > 10000:
+                self._expansions.clear()
+            self._expansions[token] = terms
+        return terms
+
+    def search(self, query: str, limit: Optional[int] = 50) -> List[int]:
+        """Row ids matching ``query``, best first (ties keep dataset order)."""
+        return [row for row, _ in self.search_scored(query, limit)]
+
+    def search_scored(self, query: str, limit: Optional[int] = 50) -> List[Tuple[int, float]]:
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self.n_rows:
+            return []
+        total = np.zeros(self.n_rows, dtype=np.float32)
+        matched = np.ones(self.n_rows, dtype=bool)
+        for tok in tokens:
+            tok_scores = np.zeros(self.n_rows, dtype=np.float32)
+            for term, quality in self.expand(tok):
+                rows, weights = self.postings[term]
+                np.maximum.at(tok_scores, rows, quality * weights)
+            matched &= tok_scores > 0
+            if not matched.any():
+                return []
+            total += tok_scores
+
+        candidates = np.flatnonzero(matched)
+        scores = total[candidates]
+        if limit and len(candidates) > limit:
+            keep = np.argpartition(-scores, limit - 1)[:limit]
+            # argpartition picks arbitrarily among ties at the cut; widen to every tied row
+            cut = scores[keep].min()
+            keep = np.flatnonzero(scores >= cut)
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))
+        if limit:
+            order = order[:limit]
+        return [(int(candidates[i]), float(scores[i])) for i in order]
+
+
+_indexes: Dict[str, Tuple[object, SearchIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(path: str) -> SearchIndex:
+    """Search index for a colleges CSV, rebuilt whenever its CollegeIndex is rebuilt."""
+    colleges = get_college_index(path)
+    entry = _indexes.get(path)
+    if entry is not None and entry[0] is colleges:
+        return entry[1]
+    with _indexes_lock:
+        entry = _indexes.get(path)
+        if entry is None or entry[0] is not colleges:
+            entry = (colleges, SearchIndex(colleges.frame()))
+            _indexes[path] = entry
+    return entry[1]
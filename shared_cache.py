@@ -0,0 +1,516 @@
+"""Cache tier shared by every app process, for results that are costly to rebuild per process.
+
+    python shared_cache.py serve --port 6390       # local stand-in for Redis
+    python shared_cache.py bump roadmap            # every process drops its cached roadmaps
+
+Point the app at it with SHARED_CACHE_URL=resp://127.0.0.1:6390 (a real
+Redis works too: redis://host:6379/0). Values are JSON. Keys carry a
+per-name generation counter kept in the backend, so one ``bump`` is seen by
+all processes within ``generation_ttl`` seconds.
+
+``shared_copy`` covers read-mostly datasets: the first process converts a
+source file into an artifact under a shared directory (e.g. /dev/shm) and
+every process memory-maps that one file.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from instrumentation import incr
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent builds just race to the same atomic replace
+    fcntl = None
+
+
+class RespError(Exception):
+    """Error reply from a RESP server."""
+
+
+# ----------------------------- BACKENDS -----------------------------
+class CacheBackend:
+    """Bytes key/value store with expiry (seconds) and atomic counters."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None, only_new: bool = False) -> bool:
+        """Store ``value``; with ``only_new`` only if ``key`` is absent. Returns whether it was stored."""
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> int:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """In-process store: what the stand-in server serves, and a single-process default.
+
+    Least recently used entries are evicted past ``max_bytes``; expired
+    entries are dropped when read and swept every ``sweep_every`` writes.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, sweep_every: int = 1000):
+        self.max_bytes = max_bytes
+        self.sweep_every = sweep_every
+        self._data: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.bytes = 0
+
+    def _live(self, key: str, now: float) -> Optional[Tuple[bytes, Optional[float]]]:
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            self._drop(key)
+            return None
+        return entry
+
+    def _drop(self, key: str):
+        value, _ = self._data.pop(key)
+        self.bytes -= len(key) + len(value)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key, time.monotonic())
+            if entry is None:
+                return None
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl=None, only_new=False):
+        now = time.monotonic()
+        with self._lock:
+            if self._live(key, now) is not None:
+                if only_new:
+                    return False
+                self._drop(key)
+            self._data[key] = (value, now + ttl if ttl else None)
+            self.bytes += len(key) + len(value)
+            self._writes += 1
+            if self._writes % self.sweep_every == 0:
+                for k in [k for k, (_, exp) in self._data.items() if exp is not None and exp <= now]:
+                    self._drop(k)
+            while self.bytes > self.max_bytes and len(self._data) > 1:
+                self._drop(next(iter(self._data)))
+        return True
+
+    def incr(self, key):
+        with self._lock:
+            entry = self._live(key, time.monotonic())
+            try:
+                n = int(entry[0]) + 1 if entry else 1
+            except ValueError:
+                raise RespError("ERR value is not an integer or out of range")
+            if entry:
+                self._drop(key)
+            value = str(n).encode()
+            self._data[key] = (value, entry[1] if entry else None)
+            self.bytes += len(key) + len(value)
+            return n
+
+    def delete(self, key):
+        with self._lock:
+            if self._live(key, time.monotonic()) is None:
+                return 0
+            self._drop(key)
+            return 1
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _encode(args) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for a in args:
+        a = a if isinstance(a, bytes) else str(a).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(a), a))
+    return b"".join(out)
+
+
+def _read_reply(f):
+    line = f.readline()
+    if not line:
+        raise ConnectionError("connection closed")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        raise RespError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        n = int(rest)
+        if n < 0:
+            return None
+        data = f.read(n + 2)
+        if len(data) < n + 2:
+            raise ConnectionError("connection closed")
+        return data[:-2]
+    if kind == b"*":
+        n = int(rest)
+        return None if n < 0 else [_read_reply(f) for _ in range(n)]
+    raise RespError(f"bad reply: {line!r}")
+
+
+class RespBackend(CacheBackend):
+    """Client for the Redis protocol (RESP2), one connection per thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6390, db: int = 0, password: Optional[str] = None,
+                 timeout: float = 2.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn = (sock, sock.makefile("rb"))
+            self._local.conn = conn
+            if self.password:
+                self._call_on(conn, "AUTH", self.password)
+            if self.db:
+                self._call_on(conn, "SELECT", self.db)
+        return conn
+
+    @staticmethod
+    def _call_on(conn, *args):
+        conn[0].sendall(_encode(args))
+        return _read_reply(conn[1])
+
+    def call(self, *args):
+        """Send one command; a dropped connection is reopened and the command retried once."""
+        for attempt in (0, 1):
+            conn = self._conn()
+            try:
+                return self._call_on(conn, *args)
+            except (OSError, ConnectionError):
+                self.close()
+                if attempt:
+                    raise
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn[1].close()
+                conn[0].close()
+            except OSError:
+                pass
+
+    def get(self, key):
+        return self.call("GET", key)
+
+    def set(self, key, value, ttl=None, only_new=False):
+        args = ["SET", key, value]
+        if ttl:
+            args += ["PX", max(1, int(ttl * 1000))]
+        if only_new:
+            args.append("NX")
+        return self.call(*args) is not None
+
+    def incr(self, key):
+        return self.call("INCR", key)
+
+    def delete(self, key):
+        return self.call("DEL", key)
+
+
+# ----------------------------- STAND-IN SERVER -----------------------------
+class _RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                args = _read_reply(self.rfile)
+            except (ConnectionError, OSError, ValueError, RespError):
+                return
+            if not isinstance(args, list) or not args:
+                return
+            try:
+                reply = self.server.dispatch([a if isinstance(a, bytes) else str(a).encode() for a in args])
+            except RespError as e:
+                reply = b"-%s\r\n" % str(e).encode()
+            try:
+                self.wfile.write(reply)
+            except OSError:
+                return
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class RespServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """Enough of Redis for SharedCache: PING, GET, SET [EX|PX] [NX], INCR, DEL, EXISTS, DBSIZE, FLUSHALL.
+
+    SELECT and AUTH are accepted and ignored, so a redis:// URL works against it.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6390, store: Optional[MemoryBackend] = None):
+        self.store = store or MemoryBackend()
+        super().__init__((host, port), _RespHandler)
+
+    def dispatch(self, args: List[bytes]) -> bytes:
+        cmd, args = args[0].upper(), args[1:]
+        s = self.store
+        if cmd == b"PING":
+            return b"+PONG\r\n"
+        if cmd in (b"SELECT", b"AUTH"):
+            return b"+OK\r\n"
+        if cmd == b"GET" and len(args) == 1:
+            return _bulk(s.get(args[0].decode()))
+        if cmd == b"SET" and len(args) >= 2:
+            ttl, only_new, opts = None, False, [a.upper() for a in args[2:]]
+            try:
+                for i, opt in enumerate(opts):
+                    if opt == b"EX":
+                        ttl = float(opts[i + 1])
+                    elif opt == b"PX":
+                        ttl = float(opts[i + 1]) / 1000
+                    elif opt == b"NX":
+                        only_new = True
+            except (IndexError, ValueError):
+                raise RespError("ERR syntax error")
+            return b"+OK\r\n" if s.set(args[0].decode(), args[1], ttl, only_new) else b"$-1\r\n"
+        if cmd == b"INCR" and len(args) == 1:
+            return b":%d\r\n" % s.incr(args[0].decode())
+        if cmd == b"DEL" and args:
+            return b":%d\r\n" % sum(s.delete(k.decode()) for k in args)
+        if cmd == b"EXISTS" and args:
+            return b":%d\r\n" % sum(s.get(k.decode()) is not None for k in args)
+        if cmd == b"DBSIZE":
+            return b":%d\r\n" % len(s)
+        if cmd == b"FLUSHALL":
+            with s._lock:
+                s._data.clear()
+                s.bytes = 0
+            return b"+OK\r\n"
+        raise RespError(f"ERR unknown command or wrong arguments for '{cmd.decode(errors='replace')}'")
+
+
+def serve_in_thread(host: str = "127.0.0.1", port: int = 0) -> RespServer:
+    """Start a stand-in server on a daemon thread (port 0 picks a free one; see ``server_address``)."""
+    server = RespServer(host, port)
+    threading.Thread(target=server.serve_forever, name="resp-server", daemon=True).start()
+    return server
+
+
+# ----------------------------- SHARED CACHE -----------------------------
+_MISS = object()
+
+
+class SharedCache:
+    """JSON values in a CacheBackend under ``<namespace>:<name>:<generation>:<key digest>``.
+
+    Reads and writes never raise: a backend error counts as a miss and the
+    backend is left alone for ``retry_after`` seconds, so a stopped cache
+    server slows nothing down. Values are shared and must be treated as
+    read-only, as with SizedLRU.
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str = "compass", generation_ttl: float = 1.0,
+                 retry_after: float = 5.0):
+        self.backend = backend
+        self.namespace = namespace
+        self.generation_ttl = generation_ttl
+        self.retry_after = retry_after
+        self._generations: Dict[str, Tuple[float, int]] = {}
+        self._down_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _guard(self, fn: Callable, default=None):
+        if time.monotonic() < self._down_until:
+            return default
+        try:
+            return fn()
+        except (OSError, ConnectionError, RespError, ValueError):
+            self.errors += 1
+            incr("shared_cache.error")
+            self._down_until = time.monotonic() + self.retry_after
+            return default
+
+    def generation(self, name: str) -> int:
+        """Current generation of ``name``, re-read from the backend at most every ``generation_ttl`` seconds."""
+        now = time.monotonic()
+        cached = self._generations.get(name)
+        if cached is not None and now - cached[0] < self.generation_ttl:
+            return cached[1]
+        stored = self._guard(lambda: self._load_generation(name))
+        if stored is not None:
+            gen = stored
+        elif cached is not None and time.monotonic() < self._down_until:
+            gen = cached[1]  # backend unreachable: keep the last generation seen
+        else:
+            gen = 0
+        self._generations[name] = (now, gen)
+        return gen
+
+    def _load_generation(self, name: str) -> Optional[int]:
+        raw = self.backend.get(f"{self.namespace}:gen:{name}")
+        if raw is None:
+            return None
+        try:
+            return int(raw)
+        except ValueError:  # not written by bump: read as generation 0; the backend itself is fine
+            incr("shared_cache.corrupt")
+            return 0
+
+    def bump(self, name: str) -> Optional[int]:
+        """Start a new generation of ``name``: entries stored under the old one are no longer read."""
+        gen = self._guard(lambda: self.backend.incr(f"{self.namespace}:gen:{name}"))
+        if gen is not None:
+            self._generations[name] = (time.monotonic(), gen)
+        return gen
+
+    def _key(self, name: str, key: Hashable) -> str:
+        digest = hashlib.sha1(json.dumps(key, default=str).encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{name}:{self.generation(name)}:{digest}"
+
+    def _load(self, k: str):
+        raw = self.backend.get(k)
+        if raw is None:
+            return _MISS
+        try:
+            return json.loads(raw)
+        except ValueError:  # not written by put (or cut short): the backend itself is fine
+            incr("shared_cache.corrupt")
+            return _MISS
+
+    def get(self, name: str, key: Hashable) -> Optional[Any]:
+        k = self._key(name, key)
+        value = self._guard(lambda: self._load(k), _MISS)
+        if value is _MISS:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, name: str, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        k, data = self._key(name, key), json.dumps(value, default=str).encode("utf-8")
+        return bool(self._guard(lambda: self.backend.set(k, data, ttl), False))
+
+    def add(self, name: str, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store only if absent; True for the one process that got there first (a lease).
+
+        When the backend is unreachable every caller gets True, so work still gets done.
+        """
+        k, data = self._key(name, key), json.dumps(value, default=str).encode("utf-8")
+        return bool(self._guard(lambda: self.backend.set(k, data, ttl, only_new=True), True))
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+def make_backend(url: str) -> CacheBackend:
+    """``memory://`` (this process only), ``resp://host:port`` or ``redis://[:password@]host:port/db``."""
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return MemoryBackend()
+    if parsed.scheme in ("resp", "redis"):
+        db = int(parsed.path.strip("/") or 0)
+        return RespBackend(parsed.hostname or "127.0.0.1", parsed.port or (6379 if parsed.scheme == "redis" else 6390),
+                           db, parsed.password)
+    raise ValueError(f"Unknown shared cache URL: {url}")
+
+
+_caches: Dict[str, SharedCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_shared_cache(url: str) -> Optional[SharedCache]:
+    """Process-wide cache for ``url``; None when ``url`` is empty (shared tier off)."""
+    if not url:
+        return None
+    with _caches_lock:
+        cache = _caches.get(url)
+        if cache is None:
+            cache = SharedCache(make_backend(url))
+            _caches[url] = cache
+    return cache
+
+
+# ----------------------------- SHARED FILES -----------------------------
+def shared_copy(src: str, shared_dir: str, build: Callable[[str, str], None], suffix: str = ".arrow") -> str:
+    """Path of ``build(src, out)``'s output under ``shared_dir``, made once per version of ``src``.
+
+    The name carries the source's mtime and size, so editing the source makes
+    every process switch to a new copy. One process builds while the others
+    wait on a lock file; older copies are then removed (processes that still
+    have them memory-mapped keep their pages until they let go).
+    """
+    st = os.stat(src)
+    base = os.path.splitext(os.path.basename(src))[0]
+    path = os.path.join(shared_dir, f"{base}-{st.st_mtime_ns:x}-{st.st_size:x}{suffix}")
+    if os.path.exists(path):
+        return path
+    os.makedirs(shared_dir, exist_ok=True)
+    with open(os.path.join(shared_dir, f"{base}.lock"), "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if not os.path.exists(path):
+                build(src, path)
+                incr("shared_copy.build")
+                for old in glob.glob(os.path.join(glob.escape(shared_dir), f"{glob.escape(base)}-*{suffix}")):
+                    if old != path:
+                        try:
+                            os.remove(old)
+                        except OSError:
+                            pass
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared cache tier: stand-in server and admin commands.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="run a local Redis-protocol server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=6390)
+    bump = sub.add_parser("bump", help="start a new generation of a cache name (e.g. roadmap, news)")
+    bump.add_argument("name")
+    bump.add_argument("--url", default=os.environ.get("SHARED_CACHE_URL", "resp://127.0.0.1:6390"))
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        server = RespServer(args.host, args.port)
+        print(f"serving on {args.host}:{args.port}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    else:
+        gen = SharedCache(make_backend(args.url), retry_after=0).bump(args.name)
+        if gen is None:
+            print(f"could not reach {args.url}", file=sys.stderr)
+            sys.exit(1)
+        print(f"{args.name}: generation {gen}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+logger = logging.getLogger("compass.startup")
+
+
+class StartupTimer:
+    """Per-stage timings for each script run, split into cold (first run in the process) and warm reruns.
+
+    Streamlit re-executes app.py on every interaction; this module is only
+    imported once, so the timer and its history live for the whole process.
+    """
+
+    def __init__(self, keep: int = 50):
+        self.keep = keep
+        self.runs = 0
+        self.cold: Dict[str, float] = {}
+        self.warm: List[Dict[str, float]] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def begin_run(self):
+        self._local.stages = {}
+        self._local.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stages = getattr(self._local, "stages", None)
+            if stages is not None:
+                stages[name] = stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def end_run(self) -> Dict[str, float]:
+        stages = getattr(self._local, "stages", None)
+        if stages is None:
+            return {}
+        stages["total"] = (time.perf_counter() - self._local.started) * 1000
+        self._local.stages = None
+        with self._lock:
+            self.runs += 1
+            kind = "cold" if self.runs == 1 else "warm"
+            if kind == "cold":
+                self.cold = stages
+            else:
+                self.warm.append(stages)
+                del self.warm[:-self.keep]
+        logger.info("%s run %s", kind, " ".join(f"{k}={v:.1f}ms" for k, v in stages.items()))
+        return stages
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """{stage: {"cold_ms": .., "warm_mean_ms": .., "warm_last_ms": ..}}"""
+        with self._lock:
+            warm = list(self.warm)
+            cold = dict(self.cold)
+        out = {}
+        for name in list(cold) + [n for run in warm for n in run if n not in cold]:
+            vals = [run[name] for run in warm if name in run]
+            out[name] = {
+                "cold_ms": round(cold.get(name, 0.0), 2),
+                "warm_mean_ms": round(sum(vals) / len(vals), 2) if vals else 0.0,
+                "warm_last_ms": round(vals[-1], 2) if vals else 0.0,
+            }
+        return out
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,76 @@
+import os
+import sqlite3
+
+from analytics import CohortAnalytics
+
+JAMMU = {"city": " jammu ", "state": "J&K", "education": "Class 12"}
+
+
+def _analytics(tmp_path, **kw):
+    return CohortAnalytics(str(tmp_path / "analytics.db"), **kw)
+
+
+def _cells(analytics):
+    return {tuple(r[:-1]): r[-1] for r in
+            analytics.outcomes(["major", "city"]).itertuples(index=False)}
+
+
+def test_retake_moves_the_student_to_the_new_cell(tmp_path):
+    analytics = _analytics(tmp_path)
+    analytics.record_outcome("a@x", {"major": "Science"}, JAMMU)
+    analytics.record_outcome("b@x", {"major": "Science"}, {**JAMMU, "city": "Jammu"})
+    assert _cells(analytics) == {("Science", "jammu"): 2}
+
+    analytics.record_outcome("a@x", {"major": "Commerce"}, JAMMU)
+    assert _cells(analytics) == {("Science", "jammu"): 1, ("Commerce", "jammu"): 1}
+    # Retaking with the same outcome counts the student once
+    analytics.record_outcome("a@x", {"major": "Commerce"}, JAMMU)
+    analytics.record_outcome("b@x", {"major": "Commerce"}, JAMMU)
+    assert _cells(analytics) == {("Commerce", "jammu"): 2}
+
+    analytics.update_profile("b@x", {**JAMMU, "city": "Srinagar"})
+    assert _cells(analytics) == {("Commerce", "jammu"): 1, ("Commerce", "srinagar"): 1}
+
+
+def test_roadmap_requests_are_counted_per_career_and_location(tmp_path):
+    analytics = _analytics(tmp_path, flush_interval=3600)
+    for career, location in [("Doctor", "Jammu"), ("Doctor", " JAMMU"), ("Doctor", None), ("Engineer", "Leh")]:
+        analytics.record_roadmap(career, location)
+    # Pending counts are flushed before any query
+    by_place = analytics.roadmap_demand(["career", "location"])
+    assert list(by_place.itertuples(index=False, name=None)) == [
+        ("Doctor", "jammu", 2), ("Doctor", "", 1), ("Engineer", "leh", 1)]
+    assert analytics.roadmap_demand(where={"location": "leh"})["count"].tolist() == [1]
+    analytics.record_roadmap("Doctor", "Jammu")
+    assert analytics.roadmap_demand(limit=1).values.tolist() == [["Doctor", 4]]
+
+
+def test_insights_queries_read_only_the_aggregate_tables(tmp_path):
+    analytics = _analytics(tmp_path)
+    analytics.record_outcome("a@x", {"major": "Science", "sub_major": "Medical"}, JAMMU)
+    analytics.record_roadmap("Doctor", "Jammu")
+
+    read = set()
+
+    def authorizer(action, table, *_):
+        if action == sqlite3.SQLITE_READ:
+            read.add(table)
+        return sqlite3.SQLITE_OK
+
+    analytics._conn().set_authorizer(authorizer)
+    analytics.outcomes(["major", "sub_major"], where={"state": "j&k"})
+    analytics.roadmap_demand(["career"])
+    analytics.values("education")
+    assert read == {"outcome_counts", "roadmap_demand"}
+
+
+def test_exit_flush_writes_pending_counts_without_creating_files(tmp_path, monkeypatch):
+    analytics = _analytics(tmp_path, flush_interval=3600)
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    analytics._flush_at_exit()
+    analytics.record_roadmap("Doctor", "Jammu")
+    analytics._flush_at_exit()
+    assert os.listdir(elsewhere) == []
+    assert analytics.roadmap_demand()["count"].tolist() == [1]
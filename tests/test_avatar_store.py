@@ -0,0 +1,65 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from avatar_store import AvatarStore
+
+
+def _image(fmt="PNG", size=(200, 100), color=(200, 30, 30)):
+    out = io.BytesIO()
+    Image.new("RGB", size, color).save(out, format=fmt)
+    return out.getvalue()
+
+
+def _size(png):
+    with Image.open(io.BytesIO(png)) as img:
+        return img.size
+
+
+def test_identical_uploads_share_one_file(tmp_path):
+    store = AvatarStore(str(tmp_path / "avatars"), thumb_px=80)
+    first = store.save(_image())
+    assert store.save(_image()) == first
+    other = store.save(_image(color=(0, 0, 255)))
+    assert other != first
+    jpeg = store.save(_image("JPEG"))
+    assert jpeg.endswith(".jpg")
+
+    files = sorted(f for _, _, names in os.walk(tmp_path / "avatars") for f in names)
+    # One original and one thumbnail per distinct image, no temp files left behind
+    assert len(files) == 6 and not any(f.endswith(".tmp") for f in files)
+    with open(first, "rb") as f:
+        assert f.read() == _image()
+
+
+def test_thumbnails_are_cached_and_regenerated(tmp_path):
+    root = str(tmp_path / "avatars")
+    path = AvatarStore(root, thumb_px=80).save(_image())
+    stored = AvatarStore(root, thumb_px=80).thumb_path(path)
+    with open(stored, "rb") as f:
+        assert _size(f.read()) == (80, 40)
+
+    store = AvatarStore(root, thumb_px=80)
+    thumb = store.thumbnail(path)
+    os.remove(stored)
+    # Served from memory once warm
+    assert store.thumbnail(path) == thumb
+    assert store.stats()["hits"] == 1
+    # A fresh process without the stored thumbnail rebuilds it from the original
+    assert _size(AvatarStore(root, thumb_px=80).thumbnail(path)) == (80, 40)
+
+    outside = tmp_path / "default.png"
+    outside.write_bytes(_image(size=(40, 40)))
+    assert store.thumb_path(str(outside)) is None
+    assert _size(store.thumbnail(str(outside))) == (40, 40)
+
+
+@pytest.mark.parametrize("data", [b"not an image", _image("GIF"), _image()[:40]])
+def test_invalid_uploads_are_rejected(tmp_path, data):
+    store = AvatarStore(str(tmp_path / "avatars"))
+    with pytest.raises(ValueError):
+        store.save(data)
+    assert not os.path.exists(tmp_path / "avatars") or not any(os.scandir(tmp_path / "avatars"))
+    assert store.thumbnail(str(tmp_path / "missing.png")) is None
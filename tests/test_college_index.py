@@ -0,0 +1,50 @@
+import pandas as pd
+import pyarrow as pa
+
+from college_index import COLLEGE_COLUMNS, CollegeIndex, write_mirror
+
+
+def _csv(tmp_path):
+    path = tmp_path / "colleges.csv"
+    pd.DataFrame({
+        "College": ["Zeta College ", "alpha Institute", "Beta College", "Zeta College"],
+        "Location": ["Jammu", " Srinagar", "Jammu", "Jammu"],
+        "Website": ["z.edu", "a.edu", "", "z.edu"],
+        "Courses": ["B.Tech, BCA", "MBA", "B.Sc;B.Tech", "B.Tech, BCA"],
+        "Skills": ["Python", "", "Java, python", "Python"],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def test_rows_are_cleaned_and_built_on_demand(tmp_path):
+    index = CollegeIndex.from_csv(_csv(tmp_path))
+    assert isinstance(index.table, pa.Table)
+    assert index.table.column_names == COLLEGE_COLUMNS
+    assert index.records([1, 0]) == [
+        {"College": "alpha Institute", "Location": "Srinagar", "Website": "a.edu", "Courses": "MBA", "Skills": ""},
+        {"College": "Zeta College", "Location": "Jammu", "Website": "z.edu", "Courses": "B.Tech, BCA", "Skills": "Python"},
+    ]
+    assert index.records([]) == []
+    assert list(index.frame([2])["College"]) == ["Beta College"]
+    assert len(index.frame()) == 4
+
+
+def test_duplicates_name_rank_and_locations(tmp_path):
+    index = CollegeIndex.from_csv(_csv(tmp_path))
+    assert index.is_duplicate.tolist() == [False, False, False, True]
+    # Byte order, stable: "Beta" < "Zeta" (row 0) < "Zeta" (row 3) < "alpha"
+    assert index.name_rank.tolist() == [1, 3, 0, 2]
+    assert index.location_labels == ["Jammu", "Srinagar"]
+    assert index.location_codes.tolist() == [0, 1, 0, 0]
+    assert index.location_rows("jammu") == frozenset({0, 2, 3})
+
+
+def test_mirror_reads_back_as_the_csv_index(tmp_path):
+    csv = _csv(tmp_path)
+    mirror = str(tmp_path / "colleges.arrow")
+    write_mirror(csv, mirror)
+    a, b = CollegeIndex.from_csv(csv), CollegeIndex.from_artifact(mirror)
+    assert a.records(range(4)) == b.records(range(4))
+    assert (a.course_vocab, a.course_indptr.tolist(), a.course_ids.tolist()) == \
+        (b.course_vocab, b.course_indptr.tolist(), b.course_ids.tolist())
+    assert a.career_scores(["b.tech"], ["python"]) == b.career_scores(["b.tech"], ["python"])
@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import event_log
+from event_log import EventLog, log_files, read_events, summarize
+
+
+def _lines(path):
+    return [json.loads(line) for name in log_files(path) for line in open(name, encoding="utf-8")]
+
+
+def test_close_writes_everything_queued(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    log = EventLog(path, flush_interval=60)
+    event_log.set_context(sid="s1")
+    for i in range(25):
+        log.emit("page", n=i)
+    log.close()
+    lines = _lines(path)
+    assert [e["n"] for e in lines] == list(range(25))
+    assert all(e["sid"] == "s1" and e["event"] == "page" for e in lines)
+    assert log.stats() == {"queued": 0, "written": 25, "dropped": 0, "errors": 0}
+
+
+def test_two_writers_rotate_at_the_threshold_without_losing_lines(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    # Two logs on one file stand in for two server processes; only the flock orders them
+    logs = [EventLog(path, max_bytes=2000, backups=100, batch_size=10, flush_interval=0.01) for _ in range(2)]
+
+    def write(w):
+        for i in range(200):
+            logs[w].emit("roadmap", writer=w, n=i, pad="x" * 20)
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for log in logs:
+        log.close()
+
+    files = log_files(path)
+    assert len(files) > 2
+    assert all(os.path.getsize(name) <= 2000 for name in files)
+    lines = _lines(path)
+    assert sorted((e["writer"], e["n"]) for e in lines) == [(w, i) for w in range(2) for i in range(200)]
+    # Oldest file first, so each writer's events read back in emit order
+    for w in range(2):
+        assert [e["n"] for e in lines if e["writer"] == w] == list(range(200))
+
+
+def test_summary_reads_rotated_files(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    log = EventLog(path, max_bytes=300, backups=10, batch_size=1, flush_interval=0.01)
+    for ms in range(1, 11):
+        log.emit("news", page="notifications", ms=float(ms), cache_hit=ms > 5)
+    log.emit("search", page="explore", ms=2.0)
+    log.close()
+    assert len(log_files(path)) > 1
+
+    rows = summarize(read_events(path), by="page")
+    assert [(r["event"], r["page"], r["count"]) for r in rows] == [("news", "notifications", 10),
+                                                                   ("search", "explore", 1)]
+    assert rows[0]["max_ms"] == 10.0 and rows[0]["p50_ms"] == 5.5
+    assert rows[0]["cache_hit_rate"] == 0.5 and rows[1]["cache_hit_rate"] is None
+
+
+def _emit_in_worker(path, n):
+    log = event_log.get_event_log(path)
+    for i in range(2000):
+        log.emit("batch", chunk=n, n=i)
+    return n
+
+
+def test_pool_workers_write_their_events_before_exiting(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    # A worker returns with most of its burst still queued; only the finalizer writes it out
+    with ProcessPoolExecutor(max_workers=2, initializer=event_log.close_in_worker) as pool:
+        assert list(pool.map(_emit_in_worker, [path] * 2, range(2))) == [0, 1]
+    assert len(_lines(path)) == 4000
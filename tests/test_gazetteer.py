@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import core
+from college_index import CollegeIndex
+from gazetteer import Gazetteer, GeoIndex, Place, haversine_km
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def gazetteer():
+    places = [
+        Place("Jammu", "Jammu", "J&K", 32.73, 74.86),
+        Place("R S Pura", "Jammu", "J&K", 32.61, 74.73),
+        Place("Srinagar", "Srinagar", "J&K", 34.08, 74.80),
+        Place("Ghagwal", "Samba", "J&K", 32.53, 75.10),
+    ]
+    return Gazetteer(places, aliases={"RSPura": "R S Pura"})
+
+
+def test_resolve_variants(gazetteer):
+    assert gazetteer.resolve("R.S.Pura").name == "R S Pura"
+    assert gazetteer.resolve("rspura").name == "R S Pura"
+    assert gazetteer.resolve("Ghagwal,Samba").name == "Ghagwal"
+    assert gazetteer.resolve("Srinagar district").name == "Srinagar"
+    assert gazetteer.resolve("Nowhere") is None
+
+
+def test_district_resolves_to_centre_of_its_places(gazetteer):
+    samba = gazetteer.resolve("Samba")
+    assert (samba.district, samba.lat, samba.lon) == ("Samba", 32.53, 75.10)
+
+
+def test_rings_yield_every_located_row_once_with_a_valid_bound():
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(32.0, 35.0, 500)
+    lons = rng.uniform(73.0, 76.5, 500)
+    lats[::50] = np.nan
+    index = GeoIndex(lats, lons, cell_deg=0.25)
+    origin = (33.2, 74.4)
+
+    seen = []
+    for min_km, rows, km in index.rings(*origin):
+        seen.extend(rows.tolist())
+        np.testing.assert_allclose(km, haversine_km(*origin, lats[rows], lons[rows]))
+        # Nothing in a later ring is closer than the bound
+        rest = np.setdiff1d(np.flatnonzero(~np.isnan(lats)), seen)
+        assert (haversine_km(*origin, lats[rest], lons[rest]) >= min_km - 1e-6).all()
+
+    assert sorted(seen) == np.flatnonzero(~np.isnan(lats)).tolist()
+    assert index.unlocated.tolist() == np.flatnonzero(np.isnan(lats)).tolist()
+
+
+def test_rings_on_an_empty_index():
+    assert list(GeoIndex(np.array([np.nan]), np.array([np.nan])).rings(33.0, 74.0)) == []
+
+
+@pytest.fixture
+def colleges():
+    return CollegeIndex(pd.DataFrame({
+        "College": ["A", "B", "C", "D"],
+        "Location": ["Gandhi Nagar, Jammu", "Jammuwala", "Srinagar (Main)", "R.S. Pura"],
+        "Website": ["a", "b", "c", "d"],
+        "Courses": ["B.Tech", "B.Tech", "B.Tech", "BCA"],
+        "Skills": ["", "", "", ""],
+    }))
+
+
+def test_location_rows_match_whole_place_names(colleges):
+    assert colleges.location_rows("jammu") == {0}
+    assert colleges.location_rows(" JAMMU, ") == {0}
+    assert colleges.location_rows("r s pura") == {3}
+    assert colleges.location_rows("Srinagar (Main)") == {2}
+
+
+@pytest.mark.parametrize("text", ["(", "*", "[a-", "\\", "Jammu("])
+def test_location_rows_treat_regex_characters_as_text(colleges, text):
+    expected = {0} if text == "Jammu(" else set()
+    assert colleges.location_rows(text) == expected
+
+
+@pytest.mark.parametrize("location", ["(", "*", "Jammu)"])
+def test_roadmap_accepts_any_typed_location(monkeypatch, colleges, location):
+    monkeypatch.setattr(core, "GAZETTEER_FILE", os.path.join(REPO, "gazetteer.csv"))
+    roadmap = core._build_roadmap(colleges, "Software Developer", location)
+    assert roadmap["colleges"]
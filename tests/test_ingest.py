@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+import ingest
+from college_index import CollegeIndex
+
+
+def _chunks():
+    return [
+        pd.DataFrame({
+            "College": ["Govt. College", "  ", "Model  Institute"],
+            "Location": ["Jammu", "Jammu", "Srinagar"],
+            "Website": ["", "x.edu", "m.edu"],
+            "Courses": ["BA, B.Sc", "BA", "MBA"],
+        }),
+        pd.DataFrame({
+            "College": ["govt college", "Model Institute"],
+            "Location": ["jammu ", "Srinagar"],
+            "Website": ["g.edu", "other.edu"],
+            "Courses": ["b.sc, B.Com", ""],
+            "Skills": ["Python", "Java"],
+        }),
+    ]
+
+
+def _ingest(chunks, size=None):
+    ingestor = ingest.Ingestor()
+    for chunk in chunks:
+        for start in range(0, len(chunk), size or len(chunk)):
+            ingestor.add_chunk(chunk.iloc[start:start + (size or len(chunk))])
+    return ingestor
+
+
+def test_duplicates_merge_across_chunks():
+    ingestor = _ingest(_chunks())
+    assert (len(ingestor), ingestor.read, ingestor.merged, ingestor.skipped) == (2, 5, 2, 1)
+    assert ingestor.to_table().to_pylist() == [
+        {"College": "Govt. College", "Location": "Jammu", "Website": "g.edu",
+         "Courses": "BA, B.Sc, B.Com", "Skills": "Python",
+         "CourseTokens": ["BA", "B.Sc", "B.Com"], "SkillTokens": ["Python"]},
+        {"College": "Model Institute", "Location": "Srinagar", "Website": "m.edu",
+         "Courses": "MBA", "Skills": "Java",
+         "CourseTokens": ["MBA"], "SkillTokens": ["Java"]},
+    ]
+
+
+def test_result_does_not_depend_on_chunking():
+    assert _ingest(_chunks(), size=1).to_table().equals(_ingest(_chunks()).to_table())
+
+
+def test_empty_ingest_has_the_artifact_schema():
+    assert ingest.Ingestor().to_table().column_names == ingest.ARTIFACT_COLUMNS
+
+
+@pytest.mark.parametrize("suffix", [".arrow", ".parquet"])
+def test_artifact_round_trip(tmp_path, suffix):
+    table = _ingest(_chunks()).to_table()
+    path = str(tmp_path / f"colleges{suffix}")
+    ingest.write_artifact(table, path)
+    assert ingest.read_artifact(path).equals(table)
+    index = CollegeIndex.from_artifact(path)
+    assert index.records([0, 1]) == table.select(["College", "Location", "Website", "Courses", "Skills"]).to_pylist()
+    assert index.course_vocab == ["ba", "b.sc", "b.com", "mba"]
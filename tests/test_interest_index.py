@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+import core
+from interest_index import InterestIndex, analyze, terms
+
+DOCS = {
+    "Civil Engineer": [("Civil Engineer", 3.0), ("bridges construction", 3.0), ("B.Tech Civil", 2.0)],
+    "Doctor": [("Doctor", 3.0), ("medicine hospital patients", 3.0), ("MBBS", 2.0)],
+    "Data Analyst": [("Data Analyst", 3.0), ("statistics mathematics data", 3.0), ("B.Sc", 2.0)],
+}
+
+
+def test_analyze_stems_and_drops_stopwords():
+    assert analyze("I love designing Buildings") == ["design", "build"]
+    assert analyze("B.Sc") == analyze("BSc") == ["bsc"]
+    assert analyze(None) == []
+
+
+def test_terms_add_adjacent_pairs():
+    assert terms("drawing tall buildings") == ["draw", "tall", "build", "draw tall", "tall build"]
+
+
+def test_phrase_beats_scattered_words():
+    index = InterestIndex({
+        "Architect": [("drawing buildings", 1.0), ("physics", 1.0)],
+        "Designer": [("drawing", 1.0), ("buildings", 1.0)],
+    })
+    assert index.suggest("drawing buildings")[0][0] == "Architect"
+    assert index.suggest("buildings and drawing")[0][0] == "Designer"
+
+
+def test_suggest_ranks_the_matching_career_first():
+    index = InterestIndex(DOCS)
+    assert index.suggest("designing bridges")[0][0] == "Civil Engineer"
+    assert index.suggest("caring for patients in a hospital")[0][0] == "Doctor"
+    top = index.suggest("bridges and statistics", k=3)
+    assert {label for label, _ in top} == {"Civil Engineer", "Data Analyst"}
+    assert all(0 < score <= 1 for _, score in top)
+
+
+def test_prefix_fallback_and_no_overlap():
+    index = InterestIndex(DOCS)
+    assert index.suggest("math")[0][0] == "Data Analyst"
+    assert index.suggest("") == []
+    assert index.suggest("xylophone") == []
+
+
+def test_batch_matches_single_queries():
+    index = InterestIndex(DOCS)
+    texts = ["designing bridges", "", "math", "hospital", "designing bridges", None]
+    assert index.suggest_batch(texts, k=2, block=2) == [index.suggest(t or "", k=2) for t in texts]
+
+
+@pytest.fixture
+def app_index(monkeypatch):
+    # The app's own index: colleges, quiz options and the career tables in core
+    monkeypatch.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return core.app_interest_index()
+
+
+def _has(index, label, term):
+    tid = index.term_ids.get(term)
+    return tid is not None and index.matrix[index.labels.index(label), tid] > 0
+
+
+def test_app_index_matches_careers_on_their_own_terms(app_index):
+    every = len(app_index.labels)
+    for career, keywords in core.CAREER_KEYWORDS.items():
+        for term in {t for k in keywords for t in analyze(k)}:
+            ranked = app_index.suggest(term, k=every)
+            # Careers whose documents never use the term are not suggested at all
+            assert {label for label, _ in ranked} == {c for c in app_index.labels if _has(app_index, c, term)}
+            assert career in dict(ranked)
+            if [c for c in app_index.labels if _has(app_index, c, term)] == [career]:
+                assert ranked[0][0] == career
+
+
+def test_app_index_ranks_a_career_by_its_exact_terms(app_index):
+    for career, degrees in core.CAREER_TO_DEGREES.items():
+        query = " ".join([*core.CAREER_KEYWORDS.get(career, []), *degrees])
+        ranked = app_index.suggest(query, k=len(app_index.labels))
+        assert ranked[0][0] == career
+        assert [s for _, s in ranked] == sorted((s for _, s in ranked), reverse=True)
@@ -0,0 +1,52 @@
+import random
+import re
+
+from keyword_matcher import KeywordMatcher, trie_pattern
+
+
+def _found(matcher, text):
+    return {matcher.keywords[i] for i in matcher.find(text)}
+
+
+def test_trie_pattern_matches_like_a_flat_alternation():
+    rng = random.Random(0)
+    words = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(30)]
+    trie = re.compile(f"(?:{trie_pattern(words)})$")
+    flat = re.compile("(?:" + "|".join(map(re.escape, words)) + ")$")
+    for _ in range(500):
+        s = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 5)))
+        assert bool(trie.match(s)) == bool(flat.match(s)), s
+
+
+def test_case_insensitive_and_overlapping():
+    m = KeywordMatcher(["Stock Market", "market", "stock"])
+    assert _found(m, "The STOCK MARKET rallied") == {"stock market", "market", "stock"}
+    assert m.count("nothing here") == 0
+
+
+def test_prefix_keywords_are_reported_with_the_longest():
+    m = KeywordMatcher(["auto", "automation", "automobile"])
+    assert _found(m, "automation jobs") == {"auto", "automation"}
+
+
+def test_whole_words():
+    loose = KeywordMatcher(["ai", "data"])
+    strict = KeywordMatcher(["ai", "data"], whole_words=True)
+    text = "She said the database is fine"
+    assert _found(loose, text) == {"ai", "data"}
+    assert _found(strict, text) == set()
+    assert _found(strict, "AI, data and more") == {"ai", "data"}
+
+
+def test_whole_words_does_not_imply_a_partial_prefix():
+    m = KeywordMatcher(["data", "data science"], whole_words=True)
+    assert _found(m, "a data science course") == {"data", "data science"}
+    m = KeywordMatcher(["art", "arts"], whole_words=True)
+    assert _found(m, "liberal arts") == {"arts"}
+
+
+def test_hits_splits_title_and_body():
+    m = KeywordMatcher(["exam", "result", "jee"])
+    assert m.hits("JEE result out", "Exam dates and result analysis") == (3, 2)
+    assert m.hits(None, None) == (0, 0)
+    assert KeywordMatcher([]).hits("anything", "at all") == (0, 0)
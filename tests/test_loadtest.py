@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_run_leaves_the_invoking_directory_untouched(tmp_path):
+    pytest.importorskip("streamlit.testing.v1")
+    env = {**os.environ, "PYTHONPATH": REPO, "USER_STORE_BACKEND": "sqlite"}
+    proc = subprocess.run([sys.executable, "-m", "benchmarks.loadtest", "--levels", "1", "--journeys", "1",
+                           "-o", os.devnull], cwd=tmp_path, env=env, capture_output=True, text=True, timeout=300)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert "Traceback" not in proc.stderr
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,146 @@
+import threading
+import time
+
+from news_aggregator import NewsAggregator, query_variants, title_key, url_key
+from news_client import NewsBackend, NewsClient
+from news_prewarm import NewsPrewarmer
+
+
+def _article(n, title=None, url=None):
+    return {"title": title or f"robotics story {n}", "description": "AI and automation",
+            "url": url or f"https://example.com/{n}", "source": {"name": "ex"},
+            "publishedAt": "2026-01-01T00:00:00Z"}
+
+
+class QueryBackend(NewsBackend):
+    """Serves ``pages[q]`` page by page and records every call."""
+
+    def __init__(self, pages, delay=0.0):
+        self.pages = pages
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def fetch(self, stream, params):
+        with self._lock:
+            self.calls.append((params["q"], params.get("page", 1)))
+        time.sleep(self.delay)
+        articles = self.pages.get(params["q"], [])
+        size = params["pageSize"]
+        start = (params.get("page", 1) - 1) * size
+        return articles[start:start + size]
+
+
+def _client(backend):
+    return NewsClient(backend, ttl=60, cache_dir=None)
+
+
+def test_keys_normalize_urls_and_titles():
+    assert url_key("https://www.Example.com/a/#top") == url_key("http://example.com/a") == "example.com/a"
+    assert title_key("  Robotics: News! ") == "robotics news"
+    assert url_key(None) is None and title_key("") is None
+    assert query_variants(["a", "b"]) == [("a", "b"), ("a",), ("b",)]
+    assert query_variants(["a"]) == [("a",)]
+
+
+def test_collect_merges_variants_and_drops_duplicates():
+    combined = [_article(i) for i in range(3)]
+    backend = QueryBackend({
+        '"robotics" OR "AI"': combined,
+        # Same story under another URL, and the same URL under another title
+        '"robotics"': [_article(9, title="Robotics story 0!"), _article(10, url="https://www.example.com/1/")],
+        '"AI"': [_article(4)],
+    })
+    agg = NewsAggregator(_client(backend), max_pages=2, deadline=5)
+    sources = {}
+    items = agg.collect("Engineering", ["robotics", "AI"], page_size=3, max_items=10, sources=sources)
+
+    assert sorted(i["url"] for i in items) == [f"https://example.com/{n}" for n in (0, 1, 2, 4)]
+    # Only the combined query filled its first page, so it is the only one asked for page 2
+    assert sorted(backend.calls) == sorted([('"robotics" OR "AI"', 1), ('"robotics" OR "AI"', 2),
+                                            ('"robotics"', 1), ('"AI"', 1)])
+    assert sources == {"network": len(backend.calls)}
+
+
+def test_next_page_waits_for_a_full_page():
+    # Page 1 is slow, so pages scheduled up front would already be in flight before it came back short
+    backend = ShuffledBackend({'"robotics"': [_article(i) for i in range(2)]}, {'"robotics"': 0.1})
+    agg = NewsAggregator(_client(backend), max_pages=3, concurrency=4, deadline=5, variants=False)
+    sources = {}
+    agg.collect("Engineering", ["robotics"], page_size=5, sources=sources)
+    assert backend.calls == [('"robotics"', 1)]
+    assert sources == {"network": 1}
+
+
+def test_deadline_drops_slow_requests():
+    backend = QueryBackend({'"robotics"': [_article(0)]}, delay=1.0)
+    agg = NewsAggregator(_client(backend), max_pages=1, deadline=0.2, variants=False)
+    start = time.perf_counter()
+    sources = {}
+    assert agg.collect("Engineering", ["robotics"], page_size=5, sources=sources) == []
+    assert time.perf_counter() - start < 0.8
+    # The request still ran; it must not read as served from cache
+    assert sources == {"unfinished": 1}
+
+
+def test_prewarmer_warms_only_the_combined_query():
+    pages = {'"robotics" OR "AI"': [_article(i) for i in range(2)], '"robotics"': [_article(7)],
+             '"AI"': [_article(8)]}
+    backend = QueryBackend(pages)
+    client = _client(backend)
+    prewarmer = NewsPrewarmer(client, {"Engineering": ["robotics", "AI"]}, days=14, page_size=5, max_items=10)
+    assert prewarmer.get("Engineering") is None
+
+    prewarmer.refresh_all()
+    assert backend.calls == [('"robotics" OR "AI"', 1)]
+    assert [i["url"] for i in prewarmer.get("Engineering")] == ["https://example.com/0", "https://example.com/1"]
+    # The page's aggregation finds the combined query warm and fetches only the narrower variants
+    sources = {}
+    NewsAggregator(client, max_pages=2, deadline=5).collect("Engineering", ["robotics", "AI"], 14, 5, 10,
+                                                            sources=sources)
+    assert sources == {"memory": 1, "network": 2}
+    # Within the TTL the next cycle does not reach the backend
+    prewarmer.refresh_all()
+    assert len(backend.calls) == 3
+    assert prewarmer.status()["Engineering"]["error"] is None
+
+
+def test_prewarmer_never_stores_a_stale_copy():
+    backend = QueryBackend({'"robotics"': [_article(0)]})
+    client = _client(backend)
+    prewarmer = NewsPrewarmer(client, {"Engineering": ["robotics"]}, page_size=5)
+    prewarmer.refresh_all()
+    backend.pages['"robotics"'] = [_article(1)]
+    client.ttl = 0
+    # Past the TTL the page would get the old copy while it refreshes; the prewarmer waits for the new one
+    assert client.get_articles_status("Engineering", ["robotics"], 14, 5)[1] == "stale"
+    prewarmer.refresh_all()
+    assert [i["url"] for i in prewarmer.get("Engineering")] == ["https://example.com/1"]
+    prewarmer.max_age = 0
+    assert prewarmer.get("Engineering") is None
+
+
+class ShuffledBackend(QueryBackend):
+    """Answers each query after its own delay, so responses arrive in a chosen order."""
+
+    def __init__(self, pages, delays):
+        super().__init__(pages)
+        self.delays = delays
+
+    def fetch(self, stream, params):
+        time.sleep(self.delays.get(params["q"], 0))
+        return super().fetch(stream, params)
+
+
+def test_result_does_not_depend_on_arrival_order():
+    pages = {
+        '"robotics" OR "AI"': [_article(0), _article(1)],
+        '"robotics"': [_article(2), _article(5, title="robotics story 0")],
+        '"AI"': [_article(3), _article(1, title="a different title")],
+    }
+    results = []
+    for delays in ({'"robotics" OR "AI"': 0.2}, {'"AI"': 0.2}, {}):
+        agg = NewsAggregator(_client(ShuffledBackend(pages, delays)), max_pages=1, deadline=5)
+        results.append(agg.collect("Engineering", ["robotics", "AI"], page_size=5, max_items=10))
+    assert results[0] == results[1] == results[2]
+    assert [i["url"] for i in results[0]] == [f"https://example.com/{n}" for n in (0, 1, 2, 3)]
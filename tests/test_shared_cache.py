@@ -0,0 +1,101 @@
+import os
+import socket
+
+import pytest
+
+from shared_cache import MemoryBackend, RespBackend, SharedCache, serve_in_thread, shared_copy
+
+
+@pytest.fixture
+def server():
+    server = serve_in_thread()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _resp(server, **kwargs):
+    host, port = server.server_address
+    return SharedCache(RespBackend(host, port), **kwargs)
+
+
+def test_round_trip_over_resp(server):
+    cache = _resp(server)
+    assert cache.get("roadmap", ("Doctor", "Jammu")) is None
+    assert cache.put("roadmap", ("Doctor", "Jammu"), {"rows": [1, 2]})
+    assert cache.get("roadmap", ("Doctor", "Jammu")) == {"rows": [1, 2]}
+    assert cache.add("lease", "k", 1) and not cache.add("lease", "k", 1)
+    assert cache.stats() == {"hits": 1, "misses": 1, "errors": 0}
+
+
+def test_bump_is_seen_by_other_processes_after_generation_ttl(server):
+    a, b = _resp(server, generation_ttl=0), _resp(server, generation_ttl=60)
+    a.put("news", "k", "old")
+    assert b.get("news", "k") == "old"
+    assert a.bump("news") == 1
+    assert a.get("news", "k") is None
+    assert b.get("news", "k") == "old"  # b still trusts the generation it read
+    b._generations.clear()
+    assert b.get("news", "k") is None
+
+
+def test_unreachable_backend_is_a_miss_and_is_left_alone():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    cache = SharedCache(RespBackend("127.0.0.1", port, timeout=0.2), retry_after=60)
+    assert cache.get("roadmap", "k") is None
+    assert cache.put("roadmap", "k", 1) is False
+    assert cache.add("roadmap", "k", 1) is True
+    assert cache.bump("roadmap") is None
+    assert cache.errors == 1  # later calls skip the backend until retry_after
+
+
+def test_corrupt_value_is_a_miss_without_marking_the_backend_down():
+    backend = MemoryBackend()
+    cache = SharedCache(backend)
+    cache.put("roadmap", "k", [1])
+    key = next(k for k in backend._data if ":roadmap:" in k)
+    backend.set(key, b"\xff{not json")
+    assert cache.get("roadmap", "k") is None
+    assert cache.stats() == {"hits": 0, "misses": 1, "errors": 0}
+    cache.put("roadmap", "k", [2])
+    assert cache.get("roadmap", "k") == [2]
+
+
+def test_corrupt_generation_reads_as_zero():
+    backend = MemoryBackend()
+    cache = SharedCache(backend, generation_ttl=0)
+    cache.put("roadmap", "k", [1])
+    backend.set("compass:gen:roadmap", b"not a number")
+    assert cache.generation("roadmap") == 0
+    assert cache.get("roadmap", "k") == [1]
+    assert cache.stats()["errors"] == 0
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_bytes=30)
+    backend.set("a", b"x" * 10)
+    backend.set("b", b"x" * 10)
+    backend.get("a")
+    backend.set("c", b"x" * 10)
+    assert (backend.get("a"), backend.get("b")) == (b"x" * 10, None)
+
+
+def test_shared_copy_builds_once_per_source_version(tmp_path):
+    src = tmp_path / "colleges.csv"
+    src.write_text("v1")
+    builds = []
+
+    def build(source, out):
+        builds.append(out)
+        with open(out, "w") as f:
+            f.write(open(source).read())
+
+    shared = str(tmp_path / "shm")
+    first = shared_copy(str(src), shared, build)
+    assert shared_copy(str(src), shared, build) == first and len(builds) == 1
+    src.write_text("version 2")
+    second = shared_copy(str(src), shared, build)
+    assert second != first and len(builds) == 2
+    assert not os.path.exists(first) and open(second).read() == "version 2"
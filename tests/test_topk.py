@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from topk import NUMBER, decode_cursor, encode_cursor, top_k
+
+
+def _pages(keys, k, types=None):
+    """Walk every page the way callers do: through an encoded cursor."""
+    pages, cursor = [], None
+    while True:
+        page, last = top_k(iter(keys), k, after=decode_cursor(cursor, types))
+        pages.append(page)
+        cursor = encode_cursor(last)
+        if cursor is None:
+            return pages
+
+
+def test_smallest_k_in_order():
+    keys = [(-s, i) for i, s in enumerate([3, 1, 4, 1, 5, 9, 2, 6])]
+    page, last = top_k(keys, 3)
+    assert page == [(-9, 5), (-6, 7), (-5, 4)]
+    assert last == (-5, 4)
+
+
+def test_last_page_has_no_cursor():
+    page, last = top_k([(1,), (2,)], 2)
+    assert page == [(1,), (2,)]
+    assert last is None
+    assert top_k([], 5) == ([], None)
+
+
+@pytest.mark.parametrize("k", [1, 3, 7, 50])
+def test_paging_covers_every_key_once(k):
+    rng = random.Random(k)
+    keys = [(-rng.randint(0, 5), f"name{rng.randint(0, 9)}", i) for i in range(40)]
+    pages = _pages(keys, k, (int, str, int))
+    assert [key for page in pages for key in page] == sorted(keys)
+    assert all(len(page) == k for page in pages[:-1])
+
+
+def test_float_keys_survive_the_cursor():
+    keys = [(-0.5 * (i % 4), i) for i in range(10)]
+    pages = _pages(keys, 3, (NUMBER, int))
+    assert [key for page in pages for key in page] == sorted(keys)
+
+
+def test_empty_cursor_means_first_page():
+    assert decode_cursor(None) is None
+    assert decode_cursor("") is None
+
+
+@pytest.mark.parametrize("cursor", [
+    "!!!",              # not base64
+    "bm90IGpzb24=",     # "not json"
+    "NQ==",             # 5
+    "e30=",             # {}
+    "WyJhIl0=",         # ["a"]: wrong length
+    "WyJhIiwgMV0=",     # ["a", 1]: wrong field type
+    "W3RydWUsIDFd",     # [true, 1]: a bool is not a number
+])
+def test_bad_cursor_is_value_error(cursor):
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        decode_cursor(cursor, (NUMBER, int))
+
+
+def test_untyped_decode_still_requires_a_list():
+    assert decode_cursor(encode_cursor((1, "a"))) == (1, "a")
+    with pytest.raises(ValueError):
+        decode_cursor("NQ==")
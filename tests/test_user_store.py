@@ -0,0 +1,126 @@
+import os
+import shutil
+import time
+
+import pytest
+
+from user_store import JournalUserStore, make_result
+
+
+def _store(tmp_path, **kw):
+    return JournalUserStore(str(tmp_path / "users.journal"), fsync=False, **kw)
+
+
+def _fill(store, n=3):
+    for i in range(n):
+        store.create({"email": f"u{i}@x", "name": f"U{i}", "city": "Jammu"})
+    store.update("u0@x", {"city": "Srinagar"})
+    store.add_result(make_result("u1@x", {"major": "Science"}, taken_at=1.0))
+    store.add_result(make_result("u1@x", {"major": "Commerce"}, taken_at=2.0))
+
+
+def _state(store):
+    users = sorted(store.all(), key=lambda u: u["email"])
+    return users, {u["email"]: store.results(u["email"]) for u in users}
+
+
+def test_reopen_replays_journal(tmp_path):
+    store = _store(tmp_path)
+    _fill(store)
+    before = _state(store)
+    store.close()
+
+    reopened = _store(tmp_path)
+    assert _state(reopened) == before
+    assert reopened.get("u0@x")["city"] == "Srinagar"
+    assert reopened.latest_result("u1@x")["major"] == "Commerce"
+    assert not reopened.create({"email": "u0@x"})
+
+
+def test_torn_last_line_is_dropped_and_truncated(tmp_path):
+    store = _store(tmp_path)
+    _fill(store)
+    before = _state(store)
+    store.close()
+    with open(store.path, "ab") as f:
+        f.write(b'{"op":"put","user":{"email":"half')
+
+    reopened = _store(tmp_path)
+    assert _state(reopened) == before
+    with open(store.path, "rb") as f:
+        assert f.read().endswith(b"}\n")
+    # New appends start on a clean line and survive another restart
+    reopened.create({"email": "late@x"})
+    reopened.close()
+    assert _store(tmp_path).get("late@x") is not None
+
+
+def test_corrupt_middle_line_raises(tmp_path):
+    store = _store(tmp_path)
+    _fill(store)
+    store.close()
+    with open(store.path, "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    lines[1] = b"not json\n"
+    with open(store.path, "wb") as f:
+        f.write(b"".join(lines))
+
+    with pytest.raises(ValueError, match="line 2"):
+        _store(tmp_path)
+
+
+def test_compact_folds_journal_into_snapshot(tmp_path):
+    store = _store(tmp_path)
+    _fill(store)
+    store.compact()
+    assert os.path.exists(store.snapshot_path)
+    assert not os.path.exists(store.rotated_path)
+    assert os.path.getsize(store.path) == 0
+
+    store.create({"email": "after@x", "name": "After"})
+    before = _state(store)
+    store.close()
+    assert _state(_store(tmp_path)) == before
+
+
+def test_interrupted_compaction_is_finished_on_start(tmp_path):
+    # Crash after the journal was renamed aside but before the snapshot landed
+    store = _store(tmp_path)
+    _fill(store)
+    before = _state(store)
+    store.close()
+    os.replace(store.path, store.rotated_path)
+
+    reopened = _store(tmp_path)
+    assert _state(reopened) == before
+    assert os.path.exists(reopened.snapshot_path)
+    assert not os.path.exists(reopened.rotated_path)
+
+
+def test_records_already_in_snapshot_are_not_applied_twice(tmp_path):
+    # Crash after the snapshot landed but before the old journal was deleted
+    store = _store(tmp_path)
+    _fill(store)
+    shutil.copy(store.path, tmp_path / "old.journal")
+    store.compact()
+    before = _state(store)
+    store.close()
+    os.replace(tmp_path / "old.journal", store.rotated_path)
+
+    reopened = _store(tmp_path)
+    assert _state(reopened) == before
+    assert len(reopened.results("u1@x")) == 2
+
+
+def test_background_compaction_after_compact_every_records(tmp_path):
+    store = _store(tmp_path, compact_every=5)
+    _fill(store, n=6)
+    deadline = time.monotonic() + 5
+    while not os.path.exists(store.snapshot_path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with store._compact_lock:  # let a compaction in progress finish
+        pass
+    assert os.path.exists(store.snapshot_path)
+    before = _state(store)
+    store.close()
+    assert _state(_store(tmp_path)) == before
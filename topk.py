@@ -0,0 +1,47 @@
+import base64
+import heapq
+import json
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+# Cursor field type for any JSON number (a float key such as -0.0 can come back as an int)
+NUMBER = (int, float)
+
+
+def top_k(keys: Iterable[tuple], k: int, after: Optional[tuple] = None) -> Tuple[List[tuple], Optional[tuple]]:
+    """The ``k`` smallest sort keys from a stream, in order, using an O(k) heap.
+
+    Keys must be unique and totally ordered (put a row id last to break
+    ties). ``after`` skips every key <= it, which is how pagination resumes.
+    Returns ``(page, last_key)``; ``last_key`` is None when nothing follows.
+    """
+    if after is not None:
+        keys = (key for key in keys if key > after)
+    page = heapq.nsmallest(k + 1, keys)
+    if len(page) > k:
+        return page[:k], page[k - 1] if k else None
+    return page, None
+
+
+def encode_cursor(key: Optional[tuple]) -> Optional[str]:
+    if key is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str], types: Optional[Sequence] = None) -> Optional[tuple]:
+    """The key encoded by ``encode_cursor``; ValueError for anything else.
+
+    ``types`` is the expected type of each key field, so a cursor from another
+    listing (or a hand-edited one) cannot reach the key comparison in ``top_k``.
+    """
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except ValueError:
+        key = None
+    if not isinstance(key, list) or (types is not None and not (
+            len(key) == len(types)
+            and all(isinstance(v, t) and not isinstance(v, bool) for v, t in zip(key, types)))):
+        raise ValueError(f"Invalid pagination cursor: {cursor!r}")
+    return tuple(key)
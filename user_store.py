@@ -0,0 +1,602 @@
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+
+USER_COLUMNS = ["email", "password", "name", "age", "gender", "city", "state", "education", "avatar", "your_paths"]
+# Older users.csv files used these headers before the signup form changed.
+LEGACY_COLUMNS = {"location": "city", "studying": "education"}
+
+# One row per completed quiz, appended and never rewritten. Same field names as batch.py output.
+RESULT_COLUMNS = ["email", "taken_at", "major", "minor", "backup",
+                  "sub_major", "sub_minor", "sub_backup", "main_scores", "sub_scores"]
+RESULT_LABELS = ["major", "minor", "backup", "sub_major", "sub_minor", "sub_backup"]
+
+
+def _clean(user: Dict) -> Dict:
+    row = {}
+    for col in USER_COLUMNS:
+        val = user.get(col, "")
+        if val is None or (isinstance(val, float) and pd.isna(val)):
+            val = ""
+        row[col] = val
+    return row
+
+
+def make_result(email: str, main: Dict, sub: Optional[Dict] = None, taken_at: Optional[float] = None) -> Dict:
+    """Build a quiz result record; ``main``/``sub`` hold major/minor/backup and an optional ``scores`` dict."""
+    sub = sub or {}
+    return {
+        "email": email,
+        "taken_at": time.time() if taken_at is None else taken_at,
+        "major": main.get("major"), "minor": main.get("minor"), "backup": main.get("backup"),
+        "sub_major": sub.get("major"), "sub_minor": sub.get("minor"), "sub_backup": sub.get("backup"),
+        "main_scores": dict(main.get("scores") or {}),
+        "sub_scores": dict(sub.get("scores") or {}),
+    }
+
+
+def format_paths(result: Dict) -> str:
+    """The human-readable summary that used to be the only copy of a result (users.your_paths)."""
+    return (f"Major: {result['major']}, Minor: {result['minor']}, Backup: {result['backup']} | "
+            f"Specializations Major: {result['sub_major']}, Minor: {result['sub_minor']}, Backup: {result['sub_backup']}")
+
+
+_PATHS_RE = re.compile(
+    r"Major: (?P<major>[^,]*), Minor: (?P<minor>[^,]*), Backup: (?P<backup>[^|]*?)\s*\|\s*"
+    r"Specializations Major: (?P<sub_major>[^,]*), Minor: (?P<sub_minor>[^,]*), Backup: (?P<sub_backup>.*)$"
+)
+
+
+def parse_legacy_paths(paths: str) -> Optional[Dict]:
+    """Recover the labels from an old your_paths string (no scores were ever stored for these)."""
+    m = _PATHS_RE.match((paths or "").strip())
+    if not m:
+        return None
+    labels = {k: (None if v.strip() in ("", "None") else v.strip()) for k, v in m.groupdict().items()}
+    return {**labels, "main_scores": {}, "sub_scores": {}}
+
+
+def _result_row(result: Dict) -> List:
+    return [json.dumps(result.get(c) or {}) if c.endswith("_scores") else result.get(c) for c in RESULT_COLUMNS]
+
+
+def _result_from_row(row) -> Dict:
+    result = {c: row[c] for c in RESULT_COLUMNS}
+    for c in ("main_scores", "sub_scores"):
+        result[c] = json.loads(result[c]) if result[c] else {}
+    for c in RESULT_LABELS:
+        result[c] = result[c] or None
+    result["taken_at"] = float(result["taken_at"])
+    return result
+
+
+class UserStore:
+    """Interface every user backend implements. Rows are plain dicts keyed by USER_COLUMNS."""
+
+    def get(self, email: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def create(self, user: Dict) -> bool:
+        """Insert a new user; returns False if the email is already taken."""
+        raise NotImplementedError
+
+    def update(self, email: str, fields: Dict) -> None:
+        raise NotImplementedError
+
+    def upsert_many(self, users: Iterable[Dict]) -> int:
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def all(self) -> List[Dict]:
+        raise NotImplementedError
+
+    def exists(self, email: str) -> bool:
+        return self.get(email) is not None
+
+    # --- quiz result history (append-only) ---
+    def add_result(self, result: Dict) -> None:
+        raise NotImplementedError
+
+    def results(self, email: str) -> List[Dict]:
+        """Every result for ``email``, oldest first."""
+        raise NotImplementedError
+
+    def latest_result(self, email: str) -> Optional[Dict]:
+        history = self.results(email)
+        return history[-1] if history else None
+
+    def result_counts(self, field: str = "major") -> Dict[str, int]:
+        """How many users' latest result has each value of ``field`` (one of RESULT_LABELS)."""
+        raise NotImplementedError
+
+    def backfill_results(self) -> int:
+        """Record the old your_paths text of users who have no result yet. Safe to re-run."""
+        n = 0
+        for user in self.all():
+            legacy = parse_legacy_paths(user.get("your_paths"))
+            if legacy and self.latest_result(user["email"]) is None:
+                self.add_result({**legacy, "email": user["email"], "taken_at": 0.0})
+                n += 1
+        return n
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.all(), columns=USER_COLUMNS)
+
+
+# ----------------------------- SQLITE BACKEND -----------------------------
+class SQLiteUserStore(UserStore):
+    """Default backend: one SQLite file in WAL mode, email as primary key.
+
+    Every read/write touches a single row, and WAL lets concurrent Streamlit
+    sessions read while another one writes. Connections are per thread.
+    """
+
+    def __init__(self, path: str = "users.db"):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        cols = ", ".join(
+            "email TEXT PRIMARY KEY" if c == "email" else ("age INTEGER" if c == "age" else f"{c} TEXT")
+            for c in USER_COLUMNS
+        )
+        with conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS users ({cols})")
+            has_results = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'quiz_results'").fetchone()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS quiz_results (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "email TEXT NOT NULL, taken_at REAL NOT NULL, "
+                + ", ".join(f"{c} TEXT" for c in RESULT_COLUMNS[2:]) + ")"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS quiz_results_email ON quiz_results (email, id)")
+        if not has_results:
+            self.backfill_results()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, email):
+        row = self._conn().execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
+        return dict(row) if row else None
+
+    def create(self, user):
+        row = _clean(user)
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    f"INSERT INTO users ({', '.join(USER_COLUMNS)}) VALUES ({', '.join('?' * len(USER_COLUMNS))})",
+                    [row[c] for c in USER_COLUMNS],
+                )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def update(self, email, fields):
+        cols = [c for c in USER_COLUMNS if c in fields and c != "email"]
+        if not cols:
+            return
+        row = _clean(fields)
+        with self._conn() as conn:
+            conn.execute(
+                f"UPDATE users SET {', '.join(f'{c} = ?' for c in cols)} WHERE email = ?",
+                [row[c] for c in cols] + [email],
+            )
+
+    def upsert_many(self, users):
+        rows = [[r[c] for c in USER_COLUMNS] for r in map(_clean, users)]
+        updates = ", ".join(f"{c} = excluded.{c}" for c in USER_COLUMNS if c != "email")
+        with self._conn() as conn:
+            conn.executemany(
+                f"INSERT INTO users ({', '.join(USER_COLUMNS)}) VALUES ({', '.join('?' * len(USER_COLUMNS))}) "
+                f"ON CONFLICT(email) DO UPDATE SET {updates}",
+                rows,
+            )
+        return len(rows)
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def all(self):
+        return [dict(r) for r in self._conn().execute("SELECT * FROM users")]
+
+    def add_result(self, result):
+        with self._conn() as conn:
+            conn.execute(
+                f"INSERT INTO quiz_results ({', '.join(RESULT_COLUMNS)}) VALUES ({', '.join('?' * len(RESULT_COLUMNS))})",
+                _result_row(result),
+            )
+
+    def results(self, email):
+        rows = self._conn().execute("SELECT * FROM quiz_results WHERE email = ? ORDER BY id", (email,))
+        return [_result_from_row(r) for r in rows]
+
+    def latest_result(self, email):
+        row = self._conn().execute(
+            "SELECT * FROM quiz_results WHERE email = ? ORDER BY id DESC LIMIT 1", (email,)).fetchone()
+        return _result_from_row(row) if row else None
+
+    def result_counts(self, field="major"):
+        if field not in RESULT_LABELS:
+            raise ValueError(f"Unknown result field: {field}")
+        rows = self._conn().execute(
+            f"SELECT {field}, COUNT(*) FROM quiz_results "
+            f"WHERE id IN (SELECT MAX(id) FROM quiz_results GROUP BY email) AND {field} IS NOT NULL "
+            f"GROUP BY {field}"
+        )
+        return {value: n for value, n in rows}
+
+
+# ----------------------------- CSV BACKEND -----------------------------
+class CsvUserStore(UserStore):
+    """Legacy users.csv backend (whole-file rewrite per write). Kept for small setups."""
+
+    def __init__(self, path: str = "users.csv"):
+        self.path = path
+        self.results_path = os.path.splitext(path)[0] + "_quiz_results.csv"
+        self._lock = threading.Lock()
+        if not os.path.exists(self.results_path):
+            with open(self.results_path, "w", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerow(RESULT_COLUMNS)
+            self.backfill_results()
+
+    def _load(self) -> pd.DataFrame:
+        if os.path.exists(self.path):
+            df = pd.read_csv(self.path, dtype=str, keep_default_na=False)
+            for col in USER_COLUMNS:
+                if col not in df.columns:
+                    df[col] = ""
+            return df
+        df = pd.DataFrame(columns=USER_COLUMNS)
+        df.to_csv(self.path, index=False)
+        return df
+
+    def get(self, email):
+        df = self._load()
+        match = df[df["email"] == email]
+        return _clean(match.iloc[0].to_dict()) if len(match) else None
+
+    def create(self, user):
+        with self._lock:
+            df = self._load()
+            if user.get("email") in df["email"].values:
+                return False
+            df = pd.concat([df, pd.DataFrame([_clean(user)])], ignore_index=True)
+            df.to_csv(self.path, index=False)
+        return True
+
+    def update(self, email, fields):
+        with self._lock:
+            df = self._load()
+            idx = df.index[df["email"] == email]
+            if not len(idx):
+                return
+            for key, val in _clean(fields).items():
+                if key in fields and key != "email":
+                    df.at[idx[0], key] = val
+            df.to_csv(self.path, index=False)
+
+    def upsert_many(self, users):
+        with self._lock:
+            df = self._load().set_index("email", drop=False)
+            n = 0
+            for u in users:
+                row = _clean(u)
+                df.loc[row["email"]] = pd.Series(row)
+                n += 1
+            df.to_csv(self.path, index=False)
+        return n
+
+    def count(self):
+        return len(self._load())
+
+    def all(self):
+        return [_clean(r) for r in self._load().to_dict(orient="records")]
+
+    def add_result(self, result):
+        with self._lock, open(self.results_path, "a", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(_result_row(result))
+
+    def _all_results(self) -> List[Dict]:
+        with open(self.results_path, newline="", encoding="utf-8") as f:
+            return [_result_from_row(r) for r in csv.DictReader(f)]
+
+    def results(self, email):
+        return [r for r in self._all_results() if r["email"] == email]
+
+    def result_counts(self, field="major"):
+        if field not in RESULT_LABELS:
+            raise ValueError(f"Unknown result field: {field}")
+        latest = {r["email"]: r for r in self._all_results()}
+        counts: Dict[str, int] = {}
+        for r in latest.values():
+            if r[field] is not None:
+                counts[r[field]] = counts.get(r[field], 0) + 1
+        return counts
+
+
+# ----------------------------- JOURNAL BACKEND -----------------------------
+class JournalUserStore(UserStore):
+    """File-based backend: an append-only JSON-lines journal plus a periodic snapshot.
+
+    Every mutation (signup, profile update, quiz result) is one appended
+    line, so a write costs O(1) and a crash can at worst tear the last line,
+    which is dropped on the next start. Reads are served from an in-memory
+    email index rebuilt at startup from ``<path>.snapshot`` and the journal
+    tail. Concurrent writers share fsyncs (group commit). Once the journal
+    holds ``compact_every`` records a background thread folds it into a new
+    snapshot. Meant for a single process; use SQLite for several.
+    """
+
+    def __init__(self, path: str = "users.journal", compact_every: int = 1000, fsync: bool = True):
+        self.path = path
+        self.snapshot_path = path + ".snapshot"
+        # The previous journal while a compaction is writing its snapshot
+        self.rotated_path = path + ".compacting"
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._users: Dict[str, Dict] = {}
+        self._results: Dict[str, List[Dict]] = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+        # Held by whoever is fsyncing; taken before _lock when both are needed
+        self._sync_lock = threading.Lock()
+        self._synced = 0
+        self._compact_lock = threading.Lock()
+        self._compact_wanted = threading.Event()
+
+        snapshot_seq = self._load_snapshot()
+        interrupted = os.path.exists(self.rotated_path)
+        if interrupted:
+            self._replay(self.rotated_path, snapshot_seq)
+        self._tail = self._replay(self.path, snapshot_seq)
+        self._synced = self._seq
+        self._file = open(self.path, "a", encoding="utf-8")
+        if interrupted:
+            # A compaction died before its snapshot landed; finish it before anything rotates again
+            self._write_snapshot(self._seq, list(self._users.values()), self._flat_results())
+            os.remove(self.rotated_path)
+        threading.Thread(target=self._compactor, name="user-journal-compact", daemon=True).start()
+
+    # --- recovery ---
+    def _load_snapshot(self) -> int:
+        if not os.path.exists(self.snapshot_path):
+            return 0
+        with open(self.snapshot_path, encoding="utf-8") as f:
+            snap = json.load(f)
+        for user in snap["users"]:
+            self._users[user["email"]] = user
+        for result in snap["results"]:
+            self._results.setdefault(result["email"], []).append(result)
+        self._seq = snap["seq"]
+        return snap["seq"]
+
+    def _replay(self, path: str, after: int) -> int:
+        """Apply the journal's records newer than the snapshot; returns how many lines it holds."""
+        if not os.path.exists(path):
+            return 0
+        with open(path, "rb") as f:
+            data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            # A crash mid-append left a partial last line; cut it so new appends start clean
+            with open(path, "r+b") as f:
+                f.truncate(complete)
+        lines = data[:complete].splitlines()
+        for i, line in enumerate(lines):
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                raise ValueError(f"{path}: corrupt journal record on line {i + 1}")
+            if rec["seq"] > after:
+                self._apply(rec)
+                self._seq = rec["seq"]
+        return len(lines)
+
+    def _apply(self, rec: Dict) -> None:
+        op = rec["op"]
+        if op == "put":
+            self._users[rec["user"]["email"]] = rec["user"]
+        elif op == "update":
+            if rec["email"] in self._users:
+                self._users[rec["email"]] = {**self._users[rec["email"]], **rec["fields"]}
+        elif op == "result":
+            self._results.setdefault(rec["result"]["email"], []).append(rec["result"])
+        else:
+            raise ValueError(f"Unknown journal op: {op}")
+
+    # --- writes ---
+    def _append(self, records: List[Dict]) -> int:
+        """Apply and journal ``records``; call with _lock held. Returns the last seq written."""
+        lines = []
+        for rec in records:
+            self._seq += 1
+            rec["seq"] = self._seq
+            self._apply(rec)
+            lines.append(json.dumps(rec, separators=(",", ":")) + "\n")
+        self._file.write("".join(lines))
+        self._file.flush()
+        self._tail += len(lines)
+        if self._tail >= self.compact_every:
+            self._compact_wanted.set()
+        return self._seq
+
+    def _sync(self, seq: int) -> None:
+        """Return once ``seq`` is on disk. Writers that queue up behind an fsync are covered by the next one."""
+        if not self.fsync:
+            return
+        with self._sync_lock:
+            if self._synced >= seq:
+                return
+            with self._lock:
+                target, f = self._seq, self._file
+            os.fsync(f.fileno())
+            self._synced = target
+
+    def create(self, user):
+        row = _clean(user)
+        with self._lock:
+            if row["email"] in self._users:
+                return False
+            seq = self._append([{"op": "put", "user": row}])
+        self._sync(seq)
+        return True
+
+    def update(self, email, fields):
+        row = _clean(fields)
+        changed = {c: row[c] for c in USER_COLUMNS if c in fields and c != "email"}
+        with self._lock:
+            if not changed or email not in self._users:
+                return
+            seq = self._append([{"op": "update", "email": email, "fields": changed}])
+        self._sync(seq)
+
+    def upsert_many(self, users):
+        rows = [_clean(u) for u in users]
+        with self._lock:
+            seq = self._append([{"op": "put", "user": r} for r in rows])
+        self._sync(seq)
+        return len(rows)
+
+    def add_result(self, result):
+        record = {**result, "main_scores": dict(result.get("main_scores") or {}),
+                  "sub_scores": dict(result.get("sub_scores") or {})}
+        with self._lock:
+            seq = self._append([{"op": "result", "result": record}])
+        self._sync(seq)
+
+    # --- reads ---
+    def get(self, email):
+        user = self._users.get(email)
+        return dict(user) if user else None
+
+    def count(self):
+        return len(self._users)
+
+    def all(self):
+        with self._lock:
+            return [dict(u) for u in self._users.values()]
+
+    def results(self, email):
+        with self._lock:
+            return [dict(r) for r in self._results.get(email, [])]
+
+    def latest_result(self, email):
+        history = self._results.get(email)
+        return dict(history[-1]) if history else None
+
+    def result_counts(self, field="major"):
+        if field not in RESULT_LABELS:
+            raise ValueError(f"Unknown result field: {field}")
+        counts: Dict[str, int] = {}
+        with self._lock:
+            latest = [h[-1] for h in self._results.values() if h]
+        for r in latest:
+            if r[field] is not None:
+                counts[r[field]] = counts.get(r[field], 0) + 1
+        return counts
+
+    # --- compaction ---
+    def _compactor(self) -> None:
+        while True:
+            self._compact_wanted.wait()
+            self._compact_wanted.clear()
+            try:
+                self.compact()
+            except OSError as e:
+                print(f"user journal compaction failed: {e}", file=sys.stderr)
+
+    def compact(self) -> None:
+        """Fold the journal into a new snapshot.
+
+        The journal is first renamed aside (writers move on to a fresh one),
+        then the snapshot is written to a temp file and swapped in, and only
+        then is the old journal deleted. Recovery after a crash at any step
+        replays whatever journal records are newer than the snapshot.
+        """
+        with self._compact_lock:
+            with self._sync_lock, self._lock:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                os.replace(self.path, self.rotated_path)
+                self._file = open(self.path, "a", encoding="utf-8")
+                self._synced = self._seq
+                self._tail = 0
+                seq = self._seq
+                users = [dict(u) for u in self._users.values()]
+                results = self._flat_results()
+            self._write_snapshot(seq, users, results)
+            os.remove(self.rotated_path)
+
+    def _flat_results(self) -> List[Dict]:
+        return [r for history in self._results.values() for r in history]
+
+    def _write_snapshot(self, seq: int, users: List[Dict], results: List[Dict]) -> None:
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"seq": seq, "users": users, "results": results}, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+
+    def close(self) -> None:
+        with self._sync_lock, self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+
+# ----------------------------- FACTORY / MIGRATION -----------------------------
+def migrate_csv(csv_path: str, store: UserStore) -> int:
+    """Copy every row of a legacy users.csv into ``store``. Safe to re-run (upserts by email)."""
+    if not os.path.exists(csv_path):
+        return 0
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    if "email" not in df.columns:
+        return 0
+    df = df.rename(columns={k: v for k, v in LEGACY_COLUMNS.items() if v not in df.columns})
+    df = df[df["email"].str.strip() != ""]
+    n = store.upsert_many(df.to_dict(orient="records"))
+    store.backfill_results()
+    return n
+
+
+BACKENDS = {"sqlite": SQLiteUserStore, "csv": CsvUserStore, "journal": JournalUserStore}
+
+
+def get_user_store(backend: str = "sqlite", path: str = "users.db", legacy_csv: Optional[str] = "users.csv") -> UserStore:
+    """Open the configured backend. A freshly created SQLite or journal store is seeded from ``legacy_csv`` once."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown user store backend: {backend}")
+    is_new = backend != "csv" and not os.path.exists(path)
+    store = BACKENDS[backend](path)
+    if is_new and legacy_csv:
+        migrate_csv(legacy_csv, store)
+    return store
+
+
+if __name__ == "__main__":
+    # python user_store.py users.csv users.db
+    if len(sys.argv) != 3:
+        print("usage: python user_store.py <users.csv> <users.db>")
+        sys.exit(1)
+    n = migrate_csv(sys.argv[1], SQLiteUserStore(sys.argv[2]))
+    print(f"Migrated {n} users into {sys.argv[2]}")